@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
+from django.utils import timezone
 from .models import User, StudentProfile, TeacherProfile
+from .stats import invalidate_dashboard_stats
 
 
 @admin.register(User)
@@ -13,6 +16,39 @@ class UserAdmin(BaseUserAdmin):
     add_fieldsets = BaseUserAdmin.add_fieldsets + (
         ('Дополнительная информация', {'fields': ('role', 'phone', 'photo')}),
     )
+    actions = ['approve_registrations']
+    
+    @admin.action(description='Подтвердить выбранных и создать профили')
+    def approve_registrations(self, request, queryset):
+        """
+        Пакетное подтверждение: активирует пользователей одним UPDATE и создает
+        недостающие профили студентов/преподавателей через bulk_create
+        """
+        year = timezone.now().year
+        with transaction.atomic():
+            users = list(queryset.filter(role__in=('student', 'teacher')).select_related(
+                'student_profile', 'teacher_profile'
+            ))
+            students = [
+                StudentProfile(user=user, student_id=f'STU{user.pk:06d}', enrollment_year=year)
+                for user in users
+                if user.role == 'student' and not hasattr(user, 'student_profile')
+            ]
+            teachers = [
+                TeacherProfile(user=user, department='Не указано', position='Преподаватель')
+                for user in users
+                if user.role == 'teacher' and not hasattr(user, 'teacher_profile')
+            ]
+            StudentProfile.objects.bulk_create(students, batch_size=500)
+            TeacherProfile.objects.bulk_create(teachers, batch_size=500)
+            activated = queryset.filter(is_active=False).update(is_active=True)
+            # bulk_create и update не посылают post_save
+            transaction.on_commit(invalidate_dashboard_stats)
+        
+        self.message_user(
+            request,
+            f'Активировано: {activated}, профилей студентов: {len(students)}, преподавателей: {len(teachers)}'
+        )
 
 
 @admin.register(StudentProfile)
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ProfileBackend(ModelBackend):
+    """
+    Бэкенд аутентификации, загружающий пользователя сразу с профилем
+
+    AuthenticationMiddleware получает пользователя через get_user один раз
+    за запрос, поэтому request.user.student_profile (вместе с группой) и
+    request.user.teacher_profile доступны без дополнительных запросов.
+    Отсутствующий профиль тоже кэшируется: обращение к нему сразу
+    возбуждает DoesNotExist.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(
+                'student_profile__group', 'teacher_profile'
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,48 @@
+import time
+
+from django.contrib import admin
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    """Время действия администратора approve_registrations на пакете неактивных пользователей"""
+
+    help = ('Создает N неактивных студентов и преподавателей, подтверждает их действием '
+            'approve_registrations и выводит время и число запросов; изменения откатываются')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5000, help='Число пользователей')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        model_admin = admin.site._registry[User]
+        request = RequestFactory().post('/admin/accounts/user/')
+        request.user = User(username='benchmark', is_staff=True, is_superuser=True)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(username=f'bench_reg_{i}', email=f'bench_reg_{i}@bench.local', password='-',
+                     role='teacher' if i % 3 == 2 else 'student', is_active=False)
+                for i in range(count)
+            ], batch_size=500)
+            queryset = User.objects.filter(username__startswith='bench_reg_')
+
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as context:
+                model_admin.approve_registrations(request, queryset)
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(f'Пользователей {count}: {elapsed * 1000:.0f} мс, '
+                              f'запросов {len(context.captured_queries)}')
+            for message in request._messages:
+                self.stdout.write(f'  {message}')
+            # Созданные пользователи и профили не сохраняются
+            transaction.set_rollback(True)
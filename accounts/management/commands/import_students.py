@@ -0,0 +1,131 @@
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from accounts.models import User, StudentProfile
+from accounts.stats import invalidate_dashboard_stats
+from groups.models import Group
+from student_csv import read_rows, invalid_courses, unique_rows, password_writer, hash_passwords, benchmark
+
+
+class Command(BaseCommand):
+    """
+    Импорт студентов из CSV с хэшированием паролей в пуле процессов.
+    Чтение CSV, отбор повторов логина и email внутри файла и хэширование -
+    общие со скриптом Flask-версии import_students.py (student_csv.py).
+    """
+
+    help = ('Создает студентов с профилями и недостающими группами из CSV '
+            '(username, email, first_name, last_name, group, course, faculty, password)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Путь к файлу .csv')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Процессов для хэширования паролей')
+        parser.add_argument('--batch-size', type=int, default=500, help='Строк в одной пачке bulk_create')
+        parser.add_argument('--output', help='CSV для сгенерированных паролей (строки без password)')
+        parser.add_argument('--benchmark', action='store_true',
+                            help='Замерить ускорение хэширования от числа процессов')
+        parser.add_argument('--sample', type=int, default=100, help='Паролей для замера')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self._benchmark(options['sample'])
+            return
+        if not options['path']:
+            raise CommandError('Не указан CSV-файл')
+
+        try:
+            rows = read_rows(options['path'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        bad_courses = invalid_courses(rows)
+        if bad_courses:
+            raise CommandError('Неверный курс (ожидается целое число от 1) в строках: '
+                               + ', '.join(map(str, bad_courses)))
+
+        if any(not row.get('password') for row in rows) and not options['output']:
+            raise CommandError('Для строк без пароля нужен --output, куда записать сгенерированные пароли')
+
+        started = time.monotonic()
+        workers = options['workers']
+        batch_size = options['batch_size']
+        rows, skipped = unique_rows(rows)
+        created = 0
+        year = timezone.now().year
+
+        groups = {group.name: group for group in Group.objects.all()}
+        new_groups = {}
+        for row in rows:
+            name = row.get('group')
+            if name and name not in groups and name not in new_groups:
+                new_groups[name] = Group(name=name, course=int(row.get('course') or 1),
+                                         faculty=row.get('faculty') or 'Не указан')
+        Group.objects.bulk_create(new_groups.values())
+        groups = {group.name: group for group in Group.objects.all()}
+
+        # Дочерние процессы настраивают Django сами: make_password читает PASSWORD_HASHERS
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool, \
+                password_writer(options['output']) as writer:
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                taken_usernames = set(User.objects.filter(username__in=[r['username'] for r in chunk])
+                                      .values_list('username', flat=True))
+                # Email сравнивается без учета регистра, как и повторы внутри файла
+                taken_emails = set(User.objects.annotate(email_lower=Lower('email'))
+                                   .filter(email_lower__in=[r['email'].lower() for r in chunk])
+                                   .values_list('email_lower', flat=True))
+                batch = [r for r in chunk if r.get('group') and r['username'] not in taken_usernames
+                         and r['email'].lower() not in taken_emails]
+                skipped += len(chunk) - len(batch)
+                if not batch:
+                    continue
+
+                passwords = [r.get('password') or secrets.token_urlsafe(9) for r in batch]
+                hashes = hash_passwords(pool, make_password, passwords, workers)
+
+                with transaction.atomic():
+                    User.objects.bulk_create([User(
+                        username=r['username'],
+                        email=r['email'],
+                        first_name=r['first_name'],
+                        last_name=r['last_name'],
+                        password=password_hash,
+                        role='student',
+                    ) for r, password_hash in zip(batch, hashes)])
+                    # bulk_create на MySQL не возвращает id - читаем их по логину
+                    user_ids = dict(User.objects.filter(username__in=[r['username'] for r in batch])
+                                    .values_list('username', 'id'))
+                    StudentProfile.objects.bulk_create([StudentProfile(
+                        user_id=user_ids[r['username']],
+                        student_id=f"STU{user_ids[r['username']]:06d}",
+                        group=groups[r['group']],
+                        enrollment_year=year,
+                    ) for r in batch])
+
+                if writer:
+                    writer.writerows((r['username'], password) for r, password in zip(batch, passwords)
+                                     if not r.get('password'))
+                created += len(batch)
+                self.stdout.write(f'  {start + len(chunk)}/{len(rows)}: создано {created}, '
+                                  f'пропущено {skipped}, {time.monotonic() - started:.1f} с')
+
+        invalidate_dashboard_stats()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] Создано студентов: {created} за {time.monotonic() - started:.1f} с, '
+            f'групп: {len(new_groups)}, пропущено строк: {skipped}'
+        ))
+
+    def _benchmark(self, sample):
+        """Время хэширования sample паролей при разном числе процессов"""
+        benchmark(make_password, sample, self.stdout.write, initializer=django.setup)
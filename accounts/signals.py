@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+
+from groups.models import Group, Subject
+from schedules.models import Schedule, ChangeRequest
+from .models import User, TeacherProfile
+from .stats import invalidate_dashboard_stats
+
+
+for model in (User, TeacherProfile, Group, Subject, Schedule, ChangeRequest):
+    post_save.connect(invalidate_dashboard_stats, sender=model, dispatch_uid=f'dashboard_stats_save_{model.__name__}')
+    post_delete.connect(invalidate_dashboard_stats, sender=model, dispatch_uid=f'dashboard_stats_delete_{model.__name__}')
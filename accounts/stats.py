@@ -0,0 +1,58 @@
+"""
+Статистика панели администратора
+
+Все счетчики считаются одним запросом из скалярных подзапросов и
+кэшируются на ADMIN_STATS_TTL секунд; сигналы сбрасывают кэш при
+изменении пользователей, групп, предметов, занятий и запросов.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+STATS_KEY = 'admin:dashboard_stats'
+
+
+def _compute_stats():
+    from groups.models import Group, Subject
+    from schedules.models import Schedule, ChangeRequest
+    from .models import User, TeacherProfile
+
+    tables = {
+        'user': User._meta.db_table,
+        'group': Group._meta.db_table,
+        'subject': Subject._meta.db_table,
+        'schedule': Schedule._meta.db_table,
+        'teacher': TeacherProfile._meta.db_table,
+        'change_request': ChangeRequest._meta.db_table,
+    }
+    sql = f"""
+        SELECT
+            (SELECT COUNT(*) FROM {tables['user']}),
+            (SELECT COUNT(*) FROM {tables['group']}),
+            (SELECT COUNT(*) FROM {tables['subject']}),
+            (SELECT COUNT(*) FROM {tables['schedule']} WHERE date = %s AND is_active = %s),
+            (SELECT COUNT(*) FROM {tables['teacher']} t
+                JOIN {tables['user']} u ON u.id = t.user_id WHERE u.is_active = %s),
+            (SELECT COUNT(*) FROM {tables['change_request']} WHERE status = %s)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [timezone.localdate(), True, True, 'pending'])
+        row = cursor.fetchone()
+
+    keys = ('users_count', 'groups_count', 'subjects_count',
+            'lessons_today', 'active_teachers', 'pending_requests')
+    return dict(zip(keys, row))
+
+
+def get_dashboard_stats():
+    """Счетчики панели администратора (из кэша или одним запросом)"""
+    stats = cache.get(STATS_KEY)
+    if stats is None:
+        stats = _compute_stats()
+        cache.set(STATS_KEY, stats, getattr(settings, 'ADMIN_STATS_TTL', 60))
+    return stats
+
+
+def invalidate_dashboard_stats(**kwargs):
+    cache.delete(STATS_KEY)
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.views.generic import View
 from .forms import UserLoginForm, UserRegistrationForm, UserUpdateForm
 from .models import User
+from .stats import get_dashboard_stats
 
 
 class LoginView(View):
@@ -82,7 +83,7 @@ def dashboard_view(request):
     user = request.user
     
     if user.is_admin() or user.is_superuser:
-        return render(request, 'dashboard_admin.html')
+        return render(request, 'dashboard_admin.html', {'stats': get_dashboard_stats()})
     elif user.is_teacher():
         return render(request, 'dashboard_teacher.html')
     else:  # student
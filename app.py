@@ -13,21 +13,83 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'mysql+py
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 
+# Пул соединений: pool_recycle меньше wait_timeout MySQL, pre_ping проверяет
+# соединение перед выдачей, поэтому закрытые сервером соединения не доходят до запроса
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    from services.pool_metrics import InstrumentedQueuePool
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+    }
+
+# Реплика для чтения расписания (services/replicas.py); после своей записи
+# пользователь читает с основной БД REPLICA_STICKY_SECONDS секунд
+if os.environ.get('REPLICA_DATABASE_URL'):
+    app.config['SQLALCHEMY_BINDS'] = {'replica': os.environ['REPLICA_DATABASE_URL']}
+app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+# Реплика требует кэша 'redis'; 1 - разрешить 'lru' (только один процесс)
+app.config['REPLICA_ALLOW_LOCAL_CACHE'] = os.environ.get('REPLICA_ALLOW_LOCAL_CACHE') == '1'
+
+# Кэш расписания: 'lru' (в памяти процесса) или 'redis'
+app.config['SCHEDULE_CACHE_BACKEND'] = os.environ.get('SCHEDULE_CACHE_BACKEND', 'lru')
+app.config['SCHEDULE_CACHE_TIMEOUT'] = int(os.environ.get('SCHEDULE_CACHE_TIMEOUT', 300))
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Как часто процесс сверяет расписание звонков с таблицей lesson_times, секунд
+app.config['BELL_SCHEDULE_CHECK_INTERVAL'] = int(os.environ.get('BELL_SCHEDULE_CHECK_INTERVAL', 10))
+
+# Время жизни кэша пользователя (user_loader), секунд
+app.config['IDENTITY_CACHE_TTL'] = int(os.environ.get('IDENTITY_CACHE_TTL', 30))
+
+# Время жизни статистики панели администратора, секунд
+app.config['ADMIN_STATS_TTL'] = int(os.environ.get('ADMIN_STATS_TTL', 60))
+
+# Размер страницы списков с курсорной пагинацией
+app.config['ADMIN_PAGE_SIZE'] = 50
+app.config['NOTES_PAGE_SIZE'] = 30
+
+# Ограничения API расписания за период
+app.config['SCHEDULE_RANGE_MAX_DAYS'] = 62
+app.config['SCHEDULE_RANGE_MAX_GROUPS'] = 20
+
+# Максимальный период поиска свободных аудиторий, дней (семестр)
+app.config['FREE_ROOMS_MAX_DAYS'] = 183
+
+# Максимальный горизонт подбора слотов для переноса занятия, дней
+app.config['RESCHEDULE_MAX_DAYS'] = 62
+
 # Инициализация расширений
-from extensions import db, login_manager, migrate
+from extensions import db, login_manager, migrate, cache
 
 db.init_app(app)
 migrate.init_app(app, db)
+cache.init_app(app)
 login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Пожалуйста, войдите в систему'
 
-# Импорт моделей
-from models import User
+# Счетчики пулов соединений всех привязок (/admin/metrics/pool)
+from services.pool_metrics import instrument_engine, bind_name
+
+with app.app_context():
+    for key, engine in db.engines.items():
+        instrument_engine(engine, bind_name(key))
+
+# Чтение расписания с реплики
+from services.replicas import init_replicas
+
+init_replicas(app)
+
+# Загрузка пользователя вместе с профилем (с кэшем между запросами)
+from services.identity import load_identity
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return load_identity(int(user_id))
 
 # Импорт и регистрация blueprints
 from routes import auth, admin, teacher, student, schedule
@@ -0,0 +1,67 @@
+"""
+Трафик и задержка клиента, опрашивающего расписание группы
+
+Клиент раз за разом запрашивает /schedule/api/schedule/<группа>/<дата> двумя
+способами: без валидаторов (каждый раз полный ответ) и с If-None-Match
+из предыдущего ответа (304 без тела, пока расписание не изменилось).
+Для каждого способа выводятся байты ответов, средняя и p95 задержка.
+
+Запуск: python benchmark_conditional.py <id группы> [ГГГГ-ММ-ДД] [опросов]
+"""
+import sys
+import time
+from datetime import datetime
+
+from app import app
+from models import User
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def poll(label, client, url, polls, conditional):
+    etag = None
+    latencies = []
+    total_bytes = 0
+    statuses = {}
+    for _ in range(polls):
+        headers = {'If-None-Match': etag} if conditional and etag else {}
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        body = response.get_data()
+        latencies.append(time.perf_counter() - started)
+        # Тело плюс строка статуса и заголовки, как их получит клиент
+        total_bytes += len(body) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        etag = response.headers.get('ETag', etag)
+    print(f'  {label}: {total_bytes} байт, в среднем {total_bytes // polls} байт на опрос, '
+          f'задержка ср. {sum(latencies) / polls * 1000:.2f} мс, p95 {percentile(latencies, 0.95) * 1000:.2f} мс, '
+          f'ответы {statuses}')
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit('Укажите id группы')
+    group_id = int(sys.argv[1])
+    day = datetime.strptime(sys.argv[2], '%Y-%m-%d').date() if len(sys.argv) > 2 else datetime.now().date()
+    polls = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    with app.app_context():
+        user = User.query.filter_by(role='admin').first()
+        if user is None:
+            sys.exit('Нет администратора для входа (python init_db.py)')
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+
+        url = f'/schedule/api/schedule/{group_id}/{day}'
+        print(f'{url}, опросов: {polls}')
+        poll('без валидаторов', client, url, polls, conditional=False)
+        poll('If-None-Match', client, url, polls, conditional=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Сравнение битовых масок занятости (services.occupancy) с запросами к schedules
+
+Для недели и набора групп ищутся общие свободные слоты двумя способами:
+запросом занятых слотов к БД и операциями над масками из памяти процесса.
+
+Запуск: python benchmark_occupancy.py [ГГГГ-ММ-ДД] [число групп]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app import app
+from extensions import db
+from models import Schedule, Group
+from services.bell_schedule import get_bell_schedule
+from services.occupancy import get_week, invalidate_occupancy
+from services.schedule_queries import week_bounds
+
+REPEAT = 200
+
+
+def sql_common_free(group_ids, week_start, week_end, bells):
+    busy = set(db.session.query(Schedule.date, Schedule.lesson_time_id).filter(
+        Schedule.is_active == True,
+        Schedule.group_id.in_(group_ids),
+        Schedule.date >= week_start,
+        Schedule.date <= week_end
+    ).distinct())
+    return [(week_start + timedelta(days=offset), slot.id)
+            for offset in range(6) for slot in bells
+            if (week_start + timedelta(days=offset), slot.id) not in busy]
+
+
+def bits_common_free(group_ids, week_start):
+    week = get_week(week_start)
+    return week.slots(week.common_free([('group', group_id) for group_id in group_ids]))
+
+
+def measure(label, func):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func()
+    elapsed = (time.perf_counter() - started) / REPEAT
+    print(f'  {label}: {elapsed * 1000:.3f} мс, свободных слотов {len(result)}')
+    return result
+
+
+def main():
+    day = datetime.strptime(sys.argv[1], '%Y-%m-%d').date() if len(sys.argv) > 1 else datetime.now().date()
+    groups_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    
+    with app.app_context():
+        week_start, week_end = week_bounds(day)
+        group_ids = [g.id for g in Group.query.order_by(Group.id).limit(groups_count)]
+        bells = get_bell_schedule()
+        print(f'Неделя {week_start} - {week_end}, групп: {len(group_ids)}, повторов: {REPEAT}')
+        
+        invalidate_occupancy(week_start)
+        started = time.perf_counter()
+        get_week(week_start)
+        print(f'  построение недели: {(time.perf_counter() - started) * 1000:.3f} мс')
+        
+        sql_result = measure('SQL', lambda: sql_common_free(group_ids, week_start, week_end, bells))
+        bits_result = measure('битовые маски', lambda: bits_common_free(group_ids, week_start))
+        
+        print('Результаты совпадают' if sorted(sql_result) == sorted(bits_result) else 'РЕЗУЛЬТАТЫ РАЗЛИЧАЮТСЯ')
+
+
+if __name__ == '__main__':
+    main()
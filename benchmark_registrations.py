@@ -0,0 +1,77 @@
+"""
+Время пакетного подтверждения заявок на регистрацию
+
+Создает N заявок (студенты с группой, студенты без группы и
+преподаватели), подтверждает их одним вызовом services.registrations
+.approve_pending, как это делает /admin/pending-users/bulk, и выводит
+время и число SQL-запросов. Созданные пользователи, профили и группа
+затем удаляются. Запускать на тестовой базе.
+
+Запуск: python benchmark_registrations.py [заявок]
+"""
+import sys
+import time
+
+from sqlalchemy import delete, event, insert, select
+
+from app import app
+from extensions import db
+from models import User, PendingUser, Group, Student, Teacher
+from services.registrations import approve_pending
+
+PREFIX = 'bench_reg_'
+
+
+def create_pending(count, group_id):
+    roles = ('student', 'student', 'teacher')
+    db.session.execute(insert(PendingUser), [{
+        'username': f'{PREFIX}{i}',
+        'email': f'{PREFIX}{i}@bench.local',
+        'password_hash': '-',
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'requested_role': roles[i % 3],
+        # Остальные студенты без группы - получат группу из параметра
+        'group_id': group_id if i % 6 == 0 else None
+    } for i in range(count)])
+    db.session.commit()
+    return list(db.session.execute(select(PendingUser.id).where(PendingUser.username.like(f'{PREFIX}%'))).scalars())
+
+
+def cleanup(group_id):
+    users = select(User.id).where(User.username.like(f'{PREFIX}%')).scalar_subquery()
+    db.session.execute(delete(Student).where(Student.user_id.in_(users)))
+    db.session.execute(delete(Teacher).where(Teacher.user_id.in_(users)))
+    db.session.execute(delete(User).where(User.username.like(f'{PREFIX}%')))
+    db.session.execute(delete(PendingUser).where(PendingUser.username.like(f'{PREFIX}%')))
+    db.session.execute(delete(Group).where(Group.id == group_id))
+    db.session.commit()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with app.app_context():
+        group = Group(name=f'{PREFIX}group', course=1)
+        db.session.add(group)
+        db.session.commit()
+        group_id = group.id
+        try:
+            ids = create_pending(count, group_id)
+            statements = []
+
+            def record(*args):
+                statements.append(1)
+
+            event.listen(db.engine, 'before_cursor_execute', record)
+            started = time.perf_counter()
+            approved, skipped = approve_pending(ids, group_id=group_id)
+            elapsed = time.perf_counter() - started
+            event.remove(db.engine, 'before_cursor_execute', record)
+            print(f'Заявок {count}: подтверждено {approved}, пропущено {skipped}, '
+                  f'{elapsed * 1000:.0f} мс, SQL-запросов {len(statements)}')
+        finally:
+            cleanup(group_id)
+
+
+if __name__ == '__main__':
+    main()
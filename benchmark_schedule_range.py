@@ -0,0 +1,70 @@
+"""
+Сравнение API расписания за период с последовательностью запросов по дням
+
+Для группы и периода расписание получается двумя способами: одним вызовом
+/schedule/api/schedule/range и отдельным вызовом /schedule/api/schedule/<группа>/<дата>
+на каждый день. Для каждого способа выводятся время, число HTTP-запросов,
+SQL-запросов и байт ответа; кэш недель сбрасывается перед каждым повтором.
+
+Запуск: python benchmark_schedule_range.py <id группы> [ГГГГ-ММ-ДД начала] [дней]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import app
+from extensions import db, cache
+from models import User
+
+REPEAT = 5
+
+
+def measure(label, client, urls):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    total_bytes = 0
+    started = time.perf_counter()
+    try:
+        for _ in range(REPEAT):
+            cache.clear()
+            for url in urls:
+                response = client.get(url)
+                total_bytes += len(response.get_data())
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    elapsed = (time.perf_counter() - started) / REPEAT
+    print(f'  {label}: {elapsed * 1000:.1f} мс, HTTP-запросов {len(urls)}, '
+          f'SQL-запросов {len(statements) // REPEAT}, ответ {total_bytes // REPEAT} байт')
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit('Укажите id группы')
+    group_id = int(sys.argv[1])
+    start = datetime.strptime(sys.argv[2], '%Y-%m-%d').date() if len(sys.argv) > 2 else datetime.now().date()
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    end = start + timedelta(days=days - 1)
+
+    with app.app_context():
+        user = User.query.filter_by(role='admin').first()
+        if user is None:
+            sys.exit('Нет администратора для входа (python init_db.py)')
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+
+        print(f'Группа {group_id}, {start} - {end} ({days} дн.), повторов: {REPEAT}')
+        measure('по дням', client, [f'/schedule/api/schedule/{group_id}/{start + timedelta(days=offset)}'
+                                    for offset in range(days)])
+        measure('за период', client, [f'/schedule/api/schedule/range?group={group_id}&from={start}&to={end}'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Проверка маршрутизации запросов Flask между основной БД и репликой
+
+Показывает, к какой БД уйдет чтение занятий в разных ситуациях. Запросы к
+БД не выполняются, данные не меняются.
+
+Запуск (например, на двух файлах SQLite):
+  DATABASE_URL=sqlite:///primary.db REPLICA_DATABASE_URL=sqlite:///replica.db \
+  REPLICA_ALLOW_LOCAL_CACHE=1 python check_replicas.py
+"""
+import time
+
+from app import app
+from extensions import db
+from models import Schedule, User
+from services.replicas import PIN_COOKIE, REPLICA_BIND
+
+
+def bind_name(mapper):
+    engine = db.session.get_bind(mapper=mapper)
+    return REPLICA_BIND if engine is db.engines.get(REPLICA_BIND) else 'primary'
+
+
+def report(label, actual, expected):
+    print(f"[{'OK' if actual == expected else 'ОШИБКА'}] {label}: {actual}")
+    return actual == expected
+
+
+def check(label, mapper, expected, wrote=False, **request_kwargs):
+    with app.test_request_context('/schedule/api/week', **request_kwargs):
+        app.preprocess_request()
+        if wrote:
+            db.session.info['db_wrote'] = True
+        actual = bind_name(mapper)
+        db.session.remove()
+    return report(label, actual, expected)
+
+
+def main():
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        print('REPLICA_DATABASE_URL не задан - все запросы идут на основную БД')
+        return
+
+    pinned = str(int(time.time()) + app.config['REPLICA_STICKY_SECONDS'])
+    results = [
+        check('GET, занятия', Schedule, REPLICA_BIND),
+        check('GET, пользователи', User, 'primary'),
+        check('POST, занятия', Schedule, 'primary', method='POST'),
+        check('GET после своей записи (cookie)', Schedule, 'primary',
+              headers={'Cookie': f'{PIN_COOKIE}={pinned}'}),
+        check('GET после записи в этом же запросе', Schedule, 'primary', wrote=True),
+    ]
+    with app.app_context():
+        results.append(report('вне запроса (скрипты)', bind_name(Schedule), 'primary'))
+    print('Готово' if all(results) else 'Есть ошибки маршрутизации')
+
+
+if __name__ == '__main__':
+    main()
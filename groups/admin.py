@@ -7,10 +7,15 @@ class GroupAdmin(admin.ModelAdmin):
     list_display = ('name', 'course', 'faculty', 'head_student', 'get_students_count')
     list_filter = ('course', 'faculty')
     search_fields = ('name', 'faculty')
+    list_select_related = ('head_student__user',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_students_count()
     
     def get_students_count(self, obj):
         return obj.get_students_count()
     get_students_count.short_description = 'Количество студентов'
+    get_students_count.admin_order_field = 'students_total'
 
 
 @admin.register(Subject)
@@ -2,6 +2,13 @@ from django.db import models
 from accounts.models import User
 
 
+class GroupQuerySet(models.QuerySet):
+    
+    def with_students_count(self):
+        """Количество студентов каждой группы в том же запросе"""
+        return self.annotate(students_total=models.Count('students'))
+
+
 class Group(models.Model):
     """Группа студентов"""
     
@@ -30,6 +37,8 @@ class Group(models.Model):
         verbose_name='Дата создания'
     )
     
+    objects = GroupQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Группа'
         verbose_name_plural = 'Группы'
@@ -39,6 +48,9 @@ class Group(models.Model):
         return f"{self.name} ({self.course} курс)"
     
     def get_students_count(self):
+        # В списках количество приходит аннотацией (GroupQuerySet.with_students_count)
+        if hasattr(self, 'students_total'):
+            return self.students_total
         return self.students.count()
 
 
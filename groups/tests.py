@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User, StudentProfile
+from .models import Group
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class GroupsListQueriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', password='-', role='teacher')
+
+    def create_groups(self, start, count):
+        """Группы по три студента, последний - староста"""
+        for index in range(start, start + count):
+            group = Group.objects.create(name=f'Г-{index}', course=1, faculty='ФИТ')
+            for number in range(3):
+                user = User.objects.create_user(f's{index}-{number}', password='-', role='student',
+                                                first_name='Имя', last_name=f'Староста{index}')
+                student = StudentProfile.objects.create(user=user, student_id=f'S{index}-{number}',
+                                                        group=group, enrollment_year=2025)
+            group.head_student = student
+            group.save()
+
+    def get_list(self):
+        response = self.client.get(reverse('groups:groups_list'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_depend_on_groups(self):
+        self.client.force_login(self.user)
+        self.create_groups(0, 1)
+        with CaptureQueriesContext(connection) as one_group:
+            self.get_list()
+
+        self.create_groups(1, 9)
+        with self.assertNumQueries(len(one_group.captured_queries)):
+            response = self.get_list()
+
+        self.assertContains(response, 'Староста9')
+        self.assertContains(response, 'Студентов:</strong> 3', count=10)
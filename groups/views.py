@@ -8,7 +8,7 @@ from accounts.models import TeacherProfile, StudentProfile
 @login_required
 def groups_list_view(request):
     """Список всех групп"""
-    groups = Group.objects.all()
+    groups = Group.objects.with_students_count().select_related('head_student__user')
     context = {
         'groups': groups
     }
@@ -0,0 +1,133 @@
+"""
+Скрипт импорта студентов из CSV
+Создает пользователей, профили студентов и недостающие группы
+
+Столбцы CSV: username, email, first_name, last_name, group, course (необязателен),
+password (необязателен - если пуст, пароль генерируется и записывается в --output).
+Повторы логина или email внутри файла пропускаются (остается первая строка),
+как и строки с логином или email, уже занятыми в БД; email везде сравнивается
+без учета регистра. Неверный course останавливает импорт до записи в БД.
+Хэширование паролей нагружает процессор, поэтому выполняется в пуле
+процессов на всех ядрах; вставка идет пачками по --batch строк. Чтение CSV,
+отбор повторов и хэширование в пуле - общие с командой Django (student_csv.py).
+
+Запуск:
+  python import_students.py students.csv [--workers N] [--batch 500] [--output passwords.csv]
+  python import_students.py --benchmark [--sample 200]
+"""
+import argparse
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from werkzeug.security import generate_password_hash
+
+from student_csv import read_rows, invalid_courses, unique_rows, password_writer, hash_passwords, benchmark
+
+
+def import_students(rows, workers, batch_size, output):
+    # Приложение импортируется здесь, а не в начале модуля: процессы пула
+    # (при запуске через spawn) повторно импортируют этот файл
+    from app import app
+    from extensions import db
+    from models import User, Student, Group
+    from services.stats import invalidate_dashboard_stats
+    from sqlalchemy import func, insert, select
+
+    year = datetime.now().year
+    rows, skipped = unique_rows(rows)
+    created = 0
+    started = time.perf_counter()
+
+    with app.app_context(), ProcessPoolExecutor(max_workers=workers) as pool, password_writer(output) as writer:
+        groups = {g.name: g.id for g in Group.query.all()}
+        for name, course in {(r['group'], r.get('course') or '1') for r in rows if r.get('group')}:
+            if name not in groups:
+                group = Group(name=name, course=int(course))
+                db.session.add(group)
+                db.session.flush()
+                groups[name] = group.id
+        db.session.commit()
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            taken_usernames = set(db.session.execute(select(User.username).where(
+                User.username.in_([r['username'] for r in batch])
+            )).scalars())
+            # Email сравнивается без учета регистра, как и повторы внутри файла
+            taken_emails = set(db.session.execute(select(func.lower(User.email)).where(
+                func.lower(User.email).in_([r['email'].lower() for r in batch])
+            )).scalars())
+            batch = [r for r in batch if r.get('group') and r['username'] not in taken_usernames
+                     and r['email'].lower() not in taken_emails]
+            skipped += len(rows[start:start + batch_size]) - len(batch)
+            if not batch:
+                continue
+
+            passwords = [r.get('password') or secrets.token_urlsafe(9) for r in batch]
+            hashes = hash_passwords(pool, generate_password_hash, passwords, workers)
+
+            db.session.execute(insert(User), [{
+                'username': r['username'],
+                'email': r['email'],
+                'password_hash': password_hash,
+                'first_name': r['first_name'],
+                'last_name': r['last_name'],
+                'role': 'student'
+            } for r, password_hash in zip(batch, hashes)])
+            user_ids = dict(db.session.execute(
+                select(User.username, User.id).where(User.username.in_([r['username'] for r in batch]))
+            ).all())
+            db.session.execute(insert(Student), [{
+                'user_id': user_ids[r['username']],
+                'student_id': f"STU{user_ids[r['username']]:06d}",
+                'group_id': groups[r['group']],
+                'enrollment_year': year
+            } for r in batch])
+            db.session.commit()
+
+            if writer:
+                writer.writerows((r['username'], password) for r, password in zip(batch, passwords)
+                                 if not r.get('password'))
+            created += len(batch)
+            print(f'  {start + len(rows[start:start + batch_size])}/{len(rows)}: создано {created}, '
+                  f'пропущено {skipped}, {time.perf_counter() - started:.1f} с')
+
+        invalidate_dashboard_stats()
+
+    return created, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Импорт студентов из CSV')
+    parser.add_argument('csv_file', nargs='?', help='CSV-файл со студентами')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Процессов для хэширования')
+    parser.add_argument('--batch', type=int, default=500, help='Строк в одной пачке вставки')
+    parser.add_argument('--output', help='Куда записать сгенерированные пароли (CSV)')
+    parser.add_argument('--benchmark', action='store_true', help='Замерить ускорение хэширования')
+    parser.add_argument('--sample', type=int, default=200, help='Паролей для замера')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(generate_password_hash, args.sample, print)
+        return
+    if not args.csv_file:
+        parser.error('Не указан CSV-файл')
+
+    rows = read_rows(args.csv_file)
+    bad_courses = invalid_courses(rows)
+    if bad_courses:
+        sys.exit(f"Неверный курс (ожидается целое число от 1) в строках: {', '.join(map(str, bad_courses))}")
+    if any(not r.get('password') for r in rows) and not args.output:
+        sys.exit('Для строк без пароля нужен --output, куда записать сгенерированные пароли')
+
+    print(f'Импорт {len(rows)} строк, процессов: {args.workers}, пачка: {args.batch}')
+    created, skipped = import_students(rows, args.workers, args.batch, args.output)
+    print(f'Готово: создано {created}, пропущено {skipped}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,8 @@
 Скрипт инициализации базы данных
 Создает таблицы и заполняет начальными данными
 """
+from flask_migrate import upgrade
+
 from app import app
 from extensions import db
 from models import User, Group, LessonTime
@@ -11,8 +13,10 @@ from datetime import time
 def init_database():
     """Инициализация базы данных"""
     with app.app_context():
+        # Схема создается миграциями (migrations/), чтобы база сразу была на
+        # последней ревизии и дальше обновлялась через flask db upgrade
         print("Создание таблиц...")
-        db.create_all()
+        upgrade()
         
         # Создание администратора
         print("\nСоздание администратора...")
@@ -0,0 +1,41 @@
+"""
+Общие функции keyset-пагинации (по курсору)
+
+Используются Flask-версией (services/pagination.py) и приложением Django
+(schedules/pagination.py). Списки упорядочены по (created_at DESC, id DESC);
+курсор хранит ключ последней строки страницы. Модуль зависит только от
+стандартной библиотеки: условие "после курсора" и сортировку строит ORM
+вызывающего кода.
+"""
+from collections import namedtuple
+from datetime import datetime
+import base64
+
+KeysetPage = namedtuple('KeysetPage', 'items next_cursor')
+
+
+def encode_cursor(created_at, row_id):
+    raw = f'{created_at.isoformat()}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) из курсора; None для пустого или поврежденного курсора"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        return None
+
+
+def make_page(rows, per_page):
+    """Страница из per_page + 1 прочитанных строк: лишняя строка означает, что есть следующая"""
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return KeysetPage(items, next_cursor)
@@ -0,0 +1,72 @@
+"""
+Общая классификация пересечений занятий (группа, преподаватель, аудитория)
+
+Используется Flask-версией (services/conflicts.py) и приложением Django
+(schedules/conflicts.py): каждая выбирает из своей БД существующие занятия
+охватываемого периода, а пересечения - как с ними, так и внутри самого
+набора - находятся здесь, в памяти. Модуль зависит только от стандартной
+библиотеки.
+
+Совместное занятие (поток) - один преподаватель, предмет, тип и аудитория
+у нескольких групп в одно время - пересечением не считается.
+"""
+from collections import namedtuple
+
+LessonProposal = namedtuple(
+    'LessonProposal',
+    'group_id teacher_id subject_id lesson_time_id date classroom lesson_type id',
+    defaults=('lecture', None)
+)
+
+# index - позиция proposal во входном наборе (одинаковые предложения различаются только ею)
+Conflict = namedtuple('Conflict', 'kind proposal existing_id index')
+
+CONFLICT_MESSAGES = {
+    'group': 'У группы уже есть занятие',
+    'teacher': 'Преподаватель уже ведет занятие',
+    'classroom': 'Аудитория уже занята',
+}
+
+
+def strip_classroom(proposal):
+    """Предложение с номером аудитории без пробелов по краям"""
+    return proposal._replace(classroom=(proposal.classroom or '').strip())
+
+
+def is_joint(a, b):
+    """Совместное занятие нескольких групп"""
+    return (a.teacher_id == b.teacher_id and a.subject_id == b.subject_id
+            and a.lesson_type == b.lesson_type and a.classroom == b.classroom)
+
+
+def compare(p, other):
+    """Виды пересечения двух занятий в одном слоте"""
+    kinds = []
+    if p.group_id == other.group_id:
+        kinds.append('group')
+    if not is_joint(p, other):
+        if p.teacher_id == other.teacher_id:
+            kinds.append('teacher')
+        if p.classroom and p.classroom == other.classroom:
+            kinds.append('classroom')
+    return kinds
+
+
+def detect(proposals, existing):
+    """
+    Пересечения набора proposals с существующими занятиями existing и
+    между собой; оба списка - LessonProposal с очищенной аудиторией
+    """
+    # Занятия по слотам (дата, время): сначала существующие, затем уже проверенные из набора
+    by_slot = {}
+    for other in existing:
+        by_slot.setdefault((other.date, other.lesson_time_id), []).append(other)
+
+    conflicts = []
+    for index, p in enumerate(proposals):
+        slot = by_slot.setdefault((p.date, p.lesson_time_id), [])
+        for other in slot:
+            for kind in compare(p, other):
+                conflicts.append(Conflict(kind, p, other.id, index))
+        slot.append(p)
+    return conflicts
@@ -0,0 +1,80 @@
+"""
+Нагрузочная проверка пула соединений
+
+Несколько потоков параллельно выполняют короткий запрос к БД (как запрос
+страницы расписания: взять соединение, выполнить SELECT, вернуть), для
+каждого числа потоков выводятся перцентили задержки и метрики пула.
+
+Запуск: python loadtest_pool.py [запросов на поток] [потоки через запятую]
+Пример: python loadtest_pool.py 200 1,8,32,64
+"""
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+
+from app import app
+from extensions import db
+from services.pool_metrics import engine_metrics, reset_all
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def run(workers, requests_per_worker):
+    # db.engine требует контекста приложения, а потоки его не наследуют
+    engine = db.engine
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    
+    def worker():
+        own = []
+        try:
+            for _ in range(requests_per_worker):
+                started = time.perf_counter()
+                with engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+                own.append(time.perf_counter() - started)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        with lock:
+            latencies.extend(own)
+    
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    # Ошибка в потоке не должна превращаться в "0 запр/с"
+    if errors:
+        raise errors[0]
+    return latencies, elapsed
+
+
+def main():
+    requests_per_worker = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    worker_counts = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 8, 32, 64]
+    
+    with app.app_context():
+        print(f"Пул: {app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}")
+        for workers in worker_counts:
+            reset_all()
+            latencies, elapsed = run(workers, requests_per_worker)
+            snapshot = engine_metrics['default'].snapshot(db.engine)
+            print(f'потоков {workers:3d}: {len(latencies) / elapsed:8.0f} запр/с, '
+                  f'p50 {percentile(latencies, 0.5) * 1000:.2f} мс, '
+                  f'p95 {percentile(latencies, 0.95) * 1000:.2f} мс, '
+                  f'p99 {percentile(latencies, 0.99) * 1000:.2f} мс, '
+                  f"ожидание пула ср. {snapshot['wait_avg_ms']} мс / макс. {snapshot['wait_max_ms']} мс, "
+                  f"соединений открыто {snapshot['connects']}, таймаутов {snapshot['timeouts']}")
+
+
+if __name__ == '__main__':
+    main()
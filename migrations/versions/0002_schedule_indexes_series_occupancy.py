@@ -0,0 +1,119 @@
+"""Индексы расписания, серии занятий и маски занятости
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 19:47:56.850143
+
+- составные индексы выборок расписания по группе/преподавателю за период
+  и занятости аудиторий;
+- индексы курсорной пагинации списков пользователей, заявок и заметок;
+- таблицы lesson_series и occupancy_weeks, столбец schedules.series_id;
+- вычисляемый столбец schedules.active_slot и уникальный индекс
+  uq_schedules_group_slot (одно активное занятие группы в слоте).
+
+Базу, которую обновлял прежний upgrade_db.py, ревизия тоже доводит до
+текущей схемы: уже созданные им таблицы, столбец и индексы пропускаются,
+а частичный uq_schedules_group_slot пересоздается с active_slot.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# Индексы существующих таблиц: (таблица, имя, столбцы)
+INDEXES = [
+    ('schedules', 'ix_schedules_group_active_date', ['group_id', 'is_active', 'date', 'lesson_time_id']),
+    ('schedules', 'ix_schedules_teacher_active_date', ['teacher_id', 'is_active', 'date', 'lesson_time_id']),
+    ('schedules', 'ix_schedules_classroom_date', ['classroom', 'date']),
+    ('schedules', 'ix_schedules_series_id', ['series_id']),
+    ('users', 'ix_users_created_id', ['created_at', 'id']),
+    ('pending_users', 'ix_pending_users_created_id', ['created_at', 'id']),
+    ('notes', 'ix_notes_user_created_id', ['user_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'lesson_series' not in tables:
+        op.create_table('lesson_series',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('lesson_time_id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('week_parity', sa.Integer(), nullable=True),
+        sa.Column('lesson_type', sa.String(length=20), nullable=True),
+        sa.Column('classroom', sa.String(length=20), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ),
+        sa.ForeignKeyConstraint(['lesson_time_id'], ['lesson_times.id'], ),
+        sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'occupancy_weeks' not in tables:
+        op.create_table('occupancy_weeks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('owner', sa.String(length=50), nullable=False),
+        sa.Column('bell_version', sa.String(length=32), nullable=False),
+        sa.Column('bits', sa.String(length=32), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('week_start', 'kind', 'owner', name='uq_occupancy_weeks_entity')
+        )
+
+    columns = {c['name'] for c in inspector.get_columns('schedules')}
+    foreign_keys = {tuple(fk['constrained_columns']) for fk in inspector.get_foreign_keys('schedules')}
+    indexes = {(table, index['name']) for table in ('schedules', 'users', 'pending_users', 'notes')
+               for index in inspector.get_indexes(table)}
+
+    # Частичный индекс прежней версии (SQLite/PostgreSQL) заменяется индексом с active_slot
+    if ('schedules', 'uq_schedules_group_slot') in indexes:
+        op.drop_index('uq_schedules_group_slot', table_name='schedules')
+
+    # SQLite не добавляет хранимый вычисляемый столбец через ALTER TABLE и не
+    # добавляет внешний ключ к существующей таблице - batch-режим пересоздает
+    # таблицу schedules с новыми столбцами; MySQL и PostgreSQL выполняют ALTER
+    with op.batch_alter_table('schedules', schema=None) as batch_op:
+        if 'series_id' not in columns:
+            batch_op.add_column(sa.Column('series_id', sa.Integer(), nullable=True))
+        # upgrade_db.py на SQLite добавлял series_id без внешнего ключа
+        if ('series_id',) not in foreign_keys:
+            batch_op.create_foreign_key('fk_schedules_series_id', 'lesson_series', ['series_id'], ['id'])
+        batch_op.add_column(sa.Column('active_slot', sa.SmallInteger(),
+                                      sa.Computed('CASE WHEN is_active THEN 1 END', persisted=True),
+                                      nullable=True))
+
+    for table, name, index_columns in INDEXES:
+        if (table, name) not in indexes:
+            op.create_index(name, table, index_columns, unique=False)
+    op.create_index('uq_schedules_group_slot', 'schedules',
+                    ['group_id', 'date', 'lesson_time_id', 'active_slot'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_schedules_group_slot', table_name='schedules')
+    for table, name, index_columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    with op.batch_alter_table('schedules', schema=None) as batch_op:
+        batch_op.drop_column('active_slot')
+        batch_op.drop_constraint('fk_schedules_series_id', type_='foreignkey')
+        batch_op.drop_column('series_id')
+
+    op.drop_table('occupancy_weeks')
+    op.drop_table('lesson_series')
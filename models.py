@@ -1,14 +1,19 @@
 """
 Модели базы данных для системы управления расписанием
-9 таблиц: User, PendingUser, Group, Subject, Teacher, Student, Schedule, LessonTime, Note
+11 таблиц: User, PendingUser, Group, Subject, Teacher, Student, Schedule, LessonTime, Note, LessonSeries,
+OccupancyWeek
 """
 from extensions import db
 from flask_login import UserMixin
+from sqlalchemy import func, select
 from datetime import datetime
 
 class User(UserMixin, db.Model):
     """Таблица 1: Пользователи системы"""
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
@@ -36,6 +41,9 @@ class User(UserMixin, db.Model):
 class PendingUser(db.Model):
     """Таблица 2: Ожидающие подтверждения пользователи"""
     __tablename__ = 'pending_users'
+    __table_args__ = (
+        db.Index('ix_pending_users_created_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -74,7 +82,8 @@ class Group(db.Model):
         return f'<Group {self.name}>'
     
     def get_students_count(self):
-        return len(self.students)
+        # Счетчик считается в SQL (column_property ниже), без загрузки студентов
+        return self.students_count
 
 
 class Subject(db.Model):
@@ -129,6 +138,14 @@ class Student(db.Model):
         return f'<Student {self.user.get_full_name()}>'
 
 
+# Количество студентов группы одним подзапросом; в списках групп
+# подгружается вместе с группами через undefer(Group.students_count)
+Group.students_count = db.column_property(
+    select(func.count(Student.id)).where(Student.group_id == Group.id).correlate_except(Student).scalar_subquery(),
+    deferred=True
+)
+
+
 class LessonTime(db.Model):
     """Таблица 7: Расписание звонков"""
     __tablename__ = 'lesson_times'
@@ -152,6 +169,17 @@ class LessonTime(db.Model):
 class Schedule(db.Model):
     """Таблица 8: Расписание занятий"""
     __tablename__ = 'schedules'
+    __table_args__ = (
+        # Выборки по группе/преподавателю за период с сортировкой по времени пары
+        db.Index('ix_schedules_group_active_date', 'group_id', 'is_active', 'date', 'lesson_time_id'),
+        db.Index('ix_schedules_teacher_active_date', 'teacher_id', 'is_active', 'date', 'lesson_time_id'),
+        # Список аудиторий и занятость аудитории по датам
+        db.Index('ix_schedules_classroom_date', 'classroom', 'date'),
+        # Одно активное занятие группы в слоте. MySQL не поддерживает частичные
+        # индексы, поэтому в уникальный индекс входит active_slot: у отключенных
+        # занятий он NULL, а NULL не совпадает ни с чем
+        db.Index('uq_schedules_group_slot', 'group_id', 'date', 'lesson_time_id', 'active_slot', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
@@ -163,7 +191,10 @@ class Schedule(db.Model):
     classroom = db.Column(db.String(20), nullable=False)
     date = db.Column(db.Date, nullable=False, index=True)
     is_active = db.Column(db.Boolean, default=True)
+    # 1 у активного занятия, NULL у отключенного (вычисляется БД)
+    active_slot = db.Column(db.SmallInteger, db.Computed('CASE WHEN is_active THEN 1 END', persisted=True))
     notes = db.Column(db.Text)
+    series_id = db.Column(db.Integer, db.ForeignKey('lesson_series.id'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -178,15 +209,25 @@ class Schedule(db.Model):
                    4: 'Четверг', 5: 'Пятница', 6: 'Суббота'}
         return weekdays.get(self.weekday, '')
     
+    LESSON_TYPES = {'lecture': 'Лекция', 'practice': 'Практика', 
+                    'lab': 'Лабораторная', 'seminar': 'Семинар'}
+    
     def get_lesson_type_display(self):
-        types = {'lecture': 'Лекция', 'practice': 'Практика', 
-                'lab': 'Лабораторная', 'seminar': 'Семинар'}
-        return types.get(self.lesson_type, self.lesson_type)
+        return self.LESSON_TYPES.get(self.lesson_type, self.lesson_type)
+    
+    def get_time_range(self):
+        """Время занятия из снимка расписания звонков (без запроса к lesson_times)"""
+        from services.bell_schedule import get_bell_schedule
+        slot = get_bell_schedule().get(self.lesson_time_id)
+        return slot.get_time_range() if slot else ''
 
 
 class Note(db.Model):
     """Таблица 9: Заметки студентов к занятиям"""
     __tablename__ = 'notes'
+    __table_args__ = (
+        db.Index('ix_notes_user_created_id', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -197,3 +238,46 @@ class Note(db.Model):
     
     def __repr__(self):
         return f'<Note by {self.user.username}>'
+
+
+class LessonSeries(db.Model):
+    """Таблица 10: Повторяющиеся занятия (еженедельный шаблон)"""
+    __tablename__ = 'lesson_series'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
+    lesson_time_id = db.Column(db.Integer, db.ForeignKey('lesson_times.id'), nullable=False)
+    weekday = db.Column(db.Integer, nullable=False)  # 1-6 (Пн-Сб)
+    week_parity = db.Column(db.Integer, default=0)  # 0 - каждую неделю, 1 - нечетные, 2 - четные
+    lesson_type = db.Column(db.String(20), default='lecture')
+    classroom = db.Column(db.String(20), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Связи
+    lessons = db.relationship('Schedule', backref='series', lazy='dynamic')
+    
+    def __repr__(self):
+        return f'<LessonSeries {self.id}: weekday {self.weekday}>'
+
+
+class OccupancyWeek(db.Model):
+    """Таблица 11: Битовые маски занятости на неделю (для теплого старта services.occupancy)"""
+    __tablename__ = 'occupancy_weeks'
+    __table_args__ = (
+        db.UniqueConstraint('week_start', 'kind', 'owner', name='uq_occupancy_weeks_entity'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    week_start = db.Column(db.Date, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # group, teacher, room; week - отметка о построении
+    owner = db.Column(db.String(50), nullable=False)  # id группы/преподавателя или номер аудитории
+    bell_version = db.Column(db.String(32), nullable=False)
+    bits = db.Column(db.String(32), nullable=False)  # маска в шестнадцатеричном виде; у week - отпечаток строк
+    
+    def __repr__(self):
+        return f'<OccupancyWeek {self.week_start} {self.kind}:{self.owner}>'
@@ -1,12 +1,20 @@
 """
 Маршруты для администратора
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_required, current_user
 from functools import wraps
 from werkzeug.security import generate_password_hash
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
 from extensions import db
 from models import User, PendingUser, Group, Subject, Teacher, Student, Schedule, LessonTime
+from services.bell_schedule import refresh_bell_schedule
+from services.pagination import keyset_paginate
+from services.pool_metrics import snapshot_engines
+from services.registrations import approve_pending, reject_pending
+from services.stats import get_dashboard_stats
 from datetime import datetime
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -26,24 +34,41 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Панель администратора"""
-    pending_count = PendingUser.query.count()
-    users_count = User.query.count()
-    groups_count = Group.query.count()
-    subjects_count = Subject.query.count()
-    
-    return render_template('admin/dashboard.html',
-                         pending_count=pending_count,
-                         users_count=users_count,
-                         groups_count=groups_count,
-                         subjects_count=subjects_count)
+    stats = get_dashboard_stats()
+    return render_template('admin/dashboard.html', **stats)
+
+@bp.route('/metrics/pool')
+@login_required
+@admin_required
+def pool_metrics_view():
+    """Состояние и счетчики пулов соединений текущего процесса по привязкам (JSON)"""
+    return jsonify(snapshot_engines(db.engines))
 
 @bp.route('/pending-users')
 @login_required
 @admin_required
 def pending_users():
     """Список ожидающих подтверждения пользователей"""
-    pending = PendingUser.query.order_by(PendingUser.created_at.desc()).all()
-    return render_template('admin/pending_users.html', pending=pending)
+    q = request.args.get('q', '').strip()
+    role = request.args.get('role')
+    
+    query = PendingUser.query
+    if q:
+        query = query.filter(or_(
+            PendingUser.username.startswith(q),
+            PendingUser.email.startswith(q),
+            PendingUser.last_name.startswith(q)
+        ))
+    if role:
+        query = query.filter(PendingUser.requested_role == role)
+    
+    page = keyset_paginate(query, PendingUser, request.args.get('cursor'),
+                           current_app.config.get('ADMIN_PAGE_SIZE', 50))
+    return render_template('admin/pending_users.html',
+                         pending=page.items,
+                         next_cursor=page.next_cursor,
+                         q=q,
+                         role=role)
 
 @bp.route('/approve-user/<int:id>', methods=['POST'])
 @login_required
@@ -107,13 +132,69 @@ def reject_user(id):
     flash('Заявка отклонена', 'info')
     return redirect(url_for('admin.pending_users'))
 
+@bp.route('/pending-users/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_pending_users():
+    """Пакетное подтверждение/отклонение заявок: выбранных или всех заявок группы"""
+    action = request.form.get('action')
+    ids = request.form.getlist('ids', type=int)
+    for_group = request.form.get('for_group', type=int)
+    group_id = request.form.get('group_id', type=int)
+    
+    if for_group:
+        ids = [row.id for row in db.session.query(PendingUser.id).filter(PendingUser.group_id == for_group)]
+    
+    if not ids:
+        flash('Не выбрано ни одной заявки', 'warning')
+        return redirect(url_for('admin.pending_users'))
+    
+    if action == 'approve':
+        try:
+            approved, skipped = approve_pending(ids, group_id=group_id)
+        except IntegrityError:
+            db.session.rollback()
+            flash('Часть логинов или email уже занята, заявки не подтверждены', 'danger')
+            return redirect(url_for('admin.pending_users'))
+        except ValueError as e:
+            db.session.rollback()
+            flash(f'{e}, заявки не подтверждены', 'danger')
+            return redirect(url_for('admin.pending_users'))
+        flash(f'Подтверждено заявок: {approved}', 'success')
+        if skipped:
+            flash(f'Пропущено студентов без группы: {skipped}', 'warning')
+    elif action == 'reject':
+        flash(f'Отклонено заявок: {reject_pending(ids)}', 'info')
+    else:
+        flash('Неизвестное действие', 'danger')
+    
+    return redirect(url_for('admin.pending_users'))
+
 @bp.route('/users')
 @login_required
 @admin_required
 def users():
     """Список всех пользователей"""
-    all_users = User.query.order_by(User.created_at.desc()).all()
-    return render_template('admin/users.html', users=all_users)
+    q = request.args.get('q', '').strip()
+    role = request.args.get('role')
+    
+    query = User.query
+    if q:
+        query = query.filter(or_(
+            User.username.startswith(q),
+            User.email.startswith(q),
+            User.last_name.startswith(q)
+        ))
+    if role:
+        query = query.filter(User.role == role)
+    
+    page = keyset_paginate(query, User, request.args.get('cursor'),
+                           current_app.config.get('ADMIN_PAGE_SIZE', 50))
+    return render_template('admin/users.html',
+                         users=page.items,
+                         next_cursor=page.next_cursor,
+                         q=q,
+                         role=role)
 
 @bp.route('/user/<int:id>/toggle-active', methods=['POST'])
 @login_required
@@ -133,7 +214,7 @@ def toggle_user_active(id):
 @admin_required
 def groups():
     """Список групп"""
-    all_groups = Group.query.order_by(Group.course, Group.name).all()
+    all_groups = Group.query.options(undefer(Group.students_count)).order_by(Group.course, Group.name).all()
     return render_template('admin/groups.html', groups=all_groups)
 
 @bp.route('/group/add', methods=['GET', 'POST'])
@@ -165,7 +246,7 @@ def delete_group(id):
     """Удаление группы"""
     group = Group.query.get_or_404(id)
     
-    if group.students:
+    if group.get_students_count():
         flash('Невозможно удалить группу со студентами', 'danger')
         return redirect(url_for('admin.groups'))
     
@@ -230,6 +311,7 @@ def edit_lesson_time(id):
         lesson_time.end_time = datetime.strptime(end_time, '%H:%M').time()
         
         db.session.commit()
+        refresh_bell_schedule()
         flash('Время пары обновлено', 'success')
         return redirect(url_for('admin.lesson_times'))
     
@@ -1,10 +1,16 @@
 """
 Общие маршруты для расписания
 """
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, request, current_app, Response, stream_with_context
 from flask_login import login_required
-from models import Schedule, LessonTime
+from models import Schedule
+from services.bell_schedule import get_bell_schedule
+from services.conditional import schedule_etag, is_not_modified, conditional, not_modified
+from services.rooms import free_classrooms
+from services.schedule_queries import range_rows
+from services.week_cache import group_week, lessons_on
 from datetime import datetime
+import json
 
 bp = Blueprint('schedule', __name__, url_prefix='/schedule')
 
@@ -12,7 +18,7 @@ bp = Blueprint('schedule', __name__, url_prefix='/schedule')
 @login_required
 def api_lesson_times():
     """API для получения расписания звонков"""
-    times = LessonTime.query.order_by(LessonTime.lesson_number).all()
+    times = get_bell_schedule()
     return jsonify([{
         'id': t.id,
         'lesson_number': t.lesson_number,
@@ -30,18 +36,102 @@ def api_schedule(group_id, date):
     except ValueError:
         return jsonify({'error': 'Invalid date format'}), 400
     
-    schedules = Schedule.query.filter_by(
-        group_id=group_id,
-        date=selected_date,
-        is_active=True
-    ).order_by(Schedule.lesson_time_id).all()
+    etag = schedule_etag(selected_date, selected_date, group_id=group_id)
+    if is_not_modified(etag):
+        return not_modified(etag)
     
-    return jsonify([{
-        'id': s.id,
-        'subject': s.subject.name,
-        'teacher': s.teacher.user.get_full_name(),
-        'lesson_time': s.lesson_time.get_time_range(),
-        'lesson_type': s.get_lesson_type_display(),
-        'classroom': s.classroom,
-        'notes': s.notes
-    } for s in schedules])
+    schedules = lessons_on(group_week(group_id, selected_date), selected_date)
+    
+    return conditional(jsonify([{
+        'id': s['id'],
+        'subject': s['subject']['name'],
+        'teacher': s['teacher']['name'],
+        'lesson_time': s['lesson_time']['time_range'],
+        'lesson_type': s['lesson_type_display'],
+        'classroom': s['classroom'],
+        'notes': s['notes']
+    } for s in schedules]), etag)
+
+
+@bp.route('/api/schedule/range')
+@login_required
+def api_schedule_range():
+    """
+    API для получения расписания за период.
+    Параметры: from, to (ГГГГ-ММ-ДД), group (можно несколько) и/или teacher.
+    Ответ передается потоком, по одному занятию за раз.
+    """
+    try:
+        start = datetime.strptime(request.args.get('from', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.args.get('to', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+    
+    group_ids = request.args.getlist('group', type=int)
+    teacher_id = request.args.get('teacher', type=int)
+    
+    if not group_ids and teacher_id is None:
+        return jsonify({'error': 'group or teacher is required'}), 400
+    
+    if end < start:
+        return jsonify({'error': 'Invalid date range'}), 400
+    
+    max_days = current_app.config.get('SCHEDULE_RANGE_MAX_DAYS', 62)
+    if (end - start).days + 1 > max_days:
+        return jsonify({'error': f'Date range is limited to {max_days} days'}), 400
+    
+    max_groups = current_app.config.get('SCHEDULE_RANGE_MAX_GROUPS', 20)
+    if len(group_ids) > max_groups:
+        return jsonify({'error': f'No more than {max_groups} groups per request'}), 400
+    
+    bells = get_bell_schedule()
+    rows = range_rows(start, end, group_ids=group_ids, teacher_id=teacher_id)
+    
+    def generate():
+        yield '['
+        for index, row in enumerate(rows):
+            (lesson_id, date, lesson_time_id, lesson_type, classroom, notes,
+             group_name, subject_name, first_name, last_name) = row
+            slot = bells.get(lesson_time_id)
+            item = {
+                'id': lesson_id,
+                'date': date.isoformat(),
+                'group': group_name,
+                'subject': subject_name,
+                'teacher': f'{first_name} {last_name}',
+                'lesson_time': slot.get_time_range() if slot else '',
+                'lesson_type': Schedule.LESSON_TYPES.get(lesson_type, lesson_type),
+                'classroom': classroom,
+                'notes': notes
+            }
+            yield (',' if index else '') + json.dumps(item, ensure_ascii=False)
+        yield ']'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+@bp.route('/api/free-rooms')
+@login_required
+def api_free_rooms():
+    """
+    API поиска свободных аудиторий.
+    Параметры: from, to (ГГГГ-ММ-ДД, to необязателен), lesson_time (можно несколько,
+    по умолчанию весь день), prefix - начало номера аудитории.
+    """
+    try:
+        start = datetime.strptime(request.args.get('from', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.args.get('to') or request.args.get('from'), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+    
+    if end < start:
+        return jsonify({'error': 'Invalid date range'}), 400
+    
+    max_days = current_app.config.get('FREE_ROOMS_MAX_DAYS', 183)
+    if (end - start).days + 1 > max_days:
+        return jsonify({'error': f'Date range is limited to {max_days} days'}), 400
+    
+    rooms = free_classrooms(start, end,
+                            lesson_time_ids=request.args.getlist('lesson_time', type=int),
+                            prefix=request.args.get('prefix', '').strip() or None)
+    return jsonify(rooms)
@@ -1,12 +1,18 @@
 """
 Маршруты для студента
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
 from functools import wraps
 from extensions import db
-from models import Student, Schedule, Note, LessonTime
-from datetime import datetime, timedelta
+from models import Schedule, Note
+from services.bell_schedule import get_bell_schedule
+from services.conditional import schedule_etag, is_not_modified, conditional, not_modified
+from services.pagination import keyset_paginate
+from services.month_grid import month_calendar
+from services.schedule_queries import week_bounds, month_bounds
+from services.week_cache import group_week, lessons_on
+from datetime import datetime
 
 bp = Blueprint('student', __name__, url_prefix='/student')
 
@@ -25,29 +31,16 @@ def student_required(f):
 @student_required
 def dashboard():
     """Панель студента"""
-    student = Student.query.filter_by(user_id=current_user.id).first()
+    student = current_user.student
     
     if not student:
         flash('Профиль студента не найден', 'danger')
         return redirect(url_for('index'))
     
-    # Расписание на сегодня
+    # Расписание на неделю (из кэша) и на сегодня
     today = datetime.now().date()
-    today_schedule = Schedule.query.filter_by(
-        group_id=student.group_id,
-        date=today,
-        is_active=True
-    ).order_by(Schedule.lesson_time_id).all()
-    
-    # Расписание на неделю
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    week_schedule = Schedule.query.filter(
-        Schedule.group_id == student.group_id,
-        Schedule.date >= week_start,
-        Schedule.date <= week_end,
-        Schedule.is_active == True
-    ).order_by(Schedule.date, Schedule.lesson_time_id).all()
+    week_schedule = group_week(student.group_id, today)
+    today_schedule = lessons_on(week_schedule, today)
     
     return render_template('student/dashboard.html',
                          student=student,
@@ -59,7 +52,7 @@ def dashboard():
 @student_required
 def schedule():
     """Расписание студента"""
-    student = Student.query.filter_by(user_id=current_user.id).first()
+    student = current_user.student
     
     # Получение параметров фильтрации
     view_type = request.args.get('view', 'day')  # day, week, month
@@ -70,50 +63,44 @@ def schedule():
     else:
         selected_date = datetime.now().date()
     
+    # Период выбранного вида для проверки условного запроса
+    if view_type == 'week':
+        period = week_bounds(selected_date)
+    elif view_type == 'month':
+        period = month_bounds(selected_date)
+    else:
+        period = (selected_date, selected_date)
+    
+    etag = schedule_etag(*period, group_id=student.group_id, extra=f'{current_user.id}|{view_type}')
+    if is_not_modified(etag):
+        return not_modified(etag)
+    
     schedules = []
+    month_grid = None
     
     if view_type == 'day':
-        schedules = Schedule.query.filter_by(
-            group_id=student.group_id,
-            date=selected_date,
-            is_active=True
-        ).order_by(Schedule.lesson_time_id).all()
+        schedules = lessons_on(group_week(student.group_id, selected_date), selected_date)
     
     elif view_type == 'week':
-        week_start = selected_date - timedelta(days=selected_date.weekday())
-        week_end = week_start + timedelta(days=6)
-        schedules = Schedule.query.filter(
-            Schedule.group_id == student.group_id,
-            Schedule.date >= week_start,
-            Schedule.date <= week_end,
-            Schedule.is_active == True
-        ).order_by(Schedule.date, Schedule.lesson_time_id).all()
+        schedules = group_week(student.group_id, selected_date)
     
     elif view_type == 'month':
-        month_start = selected_date.replace(day=1)
-        if selected_date.month == 12:
-            month_end = selected_date.replace(year=selected_date.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            month_end = selected_date.replace(month=selected_date.month + 1, day=1) - timedelta(days=1)
-        
-        schedules = Schedule.query.filter(
-            Schedule.group_id == student.group_id,
-            Schedule.date >= month_start,
-            Schedule.date <= month_end,
-            Schedule.is_active == True
-        ).order_by(Schedule.date, Schedule.lesson_time_id).all()
-    
-    return render_template('student/schedule.html',
-                         schedules=schedules,
-                         selected_date=selected_date,
-                         view_type=view_type)
+        # Сетка месяца по агрегатам, подробно - только выбранный день
+        month_grid = month_calendar(selected_date, group_id=student.group_id)
+        schedules = lessons_on(group_week(student.group_id, selected_date), selected_date)
+    
+    return conditional(render_template('student/schedule.html',
+                                       schedules=schedules,
+                                       month_grid=month_grid,
+                                       selected_date=selected_date,
+                                       view_type=view_type), etag)
 
 @bp.route('/lesson-times')
 @login_required
 @student_required
 def lesson_times():
     """Расписание звонков"""
-    times = LessonTime.query.order_by(LessonTime.lesson_number).all()
+    times = list(get_bell_schedule())
     return render_template('student/lesson_times.html', times=times)
 
 @bp.route('/notes')
@@ -121,8 +108,9 @@ def lesson_times():
 @student_required
 def notes():
     """Заметки студента"""
-    student_notes = Note.query.filter_by(user_id=current_user.id).order_by(Note.created_at.desc()).all()
-    return render_template('student/notes.html', notes=student_notes)
+    page = keyset_paginate(Note.query.filter_by(user_id=current_user.id), Note,
+                           request.args.get('cursor'), current_app.config.get('NOTES_PAGE_SIZE', 30))
+    return render_template('student/notes.html', notes=page.items, next_cursor=page.next_cursor)
 
 @bp.route('/add-note/<int:schedule_id>', methods=['GET', 'POST'])
 @login_required
@@ -130,7 +118,7 @@ def notes():
 def add_note(schedule_id):
     """Добавление заметки к занятию"""
     schedule = Schedule.query.get_or_404(schedule_id)
-    student = Student.query.filter_by(user_id=current_user.id).first()
+    student = current_user.student
     
     # Проверка, что занятие относится к группе студента
     if schedule.group_id != student.group_id:
@@ -197,7 +185,7 @@ def delete_note(id):
 @student_required
 def teachers():
     """Список преподавателей"""
-    student = Student.query.filter_by(user_id=current_user.id).first()
+    student = current_user.student
     
     # Получение уникальных преподавателей из расписания группы
     from models import Teacher
@@ -1,15 +1,25 @@
 """
 Маршруты для преподавателя
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_required, current_user
 from functools import wraps
+from sqlalchemy.exc import IntegrityError, OperationalError
 from extensions import db
-from models import Teacher, Schedule, Group, Subject, LessonTime
-from datetime import datetime, timedelta
+from models import Schedule, Group, Subject, LessonSeries
+from services.bell_schedule import get_bell_schedule
+from services.conflicts import LessonProposal, find_conflicts, conflict_messages
+from services.reschedule import reschedule_options
+from services.rooms import free_classrooms
+from services.recurrence import generate_series, update_series, cancel_series
+from services.week_cache import teacher_week, lessons_on, invalidate_week
+from datetime import datetime
 
 bp = Blueprint('teacher', __name__, url_prefix='/teacher')
 
+# Взаимная блокировка или таймаут блокировки при одновременной записи в тот же слот
+CONCURRENT_EDIT_MESSAGE = 'Расписание одновременно изменяет другой пользователь, повторите попытку'
+
 def teacher_required(f):
     """Декоратор для проверки прав преподавателя"""
     @wraps(f)
@@ -25,29 +35,16 @@ def teacher_required(f):
 @teacher_required
 def dashboard():
     """Панель преподавателя"""
-    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    teacher = current_user.teacher
     
     if not teacher:
         flash('Профиль преподавателя не найден', 'danger')
         return redirect(url_for('index'))
     
-    # Расписание на сегодня
+    # Расписание на неделю (из кэша) и на сегодня
     today = datetime.now().date()
-    today_schedule = Schedule.query.filter_by(
-        teacher_id=teacher.id,
-        date=today,
-        is_active=True
-    ).order_by(Schedule.lesson_time_id).all()
-    
-    # Расписание на неделю
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    week_schedule = Schedule.query.filter(
-        Schedule.teacher_id == teacher.id,
-        Schedule.date >= week_start,
-        Schedule.date <= week_end,
-        Schedule.is_active == True
-    ).order_by(Schedule.date, Schedule.lesson_time_id).all()
+    week_schedule = teacher_week(teacher.id, today)
+    today_schedule = lessons_on(week_schedule, today)
     
     return render_template('teacher/dashboard.html',
                          teacher=teacher,
@@ -59,7 +56,7 @@ def dashboard():
 @teacher_required
 def schedule():
     """Расписание преподавателя"""
-    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    teacher = current_user.teacher
     
     # Получение параметров фильтрации
     date_str = request.args.get('date')
@@ -69,11 +66,7 @@ def schedule():
         selected_date = datetime.now().date()
     
     # Расписание на выбранную дату
-    schedules = Schedule.query.filter_by(
-        teacher_id=teacher.id,
-        date=selected_date,
-        is_active=True
-    ).order_by(Schedule.lesson_time_id).all()
+    schedules = lessons_on(teacher_week(teacher.id, selected_date), selected_date)
     
     return render_template('teacher/schedule.html',
                          schedules=schedules,
@@ -84,7 +77,7 @@ def schedule():
 @teacher_required
 def add_lesson():
     """Добавление занятия"""
-    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    teacher = current_user.teacher
     
     if request.method == 'POST':
         subject_id = request.form.get('subject_id')
@@ -98,32 +91,41 @@ def add_lesson():
         
         date = datetime.strptime(date_str, '%Y-%m-%d').date()
         
-        # Проверка на конфликты
-        conflict = Schedule.query.filter_by(
-            group_id=group_id,
-            lesson_time_id=lesson_time_id,
-            date=date,
-            is_active=True
-        ).first()
-        
-        if conflict:
+        try:
+            # Проверка на пересечения группы, преподавателя и аудитории
+            conflicts = find_conflicts([LessonProposal(
+                group_id, teacher.id, subject_id, lesson_time_id, date, classroom, lesson_type
+            )], lock=True)
+            
+            if conflicts:
+                db.session.rollback()
+                for message in conflict_messages(conflicts):
+                    flash(message, 'danger')
+                return redirect(url_for('teacher.add_lesson'))
+            
+            schedule = Schedule(
+                subject_id=subject_id,
+                group_id=group_id,
+                teacher_id=teacher.id,
+                lesson_time_id=lesson_time_id,
+                weekday=weekday,
+                lesson_type=lesson_type,
+                classroom=classroom,
+                date=date,
+                notes=notes
+            )
+            
+            db.session.add(schedule)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
             flash('В это время у группы уже есть занятие', 'danger')
             return redirect(url_for('teacher.add_lesson'))
-        
-        schedule = Schedule(
-            subject_id=subject_id,
-            group_id=group_id,
-            teacher_id=teacher.id,
-            lesson_time_id=lesson_time_id,
-            weekday=weekday,
-            lesson_type=lesson_type,
-            classroom=classroom,
-            date=date,
-            notes=notes
-        )
-        
-        db.session.add(schedule)
-        db.session.commit()
+        except OperationalError:
+            db.session.rollback()
+            flash(CONCURRENT_EDIT_MESSAGE, 'danger')
+            return redirect(url_for('teacher.add_lesson'))
+        invalidate_week(group_id, teacher.id, date)
         
         flash('Занятие успешно добавлено', 'success')
         return redirect(url_for('teacher.schedule'))
@@ -131,7 +133,7 @@ def add_lesson():
     # Получение данных для формы
     subjects = Subject.query.order_by(Subject.name).all()
     groups = Group.query.order_by(Group.course, Group.name).all()
-    lesson_times = LessonTime.query.order_by(LessonTime.lesson_number).all()
+    lesson_times = list(get_bell_schedule())
     
     return render_template('teacher/add_lesson.html',
                          subjects=subjects,
@@ -143,7 +145,7 @@ def add_lesson():
 @teacher_required
 def edit_lesson(id):
     """Редактирование занятия"""
-    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    teacher = current_user.teacher
     schedule = Schedule.query.get_or_404(id)
     
     # Проверка прав доступа
@@ -152,6 +154,8 @@ def edit_lesson(id):
         return redirect(url_for('teacher.schedule'))
     
     if request.method == 'POST':
+        old_slot = (schedule.group_id, schedule.teacher_id, schedule.date)
+        
         schedule.subject_id = request.form.get('subject_id')
         schedule.group_id = request.form.get('group_id')
         schedule.lesson_time_id = request.form.get('lesson_time_id')
@@ -160,15 +164,40 @@ def edit_lesson(id):
         schedule.classroom = request.form.get('classroom')
         schedule.date = datetime.strptime(request.form.get('date'), '%Y-%m-%d').date()
         schedule.notes = request.form.get('notes')
+        new_slot = (schedule.group_id, schedule.teacher_id, schedule.date)
         
-        db.session.commit()
+        try:
+            # Проверка на пересечения (само занятие исключается по id)
+            with db.session.no_autoflush:
+                conflicts = find_conflicts([LessonProposal(
+                    schedule.group_id, schedule.teacher_id, schedule.subject_id, schedule.lesson_time_id,
+                    schedule.date, schedule.classroom, schedule.lesson_type, schedule.id
+                )], lock=True)
+            
+            if conflicts:
+                db.session.rollback()
+                for message in conflict_messages(conflicts):
+                    flash(message, 'danger')
+                return redirect(url_for('teacher.edit_lesson', id=id))
+            
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash('В это время у группы уже есть занятие', 'danger')
+            return redirect(url_for('teacher.edit_lesson', id=id))
+        except OperationalError:
+            db.session.rollback()
+            flash(CONCURRENT_EDIT_MESSAGE, 'danger')
+            return redirect(url_for('teacher.edit_lesson', id=id))
+        invalidate_week(*old_slot)
+        invalidate_week(*new_slot)
         
         flash('Занятие успешно обновлено', 'success')
         return redirect(url_for('teacher.schedule'))
     
     subjects = Subject.query.order_by(Subject.name).all()
     groups = Group.query.order_by(Group.course, Group.name).all()
-    lesson_times = LessonTime.query.order_by(LessonTime.lesson_number).all()
+    lesson_times = list(get_bell_schedule())
     
     return render_template('teacher/edit_lesson.html',
                          schedule=schedule,
@@ -181,25 +210,162 @@ def edit_lesson(id):
 @teacher_required
 def delete_lesson(id):
     """Удаление занятия"""
-    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    teacher = current_user.teacher
     schedule = Schedule.query.get_or_404(id)
     
     if schedule.teacher_id != teacher.id:
         flash('Доступ запрещен', 'danger')
         return redirect(url_for('teacher.schedule'))
     
+    old_slot = (schedule.group_id, schedule.teacher_id, schedule.date)
     db.session.delete(schedule)
     db.session.commit()
+    invalidate_week(*old_slot)
     
     flash('Занятие удалено', 'success')
     return redirect(url_for('teacher.schedule'))
 
+@bp.route('/add-series', methods=['GET', 'POST'])
+@login_required
+@teacher_required
+def add_series():
+    """Добавление повторяющегося занятия на период"""
+    teacher = current_user.teacher
+    
+    if request.method == 'POST':
+        try:
+            subject_id = int(request.form.get('subject_id', ''))
+            group_id = int(request.form.get('group_id', ''))
+            lesson_time_id = int(request.form.get('lesson_time_id', ''))
+            weekday = int(request.form.get('weekday', ''))
+            week_parity = int(request.form.get('week_parity') or 0)
+            start_date = datetime.strptime(request.form.get('start_date', ''), '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.form.get('end_date', ''), '%Y-%m-%d').date()
+        except ValueError:
+            flash('Заполните все поля серии корректно', 'danger')
+            return redirect(url_for('teacher.add_series'))
+        
+        classroom = (request.form.get('classroom') or '').strip()
+        if not 1 <= weekday <= 6 or week_parity not in (0, 1, 2) or not classroom:
+            flash('Заполните все поля серии корректно', 'danger')
+            return redirect(url_for('teacher.add_series'))
+        if end_date < start_date:
+            flash('Дата окончания раньше даты начала', 'danger')
+            return redirect(url_for('teacher.add_series'))
+        
+        series = LessonSeries(
+            subject_id=subject_id,
+            group_id=group_id,
+            teacher_id=teacher.id,
+            lesson_time_id=lesson_time_id,
+            weekday=weekday,
+            week_parity=week_parity,
+            lesson_type=request.form.get('lesson_type'),
+            classroom=classroom,
+            start_date=start_date,
+            end_date=end_date,
+            notes=request.form.get('notes')
+        )
+        
+        try:
+            count, conflicts = generate_series(series)
+        except IntegrityError:
+            db.session.rollback()
+            flash('В одной из дат у группы уже есть занятие - серия не создана', 'danger')
+            return redirect(url_for('teacher.add_series'))
+        except OperationalError:
+            db.session.rollback()
+            flash(CONCURRENT_EDIT_MESSAGE, 'danger')
+            return redirect(url_for('teacher.add_series'))
+        
+        if conflicts:
+            for message in conflict_messages(conflicts[:10]):
+                flash(message, 'danger')
+            if len(conflicts) > 10:
+                flash(f'И еще пересечений: {len(conflicts) - 10}', 'danger')
+            return redirect(url_for('teacher.add_series'))
+        
+        if not count:
+            flash('В указанном периоде нет подходящих дат - серия не создана', 'warning')
+            return redirect(url_for('teacher.add_series'))
+        
+        flash(f'Создано занятий: {count}', 'success')
+        return redirect(url_for('teacher.schedule'))
+    
+    subjects = Subject.query.order_by(Subject.name).all()
+    groups = Group.query.order_by(Group.course, Group.name).all()
+    lesson_times = list(get_bell_schedule())
+    
+    return render_template('teacher/add_series.html',
+                         subjects=subjects,
+                         groups=groups,
+                         lesson_times=lesson_times)
+
+@bp.route('/edit-series/<int:id>', methods=['GET', 'POST'])
+@login_required
+@teacher_required
+def edit_series(id):
+    """Изменение всех будущих занятий серии"""
+    teacher = current_user.teacher
+    series = LessonSeries.query.get_or_404(id)
+    
+    if series.teacher_id != teacher.id:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('teacher.schedule'))
+    
+    if request.method == 'POST':
+        from_date_str = request.form.get('from_date')
+        from_date = datetime.strptime(from_date_str, '%Y-%m-%d').date() if from_date_str else datetime.now().date()
+        
+        changes = {field: request.form.get(field)
+                   for field in ('subject_id', 'lesson_type', 'classroom', 'notes')
+                   if request.form.get(field) is not None}
+        try:
+            count, conflicts = update_series(series, changes, from_date)
+        except OperationalError:
+            db.session.rollback()
+            flash(CONCURRENT_EDIT_MESSAGE, 'danger')
+            return redirect(url_for('teacher.edit_series', id=id))
+        
+        if conflicts:
+            for message in conflict_messages(conflicts[:10]):
+                flash(message, 'danger')
+            return redirect(url_for('teacher.edit_series', id=id))
+        
+        flash(f'Обновлено занятий: {count}', 'success')
+        return redirect(url_for('teacher.schedule'))
+    
+    subjects = Subject.query.order_by(Subject.name).all()
+    
+    return render_template('teacher/edit_series.html',
+                         series=series,
+                         subjects=subjects)
+
+@bp.route('/cancel-series/<int:id>', methods=['POST'])
+@login_required
+@teacher_required
+def cancel_series_view(id):
+    """Отмена всех будущих занятий серии"""
+    teacher = current_user.teacher
+    series = LessonSeries.query.get_or_404(id)
+    
+    if series.teacher_id != teacher.id:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('teacher.schedule'))
+    
+    from_date_str = request.form.get('from_date')
+    from_date = datetime.strptime(from_date_str, '%Y-%m-%d').date() if from_date_str else datetime.now().date()
+    count = cancel_series(series, from_date)
+    
+    flash(f'Отменено занятий: {count}', 'success')
+    return redirect(url_for('teacher.schedule'))
+
 @bp.route('/groups')
 @login_required
 @teacher_required
 def groups():
     """Список групп преподавателя"""
-    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    teacher = current_user.teacher
     
     # Получение уникальных групп из расписания
     teacher_groups = db.session.query(Group).join(Schedule).filter(
@@ -207,3 +373,54 @@ def groups():
     ).distinct().order_by(Group.course, Group.name).all()
     
     return render_template('teacher/groups.html', groups=teacher_groups)
+
+@bp.route('/free-rooms')
+@login_required
+@teacher_required
+def free_rooms():
+    """Поиск свободных аудиторий на дату или период"""
+    bells = list(get_bell_schedule())
+    rooms = None
+    
+    date_str = request.args.get('date')
+    if date_str:
+        try:
+            start = datetime.strptime(date_str, '%Y-%m-%d').date()
+            end = datetime.strptime(request.args.get('date_to') or date_str, '%Y-%m-%d').date()
+        except ValueError:
+            flash('Неверный формат даты', 'danger')
+            return redirect(url_for('teacher.free_rooms'))
+        
+        max_days = current_app.config.get('FREE_ROOMS_MAX_DAYS', 183)
+        if end < start or (end - start).days + 1 > max_days:
+            flash(f'Период поиска - от 1 до {max_days} дней', 'danger')
+            return redirect(url_for('teacher.free_rooms'))
+        
+        rooms = free_classrooms(start, end,
+                                lesson_time_ids=request.args.getlist('lesson_time_id', type=int),
+                                prefix=request.args.get('prefix', '').strip() or None)
+    
+    return render_template('teacher/free_rooms.html', rooms=rooms, lesson_times=bells)
+
+@bp.route('/lesson/<int:id>/reschedule-options')
+@login_required
+@teacher_required
+def lesson_reschedule_options(id):
+    """Варианты переноса занятия (JSON для формы редактирования)"""
+    teacher = current_user.teacher
+    schedule = Schedule.query.get_or_404(id)
+    
+    if schedule.teacher_id != teacher.id:
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    max_days = current_app.config.get('RESCHEDULE_MAX_DAYS', 62)
+    horizon = min(max(request.args.get('days', 30, type=int), 1), max_days)
+    bells = get_bell_schedule()
+    
+    return jsonify([{
+        'date': c.date.isoformat(),
+        'lesson_time_id': c.lesson_time_id,
+        'lesson_time': bells.get(c.lesson_time_id).get_time_range(),
+        'classroom': c.classroom,
+        'score': c.score
+    } for c in reschedule_options(schedule, horizon_days=horizon)])
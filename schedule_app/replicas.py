@@ -0,0 +1,89 @@
+"""
+Чтение расписания с реплики БД
+
+PrimaryReplicaRouter отправляет чтение занятий, групп и звонков
+(READ_MODELS) на базу 'replica', все остальное и любые записи - на
+'default'. Реплика используется только внутри веб-запросов, которые
+пропустил ReplicaPinMiddleware; команды управления читают с основной БД.
+
+Чтение своих записей: после записи пользователь на REPLICA_STICKY_SECONDS
+закрепляется за основной БД (cookie), а после изменения занятий, групп или
+звонков на то же время закрепляются все - иначе кэш недель, сброшенный
+сигналом, заполнился бы устаревшими данными с отстающей реплики.
+"""
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = 'replica'
+READ_MODELS = frozenset({('schedules', 'schedule'), ('schedules', 'lessontime'), ('groups', 'group')})
+PIN_COOKIE = 'db_primary_until'
+PIN_KEY = 'replica:pinned'
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+# Вне запроса (команды, shell) чтение идет с основной БД
+_pinned = ContextVar('db_pinned', default=True)
+_wrote = ContextVar('db_wrote', default=False)
+
+
+def _sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+def _model_key(model):
+    return model._meta.app_label, model._meta.model_name
+
+
+class PrimaryReplicaRouter:
+    """Чтение расписания с реплики, запись - в основную БД"""
+
+    def db_for_read(self, model, **hints):
+        if _pinned.get() or _model_key(model) not in READ_MODELS:
+            return 'default'
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        # Сохранение сессии не считается записью пользователя
+        if model._meta.app_label != 'sessions':
+            _pinned.set(True)
+            _wrote.set(True)
+            if _model_key(model) in READ_MODELS:
+                cache.set(PIN_KEY, True, _sticky_seconds())
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaPinMiddleware:
+    """Решает, может ли запрос читать с реплики, и запоминает запись пользователя"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        pinned = (request.method not in SAFE_METHODS
+                  or pinned_until > time.time()
+                  or bool(cache.get(PIN_KEY)))
+
+        pinned_token = _pinned.set(pinned)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                seconds = _sticky_seconds()
+                response.set_cookie(PIN_COOKIE, str(int(time.time()) + seconds),
+                                    max_age=seconds, httponly=True, samesite='Lax')
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
+        return response
@@ -0,0 +1,13 @@
+"""
+Настройки Django по окружению
+
+DJANGO_ENV=prod подключает prod.py, иначе используется dev.py.
+Модуль окружения можно указать и напрямую:
+DJANGO_SETTINGS_MODULE=schedule_app.settings.prod
+"""
+import os
+
+if os.environ.get('DJANGO_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
@@ -0,0 +1,229 @@
+"""
+Django settings for schedule_app project.
+
+Общие настройки; окружение уточняют dev.py и prod.py (см. __init__.py).
+"""
+
+from pathlib import Path
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-your-secret-key-change-in-production'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    
+    # Custom apps
+    'accounts',
+    'groups',
+    'schedules',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'schedule_app.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'schedule_app.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+
+# CONN_MAX_AGE - сколько секунд соединение переиспользуется между запросами
+# (0 - закрывать после каждого запроса, None - без ограничения); должно быть
+# меньше wait_timeout MySQL. CONN_HEALTH_CHECKS проверяет переиспользуемое
+# соединение в начале запроса, чтобы не получить ошибку на закрытом сервером.
+# Значения по умолчанию задают dev.py и prod.py.
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': os.environ.get('DB_NAME', 'schedule_db'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '3306'),
+        'OPTIONS': {
+            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+            'charset': 'utf8mb4',
+        },
+    }
+}
+
+# Реплика для чтения расписания (schedule_app/replicas.py): включается
+# переменной DB_REPLICA_HOST, учетные данные те же, что у основной БД
+
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['schedule_app.replicas.PrimaryReplicaRouter']
+    MIDDLEWARE.append('schedule_app.replicas.ReplicaPinMiddleware')
+
+# Сколько секунд после своей записи пользователь читает с основной БД
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+
+def conn_max_age(default):
+    """CONN_MAX_AGE из DB_CONN_MAX_AGE ('none' - без ограничения)"""
+    value = os.environ.get('DB_CONN_MAX_AGE', str(default)).strip().lower()
+    return None if value == 'none' else int(value)
+
+
+def conn_health_checks(default):
+    """CONN_HEALTH_CHECKS из DB_CONN_HEALTH_CHECKS ('1'/'0')"""
+    return os.environ.get('DB_CONN_HEALTH_CHECKS', '1' if default else '0') == '1'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Без REDIS_URL используется LRU-кэш в памяти процесса
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Закрепление за основной БД после записи (schedule_app/replicas.py) хранится
+# в кэше и должно быть видно всем процессам: с LocMemCache процесс не узнает
+# о записи в другом процессе и читает устаревшие данные с реплики.
+# DB_REPLICA_ALLOW_LOCAL_CACHE=1 снимает проверку (один процесс)
+if ('replica' in DATABASES and not os.environ.get('REDIS_URL')
+        and os.environ.get('DB_REPLICA_ALLOW_LOCAL_CACHE') != '1'):
+    raise ImproperlyConfigured('Реплика требует общего кэша: задайте REDIS_URL '
+                               '(или DB_REPLICA_ALLOW_LOCAL_CACHE=1 для одного процесса)')
+
+# Время жизни недели расписания в кэше, секунд
+SCHEDULE_CACHE_TIMEOUT = 300
+
+# Время жизни статистики панели администратора, секунд
+ADMIN_STATS_TTL = 60
+
+# Групп (преподавателей, аудиторий) на странице сводки расписания за день
+SCHEDULE_ADMIN_PAGE_SIZE = 20
+
+# Максимальный период поиска свободных аудиторий, дней (семестр)
+FREE_ROOMS_MAX_DAYS = 183
+
+# Максимальный горизонт подбора слотов для переноса занятия, дней
+RESCHEDULE_MAX_DAYS = 62
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.0/topics/i18n/
+
+LANGUAGE_CODE = 'ru-ru'
+
+TIME_ZONE = 'Europe/Minsk'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.0/howto/static-files/
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Media files
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Custom user model
+AUTH_USER_MODEL = 'accounts.User'
+
+# Пользователь загружается вместе с профилем студента/преподавателя.
+# ModelBackend остается в списке для сессий, созданных до ProfileBackend:
+# в сессии хранится путь бэкенда, и без него всем пришлось бы войти заново
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Login URLs
+LOGIN_URL = 'accounts:login'
+LOGIN_REDIRECT_URL = 'accounts:dashboard'
+LOGOUT_REDIRECT_URL = 'accounts:login'
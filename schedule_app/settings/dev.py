@@ -0,0 +1,14 @@
+"""
+Настройки для разработки
+"""
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
+
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+# runserver обрабатывает каждый запрос в новом потоке, постоянные
+# соединения там не переиспользуются - закрываем после запроса
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = conn_max_age(0)
+    database['CONN_HEALTH_CHECKS'] = conn_health_checks(False)
@@ -0,0 +1,29 @@
+"""
+Локальная проверка реплики на двух файлах SQLite
+
+DJANGO_SETTINGS_MODULE=schedule_app.settings.local_replica python manage.py migrate
+cp db.sqlite3 db_replica.sqlite3   # "репликация" - копирование файла
+DJANGO_SETTINGS_MODULE=schedule_app.settings.local_replica python manage.py check_replica_routing
+
+Кэш здесь - LocMemCache из base.py: закрепление за основной БД видно только
+одному процессу, поэтому эти настройки годятся для проверки, но не для
+сервера с несколькими процессами (там нужен REDIS_URL).
+"""
+from .dev import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['schedule_app.replicas.PrimaryReplicaRouter']
+
+if 'schedule_app.replicas.ReplicaPinMiddleware' not in MIDDLEWARE:
+    MIDDLEWARE.append('schedule_app.replicas.ReplicaPinMiddleware')
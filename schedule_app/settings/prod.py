@@ -0,0 +1,18 @@
+"""
+Настройки для продакшн (DJANGO_ENV=prod)
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# Соединение живет между запросами рабочего процесса до 10 минут
+# (меньше wait_timeout MySQL) и проверяется перед переиспользованием
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = conn_max_age(600)
+    database['CONN_HEALTH_CHECKS'] = conn_health_checks(True)
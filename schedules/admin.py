@@ -1,4 +1,10 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import IntegrityError, OperationalError
+from django.shortcuts import redirect, render
+from django.urls import path
+from .conflicts import LessonProposal, find_conflicts, conflict_message
+from .importer import TimetableImporter, ImportFormatError, iter_rows
 from .models import LessonTime, Schedule, Note, ChangeRequest
 
 
@@ -8,12 +14,99 @@ class LessonTimeAdmin(admin.ModelAdmin):
     ordering = ('lesson_number',)
 
 
+class ScheduleAdminForm(forms.ModelForm):
+    """Форма занятия с проверкой пересечений группы, преподавателя и аудитории"""
+    
+    class Meta:
+        model = Schedule
+        fields = '__all__'
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        required = ('group', 'teacher', 'subject', 'lesson_time', 'date')
+        if not cleaned_data.get('is_active') or any(not cleaned_data.get(f) for f in required):
+            return cleaned_data
+        
+        conflicts = find_conflicts([LessonProposal(
+            cleaned_data['group'].id,
+            cleaned_data['teacher'].id,
+            cleaned_data['subject'].id,
+            cleaned_data['lesson_time'].id,
+            cleaned_data['date'],
+            cleaned_data.get('classroom'),
+            cleaned_data.get('lesson_type'),
+            self.instance.pk,
+        )], lock=True)
+        if conflicts:
+            raise forms.ValidationError([conflict_message(c) for c in conflicts])
+        return cleaned_data
+
+
+class TimetableImportForm(forms.Form):
+    file = forms.FileField(label='Файл (.csv или .xlsx)')
+    skip_invalid = forms.BooleanField(label='Пропускать строки с ошибками', required=False)
+
+
 @admin.register(Schedule)
 class ScheduleAdmin(admin.ModelAdmin):
+    form = ScheduleAdminForm
+    change_list_template = 'admin/schedules/schedule/change_list.html'
     list_display = ('subject', 'group', 'teacher', 'date', 'lesson_time', 'classroom', 'is_active')
     list_filter = ('date', 'weekday', 'lesson_type', 'is_active', 'group')
     search_fields = ('subject__name', 'group__name', 'teacher__user__last_name', 'classroom')
     date_hierarchy = 'date'
+    
+    def changeform_view(self, request, *args, **kwargs):
+        # Проверку формы может обогнать параллельная запись в тот же слот:
+        # ее отклоняет уникальный индекс или взаимная блокировка MySQL
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except (IntegrityError, OperationalError):
+            messages.error(request, 'Слот занят или расписание одновременно изменяется - повторите попытку')
+            return redirect(request.get_full_path())
+    
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='schedules_schedule_import'),
+        ]
+        return urls + super().get_urls()
+    
+    def import_view(self, request):
+        """Загрузка расписания из файла"""
+        if not self.has_add_permission(request):
+            messages.error(request, 'Доступ запрещён')
+            return redirect('admin:schedules_schedule_changelist')
+        
+        errors = []
+        if request.method == 'POST':
+            form = TimetableImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data['file']
+                skip_invalid = form.cleaned_data['skip_invalid']
+                try:
+                    result = TimetableImporter().run(iter_rows(upload.file, upload.name), skip_invalid=skip_invalid)
+                except ImportFormatError as e:
+                    messages.error(request, str(e))
+                else:
+                    errors = result.errors
+                    if errors and not skip_invalid:
+                        messages.error(request, f'Импорт отменен, ошибок: {len(errors)}')
+                    else:
+                        messages.success(request, f'Импортировано занятий: {result.created}')
+                        if not errors:
+                            return redirect('admin:schedules_schedule_changelist')
+        else:
+            form = TimetableImportForm()
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Импорт расписания',
+            'form': form,
+            'errors': errors[:500],
+            'errors_total': len(errors),
+        }
+        return render(request, 'admin/schedules/schedule/import.html', context)
 
 
 @admin.register(Note)
@@ -5,3 +5,6 @@ class SchedulesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'schedules'
     verbose_name = 'Расписания'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,44 @@
+"""
+Кэш недельного расписания групп и преподавателей
+
+Используется кэш Django (CACHES['default']): LocMemCache в памяти процесса
+или RedisCache при заданном REDIS_URL.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .rooms import rooms_week_key, CLASSROOMS_KEY
+
+
+def week_cache_key(kind, owner_id, day):
+    """Ключ недели: kind - 'group' или 'teacher'"""
+    iso_year, iso_week, _ = day.isocalendar()
+    return f'schedule_week:{kind}:{owner_id}:{iso_year}-W{iso_week:02d}'
+
+
+def get_week_schedules(kind, owner_id, day, queryset):
+    """Занятия недели из кэша; при промахе выполняет queryset и кэширует список"""
+    key = week_cache_key(kind, owner_id, day)
+    schedules = cache.get(key)
+    if schedules is None:
+        schedules = list(queryset)
+        cache.set(key, schedules, getattr(settings, 'SCHEDULE_CACHE_TIMEOUT', 300))
+    return schedules
+
+
+def invalidate_week(group_id, teacher_id, day):
+    """Сброс недели группы, преподавателя и занятости аудиторий, затронутых изменением занятия"""
+    cache.delete_many([
+        week_cache_key('group', group_id, day),
+        week_cache_key('teacher', teacher_id, day),
+        rooms_week_key(day),
+        CLASSROOMS_KEY,
+    ])
+
+
+def week_range(day):
+    """Понедельник и воскресенье недели, содержащей дату"""
+    start_of_week = day - timedelta(days=day.weekday())
+    return start_of_week, start_of_week + timedelta(days=6)
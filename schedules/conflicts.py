@@ -0,0 +1,62 @@
+"""
+Проверка пересечений занятий (группа, преподаватель, аудитория)
+
+Для набора предлагаемых занятий выполняется один запрос по индексам
+расписания за охватываемый период, после чего все пересечения находятся
+в памяти (lesson_conflicts.py, общий с Flask-версией).
+"""
+from django.db.models import Q
+
+from lesson_conflicts import LessonProposal, CONFLICT_MESSAGES, strip_classroom, detect
+
+from .models import Schedule
+
+
+_FIELDS = ('group_id', 'teacher_id', 'subject_id', 'lesson_time_id', 'date', 'classroom', 'lesson_type', 'id')
+
+
+def proposal_from_values(values):
+    """Предложение из кортежа значений в порядке _FIELDS"""
+    return strip_classroom(LessonProposal(*values))
+
+
+def find_conflicts(proposals, lock=False):
+    """
+    Все пересечения для набора занятий.
+    lock=True блокирует найденные строки (select_for_update) до конца транзакции.
+    """
+    proposals = [strip_classroom(p) for p in proposals]
+    if not proposals:
+        return []
+
+    own_ids = {p.id for p in proposals if p.id is not None}
+    queryset = Schedule.objects.filter(
+        is_active=True,
+        date__range=[min(p.date for p in proposals), max(p.date for p in proposals)],
+        lesson_time_id__in={p.lesson_time_id for p in proposals},
+    ).filter(
+        Q(group_id__in={p.group_id for p in proposals})
+        | Q(teacher_id__in={p.teacher_id for p in proposals})
+        | Q(classroom__in={p.classroom for p in proposals if p.classroom})
+    ).exclude(id__in=own_ids).order_by()
+    if lock:
+        queryset = queryset.select_for_update()
+
+    return detect(proposals, [proposal_from_values(values) for values in queryset.values_list(*_FIELDS)])
+
+
+def schedule_conflicts(start, end):
+    """Пересечения среди уже сохраненных активных занятий за период"""
+    proposals = [proposal_from_values(values) for values in Schedule.objects.filter(
+        is_active=True,
+        date__range=[start, end],
+    ).order_by('date', 'lesson_time_id', 'id').values_list(*_FIELDS)]
+    return find_conflicts(proposals)
+
+
+def conflict_message(conflict):
+    """Текст пересечения для пользователя"""
+    text = f'{CONFLICT_MESSAGES[conflict.kind]}: {conflict.proposal.date:%d.%m.%Y}'
+    if conflict.kind == 'classroom':
+        text += f', ауд. {conflict.proposal.classroom}'
+    return text
@@ -0,0 +1,218 @@
+"""
+Импорт расписания из CSV/XLSX
+
+Файл читается построчно (csv или openpyxl в режиме read_only), названия
+групп, предметов, преподавателей и номера пар сопоставляются с id через
+заранее загруженные словари, пересечения проверяются пакетно, а занятия
+записываются bulk_create порциями внутри одной транзакции.
+
+Ожидаемые столбцы (первая строка - заголовок):
+date, lesson_number, group, subject, teacher, lesson_type, classroom, notes
+- date: ГГГГ-ММ-ДД или ДД.ММ.ГГГГ
+- subject: код или название предмета
+- teacher: логин или "Фамилия Имя" преподавателя
+- lesson_type: lecture/practice/lab/seminar или русское название
+"""
+from collections import namedtuple
+from datetime import date, datetime
+import csv
+import io
+
+from django.db import transaction
+
+from accounts.models import TeacherProfile
+from groups.models import Group, Subject
+from .cache import invalidate_week
+from .conflicts import LessonProposal, find_conflicts, conflict_message
+from .models import LessonTime, Schedule
+
+COLUMNS = ('date', 'lesson_number', 'group', 'subject', 'teacher', 'lesson_type', 'classroom', 'notes')
+REQUIRED_COLUMNS = ('date', 'lesson_number', 'group', 'subject', 'teacher', 'classroom')
+
+ImportResult = namedtuple('ImportResult', 'created errors')
+
+
+class ImportFormatError(Exception):
+    """Файл не удалось прочитать как таблицу расписания"""
+
+
+def iter_csv(file):
+    """Строки CSV-файла (байтового или текстового) как словари"""
+    if isinstance(file.read(0), bytes):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    return csv.DictReader(file, dialect=dialect)
+
+
+def iter_xlsx(file):
+    """Строки первого листа XLSX как словари"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError('Для импорта XLSX установите пакет openpyxl')
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+    for values in rows:
+        if any(value is not None for value in values):
+            yield dict(zip(header, values))
+    workbook.close()
+
+
+def iter_rows(file, filename):
+    """Построчное чтение файла по расширению"""
+    if filename.lower().endswith('.xlsx'):
+        return iter_xlsx(file)
+    if filename.lower().endswith('.csv'):
+        return iter_csv(file)
+    raise ImportFormatError('Поддерживаются только файлы .csv и .xlsx')
+
+
+class TimetableImporter:
+    """Сопоставление строк файла с id и пакетная запись занятий"""
+
+    def __init__(self, chunk_size=2000):
+        self.chunk_size = chunk_size
+        self.groups = {name.casefold(): pk for pk, name in Group.objects.values_list('id', 'name')}
+        self.subjects = {}
+        for pk, code, name in Subject.objects.values_list('id', 'code', 'name'):
+            self.subjects[name.casefold()] = pk
+            self.subjects[code.casefold()] = pk
+        self.teachers = {}
+        for pk, username, first_name, last_name in TeacherProfile.objects.values_list(
+            'id', 'user__username', 'user__first_name', 'user__last_name'
+        ):
+            self.teachers[f'{last_name} {first_name}'.casefold()] = pk
+            self.teachers[f'{first_name} {last_name}'.casefold()] = pk
+            self.teachers[username.casefold()] = pk
+        self.lesson_times = dict(LessonTime.objects.values_list('lesson_number', 'id'))
+        self.lesson_types = {}
+        for code, label in Schedule.LESSON_TYPE_CHOICES:
+            self.lesson_types[code] = code
+            self.lesson_types[label.casefold()] = code
+
+    def _parse_date(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        value = str(value or '').strip()
+        for fmt in ('%Y-%m-%d', '%d.%m.%Y'):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(f'неверная дата "{value}"')
+
+    def _lookup(self, mapping, value, label):
+        key = str(value or '').strip().casefold()
+        if key not in mapping:
+            raise ValueError(f'{label} "{value}" не найден(а)')
+        return mapping[key]
+
+    def parse_row(self, row):
+        """Строка файла -> LessonProposal и примечание; ValueError при ошибке"""
+        missing = [column for column in REQUIRED_COLUMNS if row.get(column) in (None, '')]
+        if missing:
+            raise ValueError('не заполнены столбцы: ' + ', '.join(missing))
+
+        lesson_date = self._parse_date(row['date'])
+        if lesson_date.isoweekday() == 7:
+            raise ValueError('занятия в воскресенье не допускаются')
+
+        try:
+            lesson_number = int(float(row['lesson_number']))
+        except (TypeError, ValueError):
+            raise ValueError(f'неверный номер пары "{row["lesson_number"]}"')
+        if lesson_number not in self.lesson_times:
+            raise ValueError(f'пара {lesson_number} отсутствует в расписании звонков')
+
+        lesson_type = self._lookup(self.lesson_types, row.get('lesson_type') or 'lecture', 'тип занятия')
+
+        proposal = LessonProposal(
+            self._lookup(self.groups, row['group'], 'группа'),
+            self._lookup(self.teachers, row['teacher'], 'преподаватель'),
+            self._lookup(self.subjects, row['subject'], 'предмет'),
+            self.lesson_times[lesson_number],
+            lesson_date,
+            str(row['classroom']).strip(),
+            lesson_type,
+        )
+        return proposal, str(row.get('notes') or '').strip()
+
+    def _flush(self, chunk, errors, skip_invalid):
+        """Проверка пересечений порции и bulk_create; возвращает число созданных"""
+        conflicts = find_conflicts([proposal for _, proposal, _ in chunk])
+        # Одинаковые строки дают равные предложения, поэтому конфликт
+        # относится к строке по позиции в порции, а не по значению
+        bad_rows = set()
+        for conflict in conflicts:
+            row_number = chunk[conflict.index][0]
+            bad_rows.add(row_number)
+            errors.append((row_number, conflict_message(conflict)))
+
+        if errors and not skip_invalid:
+            return 0
+
+        objects = [Schedule(
+            group_id=p.group_id,
+            teacher_id=p.teacher_id,
+            subject_id=p.subject_id,
+            lesson_time_id=p.lesson_time_id,
+            weekday=p.date.isoweekday(),
+            lesson_type=p.lesson_type,
+            classroom=p.classroom,
+            date=p.date,
+            notes=notes,
+        ) for row_number, p, notes in chunk if row_number not in bad_rows]
+        Schedule.objects.bulk_create(objects, batch_size=self.chunk_size)
+        return len(objects)
+
+    def run(self, rows, dry_run=False, skip_invalid=False):
+        """
+        Импорт строк в одной транзакции. Без skip_invalid любая ошибка
+        откатывает весь импорт; dry_run всегда откатывает.
+        """
+        errors = []
+        created = 0
+        touched_weeks = {}
+
+        with transaction.atomic():
+            chunk = []
+            # Строка 1 - заголовок
+            for row_number, row in enumerate(rows, start=2):
+                try:
+                    proposal, notes = self.parse_row(row)
+                except ValueError as e:
+                    errors.append((row_number, str(e)))
+                    continue
+                chunk.append((row_number, proposal, notes))
+                week = (proposal.group_id, proposal.teacher_id, proposal.date.isocalendar()[:2])
+                touched_weeks.setdefault(week, proposal.date)
+                if len(chunk) >= self.chunk_size:
+                    created += self._flush(chunk, errors, skip_invalid)
+                    chunk = []
+            if chunk:
+                created += self._flush(chunk, errors, skip_invalid)
+
+            if errors and not skip_invalid:
+                transaction.set_rollback(True)
+                created = 0
+            elif dry_run:
+                transaction.set_rollback(True)
+            else:
+                transaction.on_commit(lambda: _invalidate_weeks(touched_weeks))
+
+        return ImportResult(created, sorted(errors, key=lambda e: e[0] or 0))
+
+
+def _invalidate_weeks(touched_weeks):
+    """Сброс кэша недель, в которые попали импортированные занятия"""
+    for (group_id, teacher_id, _), day in touched_weeks.items():
+        invalidate_week(group_id, teacher_id, day)
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.utils import timezone
+
+from schedules.models import Schedule
+
+
+class Command(BaseCommand):
+    """Задержка запроса с новым соединением и с переиспользованием (CONN_MAX_AGE)"""
+
+    help = ('Имитирует запросы к странице расписания (сигналы начала и конца запроса, '
+            'как в обработчике Django) при CONN_MAX_AGE=0 и с постоянным соединением')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Число запросов в каждом режиме')
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        original = connection.settings_dict['CONN_MAX_AGE']
+        self.stdout.write(f"База: {connection.vendor} {connection.settings_dict['NAME']}, "
+                          f"текущий CONN_MAX_AGE={original}")
+        try:
+            for label, max_age in (('новое соединение (CONN_MAX_AGE=0)', 0),
+                                   ('переиспользование (CONN_MAX_AGE=600)', 600)):
+                latencies, connects = self._measure(connection, max_age, options['requests'])
+                self.stdout.write(
+                    f'{label}: соединений {connects}, '
+                    f'p50 {self._percentile(latencies, 0.5) * 1000:.2f} мс, '
+                    f'p95 {self._percentile(latencies, 0.95) * 1000:.2f} мс, '
+                    f'среднее {sum(latencies) / len(latencies) * 1000:.2f} мс'
+                )
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original
+
+    def _measure(self, connection, max_age, count):
+        """Задержки запросов и число открытых соединений"""
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        today = timezone.now().date()
+        latencies = []
+        connects = 0
+        for _ in range(count):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            if connection.connection is None:
+                connects += 1
+            # Тот же запрос, что делает страница дня
+            list(Schedule.objects.using(connection.alias).filter(date=today, is_active=True)
+                 .values_list('id', flat=True)[:50])
+            request_finished.send(sender=self.__class__)
+            latencies.append(time.perf_counter() - started)
+        return latencies, connects
+
+    @staticmethod
+    def _percentile(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))]
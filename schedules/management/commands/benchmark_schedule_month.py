@@ -0,0 +1,70 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from schedules.models import Schedule
+from schedules.queries import lessons_queryset, group_by_day
+
+
+class Command(BaseCommand):
+    """Сравнение выборки месяца группы: полные строки и проекция schedules.queries"""
+
+    help = 'Замеряет число запросов, время и пиковую память выборки месяца расписания группы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, required=True, help='ID группы')
+        parser.add_argument('--date', help='Любая дата месяца в формате ГГГГ-ММ-ДД (по умолчанию сегодня)')
+        parser.add_argument('--repeat', type=int, default=5, help='Число повторов')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                selected_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Неверный формат даты')
+        else:
+            selected_date = timezone.now().date()
+
+        first_day = selected_date.replace(day=1)
+        last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        group_id = options['group']
+
+        def full_rows():
+            return Schedule.objects.filter(
+                group_id=group_id, date__range=[first_day, last_day], is_active=True
+            ).select_related('subject', 'teacher__user', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
+
+        def projection():
+            return lessons_queryset('group', group_id, first_day, last_day)
+
+        for label, build in (('полные строки', full_rows), ('проекция', projection)):
+            queries, seconds, peak, count = self._measure(build, options['repeat'])
+            self.stdout.write(
+                f'{label}: занятий {count}, запросов {queries}, '
+                f'{seconds * 1000:.1f} мс, пик памяти {peak / 1024:.1f} КБ'
+            )
+
+    def _measure(self, build, repeat):
+        """Число запросов, среднее время и пиковая память одного прохода с рендерингом полей"""
+        best_peak = 0
+        total = 0.0
+        for _ in range(repeat):
+            tracemalloc.start()
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as context:
+                by_day = group_by_day(build())
+                # Те же обращения, что делает шаблон месяца
+                for lessons in by_day.values():
+                    for lesson in lessons:
+                        (lesson.subject.name, lesson.lesson_time.start_time, lesson.lesson_time.end_time,
+                         lesson.get_lesson_type_display(), lesson.teacher.user.get_full_name(), lesson.classroom)
+            total += time.perf_counter() - started
+            best_peak = max(best_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        count = sum(len(lessons) for lessons in by_day.values())
+        return len(context.captured_queries), total / repeat, best_peak, count
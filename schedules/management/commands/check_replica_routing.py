@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from accounts.models import User
+from schedule_app.replicas import PIN_COOKIE, REPLICA, ReplicaPinMiddleware
+from schedules.models import Schedule
+
+
+class Command(BaseCommand):
+    """Проверка маршрутизации чтения между основной БД и репликой"""
+
+    help = ('Показывает, с какой БД читаются занятия в разных ситуациях запроса, '
+            'и сравнивает число занятий в основной БД и реплике (данные не меняются)')
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.databases:
+            self.stdout.write(self.style.WARNING('База replica не настроена - все запросы идут на основную БД'))
+            return
+
+        factory = RequestFactory()
+        pinned = factory.get('/schedule/')
+        pinned.COOKIES[PIN_COOKIE] = '9999999999'
+        cases = [
+            ('GET, занятия', factory.get('/schedule/'), Schedule, REPLICA),
+            ('GET, пользователи', factory.get('/schedule/'), User, 'default'),
+            ('POST, занятия', factory.post('/schedule/'), Schedule, 'default'),
+            ('GET после своей записи (cookie)', pinned, Schedule, 'default'),
+        ]
+        ok = True
+        for label, request, model, expected in cases:
+            actual = self._route(request, model)
+            ok &= actual == expected
+            self._report(label, actual, expected)
+
+        actual = router.db_for_read(Schedule)
+        ok &= actual == 'default'
+        self._report('вне запроса (команды)', actual, 'default')
+
+        counts = {alias: Schedule.objects.using(alias).count() for alias in ('default', REPLICA)}
+        self.stdout.write(f"Занятий: основная БД {counts['default']}, реплика {counts[REPLICA]}")
+        if ok:
+            self.stdout.write(self.style.SUCCESS('[OK] Маршрутизация работает'))
+        else:
+            self.stdout.write(self.style.ERROR('Есть ошибки маршрутизации'))
+
+    @staticmethod
+    def _route(request, model):
+        """БД, которую роутер выберет для чтения модели внутри запроса"""
+        chosen = []
+
+        def view(request):
+            chosen.append(router.db_for_read(model))
+            return HttpResponse()
+
+        ReplicaPinMiddleware(view)(request)
+        return chosen[0]
+
+    def _report(self, label, actual, expected):
+        style = self.style.SUCCESS if actual == expected else self.style.ERROR
+        self.stdout.write(style(f'  {label}: {actual}'))
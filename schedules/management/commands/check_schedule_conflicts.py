@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schedules.conflicts import schedule_conflicts, conflict_message
+
+
+class Command(BaseCommand):
+    """Пакетная проверка пересечений в сохраненном расписании"""
+
+    help = 'Ищет пересечения групп, преподавателей и аудиторий за период'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start', help='Начало периода ГГГГ-ММ-ДД')
+        parser.add_argument('end', help='Конец периода ГГГГ-ММ-ДД')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('Неверный формат даты')
+
+        conflicts = schedule_conflicts(start, end)
+        for conflict in conflicts:
+            self.stdout.write(
+                f'{conflict_message(conflict)} '
+                f'(занятие #{conflict.proposal.id} и #{conflict.existing_id})'
+            )
+
+        if conflicts:
+            raise CommandError(f'Найдено пересечений: {len(conflicts)}')
+        self.stdout.write(self.style.SUCCESS('[OK] Пересечений не найдено'))
@@ -0,0 +1,89 @@
+import re
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from schedules.models import Schedule
+
+
+# Индексы, которые читают диапазон дат группы/преподавателя. Порядок внутри дня
+# (lesson_time__lesson_number) берется из другой таблицы, поэтому после индекса
+# остается досортировка в пределах даты (SQLite: TEMP B-TREE FOR RIGHT PART OF ORDER BY)
+INDEX_NAMES = {
+    'group_id': ('schedule_group_slot_uniq',),
+    'teacher_id': ('schedule_teacher_date_idx',),
+}
+
+
+class Command(BaseCommand):
+    """Проверка планов (EXPLAIN) запросов недели и месяца по расписанию"""
+
+    help = 'Проверяет, что выборки недели/месяца читают schedules_schedule диапазоном по индексу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, default=1, help='ID группы')
+        parser.add_argument('--teacher', type=int, default=1, help='ID преподавателя')
+        parser.add_argument('--date', help='Дата в формате ГГГГ-ММ-ДД (по умолчанию сегодня)')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                selected_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Неверный формат даты')
+        else:
+            selected_date = timezone.now().date()
+
+        start_of_week = selected_date - timedelta(days=selected_date.weekday())
+        first_day = selected_date.replace(day=1)
+        last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+        checks = []
+        for label, date_range in (('неделя', [start_of_week, start_of_week + timedelta(days=6)]),
+                                  ('месяц', [first_day, last_day])):
+            checks.append((f'группа, {label}', 'group_id', Schedule.objects.filter(
+                group_id=options['group'], date__range=date_range, is_active=True
+            ).select_related('subject', 'teacher__user', 'lesson_time').order_by('date', 'lesson_time__lesson_number')))
+            checks.append((f'преподаватель, {label}', 'teacher_id', Schedule.objects.filter(
+                teacher_id=options['teacher'], date__range=date_range, is_active=True
+            ).select_related('subject', 'group', 'lesson_time').order_by('date', 'lesson_time__lesson_number')))
+
+        failed = 0
+        for label, column, queryset in checks:
+            ok, plan = self._explain(queryset, column)
+            status = self.style.SUCCESS('[OK]') if ok else self.style.ERROR('[ПОЛНЫЙ ПРОСМОТР]')
+            self.stdout.write(f'{status} {label}')
+            for line in plan:
+                self.stdout.write(f'    {line}')
+            failed += not ok
+
+        if failed:
+            raise CommandError(f'Запросов без использования индекса: {failed}')
+
+    def _explain(self, queryset, column):
+        """Возвращает (диапазон дат читается по индексу column + date, строки плана)"""
+        sql, params = queryset.query.sql_with_params()
+        table = Schedule._meta.db_table
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute('EXPLAIN ' + sql, params)
+                columns = [col[0] for col in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                plan = [f"{r['table']}: type={r['type']} key={r['key']} extra={r['Extra']}" for r in rows]
+                ok = any(r['table'] == table and r['key'] in INDEX_NAMES[column] and r['type'] == 'range'
+                         for r in rows)
+            elif connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = [row[-1] for row in cursor.fetchall()]
+                # Уникальное ограничение SQLite хранит как sqlite_autoindex_*, поэтому
+                # проверяются столбцы поиска, а не имя индекса
+                pattern = re.compile(rf'SEARCH {table} USING (COVERING )?INDEX \S+ \({column}=\? AND date>\? AND date<\?\)')
+                ok = any(pattern.match(line) for line in plan)
+            else:
+                plan = queryset.explain().splitlines()
+                ok = any(name in line for line in plan for name in INDEX_NAMES[column])
+
+        return ok, plan
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schedules.importer import TimetableImporter, ImportFormatError, iter_rows
+
+
+class Command(BaseCommand):
+    """Импорт расписания на семестр из CSV/XLSX"""
+
+    help = 'Импортирует занятия из файла .csv или .xlsx (см. schedules/importer.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу .csv или .xlsx')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Размер порции bulk_create')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить, ничего не записывать')
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help='Записать корректные строки, пропустив строки с ошибками')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.monotonic()
+
+        try:
+            with open(path, 'rb') as file:
+                importer = TimetableImporter(chunk_size=options['chunk_size'])
+                result = importer.run(
+                    iter_rows(file, path),
+                    dry_run=options['dry_run'],
+                    skip_invalid=options['skip_invalid'],
+                )
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for row_number, message in result.errors:
+            self.stdout.write(self.style.WARNING(f'Строка {row_number}: {message}'))
+
+        elapsed = time.monotonic() - started
+        if result.errors and not options['skip_invalid']:
+            raise CommandError(f'Импорт отменен, ошибок: {len(result.errors)}')
+
+        verb = 'Проверено' if options['dry_run'] else 'Импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] {verb} занятий: {result.created} за {elapsed:.1f} с, пропущено строк: {len(result.errors)}'
+        ))
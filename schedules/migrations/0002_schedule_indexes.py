@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['group', 'is_active', 'date', 'lesson_time'], name='schedule_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['teacher', 'is_active', 'date', 'lesson_time'], name='schedule_teacher_date_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0002_schedule_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='schedule',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('group', 'date', 'lesson_time'), name='schedule_group_slot_uniq'),
+        ),
+    ]
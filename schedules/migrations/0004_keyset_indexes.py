@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0003_schedule_group_slot_uniq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['student', 'created_at', 'id'], name='note_student_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changerequest',
+            index=models.Index(fields=['created_at', 'id'], name='changerequest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changerequest',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='changerequest_status_idx'),
+        ),
+    ]
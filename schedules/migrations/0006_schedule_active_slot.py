@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_schedule_classroom_index'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='schedule',
+            name='schedule_group_slot_uniq',
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='active_slot',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(is_active=True, then=models.Value(1)), default=None), output_field=models.SmallIntegerField(null=True)),
+        ),
+        migrations.AddConstraint(
+            model_name='schedule',
+            constraint=models.UniqueConstraint(fields=('group', 'date', 'lesson_time', 'active_slot'), name='schedule_group_slot_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0006_schedule_active_slot'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='schedule',
+            name='schedule_group_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='schedule',
+            name='schedule_teacher_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['teacher', 'date', 'lesson_time'], name='schedule_teacher_date_idx'),
+        ),
+    ]
@@ -88,6 +88,13 @@ class Schedule(models.Model):
         default=True,
         verbose_name='Активно'
     )
+    # 1 у активного занятия, NULL у отключенного: входит в уникальный индекс
+    # слота группы, которому MySQL не позволяет задать условие
+    active_slot = models.GeneratedField(
+        expression=models.Case(models.When(is_active=True, then=models.Value(1)), default=None),
+        output_field=models.SmallIntegerField(null=True),
+        db_persist=True
+    )
     notes = models.TextField(
         blank=True,
         verbose_name='Примечания'
@@ -105,6 +112,19 @@ class Schedule(models.Model):
         verbose_name = 'Расписание'
         verbose_name_plural = 'Расписания'
         ordering = ['date', 'lesson_time__lesson_number']
+        indexes = [
+            # Неделя/месяц группы читается по schedule_group_slot_uniq (group, date, ...),
+            # отдельный индекс группы с тем же началом планировщик не выбирает
+            models.Index(fields=['teacher', 'date', 'lesson_time'], name='schedule_teacher_date_idx'),
+            models.Index(fields=['classroom', 'date'], name='schedule_classroom_date_idx'),
+        ]
+        constraints = [
+            # Одно активное занятие группы в слоте (NULL в active_slot не совпадает ни с чем)
+            models.UniqueConstraint(
+                fields=['group', 'date', 'lesson_time', 'active_slot'],
+                name='schedule_group_slot_uniq'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.subject.name} - {self.group.name} ({self.date})"
@@ -141,6 +161,9 @@ class Note(models.Model):
         verbose_name = 'Заметка'
         verbose_name_plural = 'Заметки'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', 'created_at', 'id'], name='note_student_created_idx'),
+        ]
     
     def __str__(self):
         return f"Заметка {self.student.get_full_name()} - {self.schedule.subject.name}"
@@ -213,6 +236,10 @@ class ChangeRequest(models.Model):
         verbose_name = 'Запрос на изменение'
         verbose_name_plural = 'Запросы на изменение'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='changerequest_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='changerequest_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.teacher.user.get_full_name()} - {self.request_type} ({self.get_status_display()})"
@@ -0,0 +1,22 @@
+"""
+Keyset-пагинация (по курсору) для длинных списков
+
+Списки упорядочены по (created_at DESC, id DESC); курсор хранит ключ
+последней строки страницы, и следующая страница читается диапазоном
+индекса (created_at, id) от этого ключа. Формат курсора общий с
+Flask-версией (keyset.py).
+"""
+from django.db.models import Q
+
+from keyset import decode_cursor, make_page
+
+
+def keyset_paginate(queryset, cursor=None, per_page=50):
+    """Страница queryset после курсора в порядке (-created_at, -id)"""
+    key = decode_cursor(cursor)
+    if key is not None:
+        created_at, row_id = key
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=row_id))
+
+    rows = list(queryset.order_by('-created_at', '-id')[:per_page + 1])
+    return make_page(rows, per_page)
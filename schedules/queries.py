@@ -0,0 +1,193 @@
+"""
+Выборка расписания пользователя за период
+
+Единая точка для представлений дня, недели и месяца: область видимости
+определяется ролью (группа студента, занятия преподавателя или всё
+расписание для администратора), а из БД читаются только поля, которые
+выводят шаблоны. Выборки в пределах одной недели идут через кэш недели.
+"""
+import calendar
+from collections import namedtuple
+
+from django.db.models import Count, Min, Max
+
+from accounts.models import StudentProfile, TeacherProfile
+from groups.models import Group
+
+from .cache import get_week_schedules, week_range
+from .models import Schedule
+
+
+# Поля занятия, которые выводят шаблоны расписания
+LESSON_FIELDS = (
+    'id', 'date', 'lesson_type', 'classroom',
+    'subject__name',
+    'lesson_time__lesson_number', 'lesson_time__start_time', 'lesson_time__end_time',
+)
+GROUP_FIELDS = ('group__name',)
+TEACHER_FIELDS = ('teacher__user__first_name', 'teacher__user__last_name')
+
+DaySummary = namedtuple('DaySummary', 'date lessons_count first_pair last_pair lesson_types')
+CalendarDay = namedtuple('CalendarDay', 'date in_month summary')
+
+_TYPE_LABELS = dict(Schedule.LESSON_TYPE_CHOICES)
+_TYPE_ORDER = {lesson_type: index for index, lesson_type in enumerate(_TYPE_LABELS)}
+
+
+def user_scope(user):
+    """
+    Область расписания пользователя: ('group', id), ('teacher', id) или ('all', None).
+    Для студента без профиля или группы id равен None.
+    """
+    if user.is_student():
+        try:
+            return 'group', user.student_profile.group_id
+        except StudentProfile.DoesNotExist:
+            return 'group', None
+    if user.is_teacher():
+        try:
+            return 'teacher', user.teacher_profile.id
+        except TeacherProfile.DoesNotExist:
+            return 'teacher', None
+    return 'all', None
+
+
+def lessons_queryset(kind, owner_id, start, end):
+    """Активные занятия за период с проекцией на выводимые поля"""
+    queryset = Schedule.objects.filter(date__range=[start, end], is_active=True)
+    related = ['subject', 'lesson_time']
+    fields = list(LESSON_FIELDS)
+    
+    if kind == 'group':
+        queryset = queryset.filter(group_id=owner_id)
+    else:
+        related.append('group')
+        fields.extend(GROUP_FIELDS)
+    
+    if kind == 'teacher':
+        queryset = queryset.filter(teacher_id=owner_id)
+    else:
+        related.append('teacher__user')
+        fields.extend(TEACHER_FIELDS)
+    
+    return queryset.select_related(*related).only(*fields).order_by('date', 'lesson_time__lesson_number')
+
+
+def user_lessons(user, start, end):
+    """Занятия пользователя с start по end включительно, по дате и номеру пары"""
+    kind, owner_id = user_scope(user)
+    if kind != 'all' and owner_id is None:
+        return []
+    
+    start_of_week, end_of_week = week_range(start)
+    if kind != 'all' and end <= end_of_week:
+        lessons = get_week_schedules(kind, owner_id, start, lessons_queryset(kind, owner_id, start_of_week, end_of_week))
+        return [lesson for lesson in lessons if start <= lesson.date <= end]
+    
+    return list(lessons_queryset(kind, owner_id, start, end))
+
+
+def group_by_day(lessons):
+    """Группировка упорядоченных занятий по дням за один проход"""
+    by_day = {}
+    for lesson in lessons:
+        by_day.setdefault(lesson.date, []).append(lesson)
+    return by_day
+
+
+def day_summaries(user, start, end):
+    """
+    Итоги по дням за период одним запросом GROUP BY дата, тип занятия:
+    {дата: DaySummary}, типы - подписи в порядке LESSON_TYPE_CHOICES
+    """
+    kind, owner_id = user_scope(user)
+    if kind != 'all' and owner_id is None:
+        return {}
+    
+    queryset = Schedule.objects.filter(date__range=[start, end], is_active=True)
+    if kind != 'all':
+        queryset = queryset.filter(**{f'{kind}_id': owner_id})
+    rows = queryset.order_by().values('date', 'lesson_type').annotate(
+        lessons_count=Count('id'),
+        first_pair=Min('lesson_time__lesson_number'),
+        last_pair=Max('lesson_time__lesson_number'),
+    )
+    
+    totals = {}
+    for row in rows:
+        day = row['date']
+        if day in totals:
+            total, first, last, types = totals[day]
+            totals[day] = (total + row['lessons_count'], min(first, row['first_pair']),
+                           max(last, row['last_pair']), types + [row['lesson_type']])
+        else:
+            totals[day] = (row['lessons_count'], row['first_pair'], row['last_pair'], [row['lesson_type']])
+    
+    return {
+        day: DaySummary(day, total, first, last, tuple(
+            _TYPE_LABELS.get(t, t) for t in sorted(types, key=lambda t: _TYPE_ORDER.get(t, len(_TYPE_ORDER)))
+        ))
+        for day, (total, first, last, types) in totals.items()
+    }
+
+
+def month_calendar(user, first_day, last_day):
+    """Сетка месяца (недели с понедельника): список списков CalendarDay"""
+    summaries = day_summaries(user, first_day, last_day)
+    weeks = calendar.Calendar(firstweekday=calendar.MONDAY).monthdatescalendar(first_day.year, first_day.month)
+    return [
+        [CalendarDay(day, day.month == first_day.month, summaries.get(day)) for day in week]
+        for week in weeks
+    ]
+
+
+# Разрезы сводки по институту: группа, преподаватель, аудитория
+INSTITUTE_GROUPINGS = ('group', 'teacher', 'classroom')
+
+
+def _filter_groups(lessons, faculty=None, course=None):
+    """Занятия групп указанного факультета и курса"""
+    if faculty:
+        lessons = lessons.filter(group__faculty=faculty)
+    if course:
+        lessons = lessons.filter(group__course=course)
+    return lessons
+
+
+def institute_day_owners(day, grouping='group', faculty=None, course=None):
+    """
+    Упорядоченный queryset тех групп / преподавателей / аудиторий, у которых
+    есть занятия в этот день. Пагинируется он, а не сами занятия.
+    """
+    lessons = _filter_groups(Schedule.objects.filter(date=day, is_active=True), faculty, course)
+    
+    if grouping == 'teacher':
+        return TeacherProfile.objects.filter(
+            id__in=lessons.values('teacher_id')
+        ).select_related('user').order_by('user__last_name', 'user__first_name', 'id')
+    if grouping == 'classroom':
+        return lessons.order_by('classroom').values_list('classroom', flat=True).distinct()
+    return Group.objects.filter(id__in=lessons.values('group_id')).order_by('course', 'name')
+
+
+def institute_day_lessons(day, grouping, owners, faculty=None, course=None):
+    """
+    Занятия дня для владельцев одной страницы, сгруппированные за один проход:
+    список пар (владелец, занятия) в порядке owners. Фильтр факультета и курса
+    тот же, что в institute_day_owners: у преподавателя или аудитории
+    показываются только занятия групп из выборки.
+    """
+    if grouping == 'classroom':
+        keys = list(owners)
+        lookup = 'classroom__in'
+        key_of = lambda lesson: lesson.classroom
+    else:
+        keys = [owner.id for owner in owners]
+        lookup = f'{grouping}_id__in'
+        key_of = lambda lesson: getattr(lesson, f'{grouping}_id')
+    
+    lessons = _filter_groups(lessons_queryset('all', None, day, day).filter(**{lookup: keys}), faculty, course)
+    by_owner = {}
+    for lesson in lessons:
+        by_owner.setdefault(key_of(lesson), []).append(lesson)
+    return [(owner, by_owner.get(key, [])) for owner, key in zip(owners, keys)]
@@ -0,0 +1,71 @@
+"""
+Подбор слотов для переноса занятия (для запросов на изменение)
+
+Занятость группы и преподавателя за горизонт читается одним запросом,
+занятость аудиторий - из недельных масок schedules.rooms. Свободные слоты
+пересекаются за один проход по дням, для каждого выбирается свободная
+аудитория (в первую очередь - прежняя), кандидаты ранжируются по
+близости к исходному занятию.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from week_masks import DAYS_PER_WEEK, week_start_of, slot_bit
+
+from .models import Schedule, LessonTime
+from .rooms import week_occupancy, known_classrooms
+
+Candidate = namedtuple('Candidate', 'date lesson_time classroom score')
+
+# Штрафы ранжирования: день сдвига, пара сдвига, смена аудитории
+DAY_PENALTY = 1
+PAIR_PENALTY = 2
+ROOM_PENALTY = 3
+
+
+def reschedule_options(schedule, horizon_days=30, limit=20, start=None):
+    """
+    Лучшие варианты переноса занятия на период [start, start + horizon_days].
+    По умолчанию поиск начинается с завтрашнего дня.
+    """
+    start = start or timezone.now().date() + timedelta(days=1)
+    end = start + timedelta(days=horizon_days)
+    lesson_times = list(LessonTime.objects.order_by('lesson_number'))
+    positions = {lesson_time.id: index for index, lesson_time in enumerate(lesson_times)}
+    original_number = schedule.lesson_time.lesson_number
+    
+    busy = set(Schedule.objects.filter(
+        Q(group_id=schedule.group_id) | Q(teacher_id=schedule.teacher_id),
+        date__range=[start, end],
+        is_active=True
+    ).exclude(pk=schedule.pk).values_list('date', 'lesson_time_id'))
+    classrooms = known_classrooms()
+    
+    candidates = []
+    day = start
+    while day <= end:
+        if day.weekday() < DAYS_PER_WEEK:
+            rooms = week_occupancy(day, positions)
+            week_start = week_start_of(day)
+            for lesson_time in lesson_times:
+                # Занятые слоты и исходный слот самого занятия пропускаются
+                if (day, lesson_time.id) in busy or (day, lesson_time.id) == (schedule.date, schedule.lesson_time_id):
+                    continue
+                bit = slot_bit(week_start, len(positions), day, positions[lesson_time.id])
+                if not rooms.get(schedule.classroom, 0) & bit:
+                    classroom = schedule.classroom
+                else:
+                    classroom = next((room for room in classrooms if not rooms.get(room, 0) & bit), None)
+                    if classroom is None:
+                        continue
+                score = (DAY_PENALTY * abs((day - schedule.date).days)
+                         + PAIR_PENALTY * abs(lesson_time.lesson_number - original_number)
+                         + (0 if classroom == schedule.classroom else ROOM_PENALTY))
+                candidates.append(Candidate(day, lesson_time, classroom, score))
+        day += timedelta(days=1)
+    
+    candidates.sort(key=lambda c: (c.score, c.date, c.lesson_time.lesson_number))
+    return candidates[:limit]
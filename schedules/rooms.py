@@ -0,0 +1,104 @@
+"""
+Поиск свободных аудиторий
+
+Индекс занятости аудиторий хранится в кэше Django по ISO-неделям: для
+каждой аудитории одна битовая маска недели в раскладке week_masks (общей
+с services.occupancy Flask-версии): бит day * N + position означает, что
+в учебный день day занята пара с позицией position в расписании звонков
+(по номеру пары), а не с id: id растут с каждой правкой звонков. Вместе
+с масками хранится раскладка позиций, и после изменения звонков неделя
+перестраивается. Неделя строится одним запросом и сбрасывается вместе с
+недельным кэшем расписания (cache.invalidate_week), поэтому после записи
+пересчитывается только затронутая неделя.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from week_masks import DAYS_PER_WEEK, week_start_of, week_starts, slot_bit, requested_mask
+
+from .models import Schedule, LessonTime
+
+CLASSROOMS_KEY = 'rooms:all'
+
+
+def rooms_week_key(day):
+    iso_year, iso_week, _ = day.isocalendar()
+    return f'rooms:week:{iso_year}-W{iso_week:02d}'
+
+
+def _timeout():
+    return getattr(settings, 'SCHEDULE_CACHE_TIMEOUT', 300)
+
+
+def bell_positions():
+    """Позиции пар в масках: {id LessonTime: индекс по номеру пары}"""
+    ids = LessonTime.objects.order_by('lesson_number').values_list('id', flat=True)
+    return {lesson_time_id: index for index, lesson_time_id in enumerate(ids)}
+
+
+def week_occupancy(day, positions=None):
+    """
+    Занятость аудиторий на неделе, содержащей дату: {аудитория: маска недели}.
+    positions - результат bell_positions(), если он уже получен.
+    """
+    if positions is None:
+        positions = bell_positions()
+    layout = tuple(sorted(positions.items()))
+    key = rooms_week_key(day)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == layout:
+        occupancy = cached[1]
+    else:
+        week_start = week_start_of(day)
+        width = len(positions)
+        occupancy = {}
+        rows = Schedule.objects.filter(
+            date__range=[week_start, week_start + timedelta(days=DAYS_PER_WEEK - 1)],
+            is_active=True
+        ).values_list('classroom', 'date', 'lesson_time_id')
+        for classroom, date, lesson_time_id in rows:
+            occupancy[classroom] = (occupancy.get(classroom, 0)
+                                    | slot_bit(week_start, width, date, positions.get(lesson_time_id)))
+        cache.set(key, (layout, occupancy), _timeout())
+    return occupancy
+
+
+def known_classrooms():
+    """Все аудитории, встречающиеся в расписании, по алфавиту"""
+    classrooms = cache.get(CLASSROOMS_KEY)
+    if classrooms is None:
+        classrooms = list(Schedule.objects.order_by('classroom').values_list('classroom', flat=True).distinct())
+        cache.set(CLASSROOMS_KEY, classrooms, _timeout())
+    return classrooms
+
+
+def invalidate_rooms(day):
+    """Сброс занятости аудиторий на неделе, содержащей дату"""
+    cache.delete_many([rooms_week_key(day), CLASSROOMS_KEY])
+
+
+def free_classrooms(start, end=None, lesson_time_ids=None, prefix=None):
+    """
+    Аудитории, свободные в каждый день периода [start, end] во всех
+    указанных слотах LessonTime (по умолчанию - весь день).
+    prefix отбирает аудитории по началу номера (корпус, этаж).
+    """
+    end = end or start
+    positions = bell_positions()
+    requested_positions = None
+    if lesson_time_ids:
+        requested_positions = [positions[int(i)] for i in lesson_time_ids if int(i) in positions]
+    
+    busy = set()
+    for week_start in week_starts(start, end):
+        requested = requested_mask(week_start, len(positions), start, end, requested_positions)
+        if not requested:
+            continue
+        for classroom, mask in week_occupancy(week_start, positions).items():
+            if mask & requested:
+                busy.add(classroom)
+    
+    return [classroom for classroom in known_classrooms()
+            if classroom not in busy and (not prefix or classroom.startswith(prefix))]
@@ -0,0 +1,28 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_week
+from .models import Schedule
+
+
+@receiver(pre_save, sender=Schedule)
+def remember_schedule_slot(sender, instance, **kwargs):
+    """Запоминает прежние группу/преподавателя/дату перед изменением занятия"""
+    instance._old_slot = None
+    if instance.pk:
+        instance._old_slot = Schedule.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'teacher_id', 'date'
+        ).first()
+
+
+@receiver(post_save, sender=Schedule)
+def invalidate_schedule_week_on_save(sender, instance, **kwargs):
+    old_slot = getattr(instance, '_old_slot', None)
+    if old_slot:
+        invalidate_week(*old_slot)
+    invalidate_week(instance.group_id, instance.teacher_id, instance.date)
+
+
+@receiver(post_delete, sender=Schedule)
+def invalidate_schedule_week_on_delete(sender, instance, **kwargs):
+    invalidate_week(instance.group_id, instance.teacher_id, instance.date)
@@ -0,0 +1,197 @@
+from datetime import date, time
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User, TeacherProfile
+from groups.models import Group, Subject
+from .importer import TimetableImporter
+from .models import LessonTime, Schedule, ChangeRequest
+from .queries import institute_day_owners, institute_day_lessons
+from .rooms import free_classrooms
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TimetableImporterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('teacher', password='-', first_name='Иван', last_name='Петров',
+                                        role='teacher')
+        TeacherProfile.objects.create(user=user, department='Кафедра', position='Доцент')
+        Group.objects.create(name='ПИ-21', course=2, faculty='ФИТ')
+        Subject.objects.create(name='Базы данных', code='DB101')
+        LessonTime.objects.create(lesson_number=1, start_time=time(8, 0), end_time=time(9, 30))
+
+    def row(self, **fields):
+        row = {'date': '2025-09-01', 'lesson_number': '1', 'group': 'ПИ-21', 'subject': 'DB101',
+               'teacher': 'teacher', 'lesson_type': 'lecture', 'classroom': '101', 'notes': ''}
+        row.update(fields)
+        return row
+
+    def test_identical_rows_keep_first_and_report_duplicate(self):
+        result = TimetableImporter().run([self.row(), self.row()], skip_invalid=True)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([row_number for row_number, _ in result.errors], [3])
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_identical_rows_roll_back_without_skip_invalid(self):
+        result = TimetableImporter().run([self.row(), self.row()])
+
+        self.assertEqual(result.created, 0)
+        self.assertEqual([row_number for row_number, _ in result.errors], [3])
+        self.assertFalse(Schedule.objects.exists())
+
+
+class InstituteDayTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='teacher', role='teacher')
+        teacher = TeacherProfile.objects.create(user=user, department='Кафедра', position='Доцент')
+        subject = Subject.objects.create(name='Базы данных', code='DB101')
+        first, second = [LessonTime.objects.create(lesson_number=n, start_time=time(8 + n), end_time=time(9 + n))
+                         for n in (1, 2)]
+        cls.day = date(2025, 9, 1)
+        for group, lesson_time in ((Group.objects.create(name='ПИ-21', course=2, faculty='ФИТ'), first),
+                                   (Group.objects.create(name='ЭК-21', course=2, faculty='ФЭУ'), second)):
+            Schedule.objects.create(group=group, teacher=teacher, subject=subject, lesson_time=lesson_time,
+                                    weekday=1, classroom='101', date=cls.day)
+
+    def test_teacher_and_classroom_sections_respect_faculty(self):
+        for grouping in ('teacher', 'classroom'):
+            owners = list(institute_day_owners(self.day, grouping, faculty='ФИТ'))
+            sections = institute_day_lessons(self.day, grouping, owners, faculty='ФИТ')
+
+            self.assertEqual(len(sections), 1)
+            self.assertEqual([lesson.group.name for lesson in sections[0][1]], ['ПИ-21'])
+
+
+class FreeClassroomsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='teacher', role='teacher')
+        teacher = TeacherProfile.objects.create(user=user, department='Кафедра', position='Доцент')
+        # id пар не совпадают с их порядком по номеру
+        cls.third = LessonTime.objects.create(pk=41, lesson_number=3, start_time=time(11), end_time=time(12))
+        cls.second = LessonTime.objects.create(pk=42, lesson_number=2, start_time=time(9), end_time=time(10))
+        cls.day = date(2025, 9, 1)
+        Schedule.objects.create(group=Group.objects.create(name='ПИ-21', course=2, faculty='ФИТ'),
+                                teacher=teacher, subject=Subject.objects.create(name='Базы данных', code='DB101'),
+                                lesson_time=cls.third, weekday=1, classroom='101', date=cls.day)
+
+    def setUp(self):
+        cache.clear()
+
+    def free(self, lesson_time):
+        return free_classrooms(self.day, lesson_time_ids=[lesson_time.id])
+
+    def test_busy_slot_is_matched_by_position(self):
+        self.assertEqual(self.free(self.third), [])
+        self.assertEqual(self.free(self.second), ['101'])
+
+    def test_cached_week_is_rebuilt_after_bell_change(self):
+        self.free(self.third)
+        first = LessonTime.objects.create(pk=43, lesson_number=1, start_time=time(8), end_time=time(9))
+
+        self.assertEqual(self.free(self.third), [])
+        self.assertEqual(self.free(first), ['101'])
+
+
+# Чтение с основной БД: тестовая реплика - зеркало вне транзакции теста
+@override_settings(DATABASE_ROUTERS=[])
+class CreateChangeRequestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='teacher', role='teacher')
+        teacher = TeacherProfile.objects.create(user=cls.user, department='Кафедра', position='Доцент')
+        lesson_time = LessonTime.objects.create(lesson_number=1, start_time=time(8), end_time=time(9))
+        cls.schedule = Schedule.objects.create(
+            group=Group.objects.create(name='ПИ-21', course=2, faculty='ФИТ'), teacher=teacher,
+            subject=Subject.objects.create(name='Базы данных', code='DB101'), lesson_time=lesson_time,
+            weekday=1, classroom='101', date=date(2025, 9, 1))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('schedules:create_change_request', args=[self.schedule.id])
+
+    def test_form_lists_reschedule_options(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['options'])
+
+    def test_selected_option_becomes_new_value(self):
+        value, option = self.client.get(self.url).context['options'][0]
+
+        self.client.post(self.url, {'slot': value, 'reason': 'Командировка'})
+
+        change_request = ChangeRequest.objects.get()
+        self.assertEqual(change_request.request_type, 'Перенос занятия')
+        self.assertIn(f'{option.date:%d.%m.%Y}', change_request.new_value)
+        self.assertIn('ауд. 101', change_request.old_value)
+
+    def test_other_user_is_redirected_to_dashboard(self):
+        self.client.force_login(User.objects.create(username='student', role='student'))
+
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, reverse('accounts:dashboard'), fetch_redirect_response=False)
+
+
+class InstituteDayAccessTests(TestCase):
+
+    def test_student_is_redirected_to_dashboard(self):
+        self.client.force_login(User.objects.create(username='student', role='student'))
+
+        response = self.client.get(reverse('schedules:schedule_admin_day'))
+
+        self.assertRedirects(response, reverse('accounts:dashboard'), fetch_redirect_response=False)
+
+
+class FreeRoomsAccessTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create(username='student', role='student'))
+
+    def test_student_is_redirected_from_page(self):
+        response = self.client.get(reverse('schedules:free_rooms'))
+
+        self.assertRedirects(response, reverse('accounts:dashboard'), fetch_redirect_response=False)
+
+    def test_student_is_denied_by_api(self):
+        response = self.client.get(reverse('schedules:api_free_rooms'), {'date': '2025-09-01'})
+
+        self.assertEqual(response.status_code, 403)
+
+
+class GroupSlotConstraintTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = TeacherProfile.objects.create(user=User.objects.create(username='teacher', role='teacher'),
+                                                department='Кафедра', position='Доцент')
+        cls.fields = dict(group=Group.objects.create(name='ПИ-21', course=2, faculty='ФИТ'), teacher=teacher,
+                          subject=Subject.objects.create(name='Базы данных', code='DB101'),
+                          lesson_time=LessonTime.objects.create(lesson_number=1, start_time=time(8),
+                                                                end_time=time(9)),
+                          weekday=1, classroom='101', date=date(2025, 9, 1))
+
+    def test_second_active_lesson_in_slot_is_rejected(self):
+        Schedule.objects.create(**self.fields)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Schedule.objects.create(**self.fields)
+
+    def test_inactive_lessons_do_not_occupy_slot(self):
+        Schedule.objects.create(is_active=False, **self.fields)
+        Schedule.objects.create(is_active=False, **self.fields)
+        Schedule.objects.create(**self.fields)
+
+        self.assertEqual(Schedule.objects.count(), 3)
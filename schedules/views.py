@@ -1,49 +1,88 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.urls import reverse
+from django.db.models import Count, Max
 from django.utils import timezone
+from django.views.decorators.http import condition
 from datetime import datetime, timedelta
+import hashlib
 from .models import Schedule, LessonTime, Note, ChangeRequest
-from accounts.models import StudentProfile
+from .cache import week_range
+from .queries import (
+    user_scope, user_lessons, group_by_day, month_calendar,
+    INSTITUTE_GROUPINGS, institute_day_owners, institute_day_lessons,
+)
+from .pagination import keyset_paginate
+from .reschedule import reschedule_options
+from .rooms import free_classrooms
+from groups.models import Group
 
 
-@login_required
-def schedule_day_view(request):
-    """Расписание на день"""
+def _selected_date(request):
+    """Дата из параметра ?date=ГГГГ-ММ-ДД (по умолчанию сегодня)"""
     date_str = request.GET.get('date')
     if date_str:
         try:
-            selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            return datetime.strptime(date_str, '%Y-%m-%d').date()
         except ValueError:
-            selected_date = timezone.now().date()
-    else:
-        selected_date = timezone.now().date()
+            pass
+    return timezone.now().date()
+
+
+def _schedule_etag(request, start, end):
+    """
+    ETag расписания пользователя за период.
+    Считается одним запросом COUNT/MAX(updated_at) и запоминается на запросе.
+    Last-Modified не выдается: удаление или отключение занятия не увеличивает
+    MAX(updated_at), а число занятий в ETag это изменение видит.
+    """
+    if hasattr(request, '_schedule_etag'):
+        return request._schedule_etag
     
-    if request.user.is_student():
-        try:
-            student_profile = request.user.student_profile
-            schedules = Schedule.objects.filter(
-                group=student_profile.group,
-                date=selected_date,
-                is_active=True
-            ).select_related('subject', 'teacher__user', 'lesson_time').order_by('lesson_time__lesson_number')
-        except StudentProfile.DoesNotExist:
-            schedules = []
-    elif request.user.is_teacher():
-        try:
-            teacher_profile = request.user.teacher_profile
-            schedules = Schedule.objects.filter(
-                teacher=teacher_profile,
-                date=selected_date,
-                is_active=True
-            ).select_related('subject', 'group', 'lesson_time').order_by('lesson_time__lesson_number')
-        except:
-            schedules = []
-    else:
-        schedules = Schedule.objects.filter(
-            date=selected_date,
-            is_active=True
-        ).select_related('subject', 'group', 'teacher__user', 'lesson_time').order_by('lesson_time__lesson_number')
+    etag = None
+    # Страницу с непоказанными сообщениями нужно отрендерить заново
+    if not len(messages.get_messages(request)):
+        user = request.user
+        kind, owner_id = user_scope(user)
+        filters = {'date__range': [start, end], 'is_active': True}
+        if kind != 'all':
+            filters[f'{kind}_id'] = owner_id
+        scope = f'{kind}:{owner_id}' if kind != 'all' else 'all'
+        
+        stats = Schedule.objects.filter(**filters).aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        raw = f"{user.pk}|{scope}|{start}|{end}|{stats['count']}|{stats['last_modified']}"
+        etag = hashlib.sha1(raw.encode()).hexdigest()
+    
+    request._schedule_etag = etag
+    return etag
+
+
+def _day_etag(request):
+    # Администратор перенаправляется в сводку по институту
+    if user_scope(request.user)[0] == 'all':
+        return None
+    selected_date = _selected_date(request)
+    return _schedule_etag(request, selected_date, selected_date)
+
+
+def _week_etag(request):
+    return _schedule_etag(request, *week_range(_selected_date(request)))
+
+
+@login_required
+@condition(etag_func=_day_etag)
+def schedule_day_view(request):
+    """Расписание на день"""
+    selected_date = _selected_date(request)
+    
+    if user_scope(request.user)[0] == 'all':
+        return redirect(f"{reverse('schedules:schedule_admin_day')}?date={selected_date:%Y-%m-%d}")
+    
+    schedules = user_lessons(request.user, selected_date, selected_date)
     
     context = {
         'schedules': schedules,
@@ -55,53 +94,51 @@ def schedule_day_view(request):
 
 
 @login_required
+def schedule_admin_day_view(request):
+    """Расписание института на день: по группам, преподавателям или аудиториям постранично"""
+    if not (request.user.is_admin() or request.user.is_superuser):
+        messages.error(request, 'Доступ запрещён')
+        return redirect('accounts:dashboard')
+    
+    selected_date = _selected_date(request)
+    grouping = request.GET.get('by', 'group')
+    if grouping not in INSTITUTE_GROUPINGS:
+        grouping = 'group'
+    faculty = request.GET.get('faculty', '').strip()
+    course = request.GET.get('course', '')
+    course = int(course) if course.isdigit() else None
+    
+    owners = institute_day_owners(selected_date, grouping, faculty=faculty, course=course)
+    page = Paginator(owners, getattr(settings, 'SCHEDULE_ADMIN_PAGE_SIZE', 20)).get_page(request.GET.get('page'))
+    
+    context = {
+        'sections': institute_day_lessons(selected_date, grouping, page.object_list,
+                                          faculty=faculty, course=course),
+        'page': page,
+        'grouping': grouping,
+        'faculty': faculty,
+        'course': course,
+        'faculties': Group.objects.order_by('faculty').values_list('faculty', flat=True).distinct(),
+        'courses': Group.objects.order_by('course').values_list('course', flat=True).distinct(),
+        'selected_date': selected_date,
+        'prev_date': selected_date - timedelta(days=1),
+        'next_date': selected_date + timedelta(days=1),
+    }
+    return render(request, 'schedules/schedule_admin_day.html', context)
+
+
+@login_required
+@condition(etag_func=_week_etag)
 def schedule_week_view(request):
     """Расписание на неделю"""
-    date_str = request.GET.get('date')
-    if date_str:
-        try:
-            selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        except ValueError:
-            selected_date = timezone.now().date()
-    else:
-        selected_date = timezone.now().date()
+    selected_date = _selected_date(request)
     
     # Начало недели (понедельник)
     start_of_week = selected_date - timedelta(days=selected_date.weekday())
     end_of_week = start_of_week + timedelta(days=6)
     
-    if request.user.is_student():
-        try:
-            student_profile = request.user.student_profile
-            schedules = Schedule.objects.filter(
-                group=student_profile.group,
-                date__range=[start_of_week, end_of_week],
-                is_active=True
-            ).select_related('subject', 'teacher__user', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
-        except StudentProfile.DoesNotExist:
-            schedules = []
-    elif request.user.is_teacher():
-        try:
-            teacher_profile = request.user.teacher_profile
-            schedules = Schedule.objects.filter(
-                teacher=teacher_profile,
-                date__range=[start_of_week, end_of_week],
-                is_active=True
-            ).select_related('subject', 'group', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
-        except:
-            schedules = []
-    else:
-        schedules = Schedule.objects.filter(
-            date__range=[start_of_week, end_of_week],
-            is_active=True
-        ).select_related('subject', 'group', 'teacher__user', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
-    
     # Группировка по дням
-    schedule_by_day = {}
-    for schedule in schedules:
-        if schedule.date not in schedule_by_day:
-            schedule_by_day[schedule.date] = []
-        schedule_by_day[schedule.date].append(schedule)
+    schedule_by_day = group_by_day(user_lessons(request.user, start_of_week, end_of_week))
     
     context = {
         'schedule_by_day': schedule_by_day,
@@ -134,41 +171,102 @@ def schedule_month_view(request):
     else:
         last_day = first_day.replace(month=first_day.month + 1, day=1) - timedelta(days=1)
     
-    if request.user.is_student():
-        try:
-            student_profile = request.user.student_profile
-            schedules = Schedule.objects.filter(
-                group=student_profile.group,
-                date__range=[first_day, last_day],
-                is_active=True
-            ).select_related('subject', 'teacher__user', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
-        except StudentProfile.DoesNotExist:
-            schedules = []
-    elif request.user.is_teacher():
-        try:
-            teacher_profile = request.user.teacher_profile
-            schedules = Schedule.objects.filter(
-                teacher=teacher_profile,
-                date__range=[first_day, last_day],
-                is_active=True
-            ).select_related('subject', 'group', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
-        except:
-            schedules = []
+    # Сетка месяца по агрегатам, подробно - только выбранный день
+    weeks = month_calendar(request.user, first_day, last_day)
+    
+    selected_day = None
+    schedules = []
+    try:
+        selected_day = first_day.replace(day=int(request.GET['day']))
+    except (KeyError, ValueError):
+        pass
     else:
-        schedules = Schedule.objects.filter(
-            date__range=[first_day, last_day],
-            is_active=True
-        ).select_related('subject', 'group', 'teacher__user', 'lesson_time').order_by('date', 'lesson_time__lesson_number')
+        schedules = user_lessons(request.user, selected_day, selected_day)
     
     context = {
+        'weeks': weeks,
         'schedules': schedules,
         'selected_date': selected_date,
+        'selected_day': selected_day,
         'first_day': first_day,
         'last_day': last_day,
+        'prev_month': first_day - timedelta(days=1),
+        'next_month': last_day + timedelta(days=1),
     }
     return render(request, 'schedules/schedule_month.html', context)
 
 
+def _free_rooms_params(request):
+    """Период, слоты и префикс поиска аудиторий из GET; ValueError при ошибке"""
+    start = datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    end = datetime.strptime(request.GET.get('date_to') or request.GET['date'], '%Y-%m-%d').date()
+    max_days = getattr(settings, 'FREE_ROOMS_MAX_DAYS', 183)
+    if end < start or (end - start).days + 1 > max_days:
+        raise ValueError(f'Период поиска - от 1 до {max_days} дней')
+    lesson_time_ids = [int(value) for value in request.GET.getlist('lesson_time')]
+    return start, end, lesson_time_ids, request.GET.get('prefix', '').strip() or None
+
+
+@login_required
+def free_rooms_view(request):
+    """Поиск свободных аудиторий"""
+    if request.user.is_student():
+        messages.error(request, 'Доступ запрещён')
+        return redirect('accounts:dashboard')
+    
+    rooms = None
+    if request.GET.get('date'):
+        try:
+            start, end, lesson_time_ids, prefix = _free_rooms_params(request)
+        except ValueError:
+            messages.error(request, 'Неверные параметры поиска')
+            return redirect('schedules:free_rooms')
+        rooms = free_classrooms(start, end, lesson_time_ids, prefix)
+    
+    context = {
+        'rooms': rooms,
+        'lesson_times': LessonTime.objects.all(),
+    }
+    return render(request, 'schedules/free_rooms.html', context)
+
+
+@login_required
+def api_free_rooms_view(request):
+    """JSON: свободные аудитории (date, date_to, lesson_time, prefix)"""
+    if request.user.is_student():
+        return JsonResponse({'error': 'Доступ запрещён'}, status=403)
+    
+    try:
+        start, end, lesson_time_ids, prefix = _free_rooms_params(request)
+    except (KeyError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(free_classrooms(start, end, lesson_time_ids, prefix), safe=False)
+
+
+@login_required
+def api_reschedule_options_view(request, schedule_id):
+    """JSON: варианты переноса занятия (для преподавателя занятия и администратора)"""
+    schedule = get_object_or_404(Schedule.objects.select_related('lesson_time'), id=schedule_id)
+    user = request.user
+    if not (user.is_admin() or user.is_superuser or user_scope(user) == ('teacher', schedule.teacher_id)):
+        return JsonResponse({'error': 'Доступ запрещён'}, status=403)
+    
+    try:
+        horizon = int(request.GET.get('days', 30))
+    except ValueError:
+        horizon = 30
+    horizon = min(max(horizon, 1), getattr(settings, 'RESCHEDULE_MAX_DAYS', 62))
+    
+    return JsonResponse([{
+        'date': c.date.isoformat(),
+        'lesson_time_id': c.lesson_time.id,
+        'lesson_number': c.lesson_time.lesson_number,
+        'lesson_time': f"{c.lesson_time.start_time:%H:%M} - {c.lesson_time.end_time:%H:%M}",
+        'classroom': c.classroom,
+        'score': c.score,
+    } for c in reschedule_options(schedule, horizon_days=horizon)], safe=False)
+
+
 @login_required
 def lesson_times_view(request):
     """Расписание звонков"""
@@ -186,12 +284,13 @@ def notes_view(request):
         messages.error(request, 'Доступ запрещён')
         return redirect('dashboard')
     
-    notes = Note.objects.filter(student=request.user).select_related(
-        'schedule__subject', 'schedule__teacher__user'
-    ).order_by('-created_at')
+    page = keyset_paginate(Note.objects.filter(student=request.user).select_related(
+        'schedule__subject', 'schedule__teacher__user', 'schedule__lesson_time'
+    ), request.GET.get('cursor'), per_page=30)
     
     context = {
-        'notes': notes
+        'notes': page.items,
+        'next_cursor': page.next_cursor,
     }
     return render(request, 'schedules/notes.html', context)
 
@@ -219,6 +318,60 @@ def add_note_view(request, schedule_id):
     return redirect('schedules:schedule_day')
 
 
+def _slot_value(candidate):
+    """Значение варианта переноса в форме запроса"""
+    return f'{candidate.date.isoformat()}|{candidate.lesson_time.id}|{candidate.classroom}'
+
+
+def _slot_label(day, lesson_time, classroom):
+    return f'{day:%d.%m.%Y}, {lesson_time.lesson_number} пара, ауд. {classroom}'
+
+
+@login_required
+def create_change_request_view(request, schedule_id):
+    """Запрос на изменение занятия с подобранными вариантами переноса (для преподавателя)"""
+    schedule = get_object_or_404(Schedule.objects.select_related('subject', 'group', 'lesson_time'), id=schedule_id)
+    if user_scope(request.user) != ('teacher', schedule.teacher_id):
+        messages.error(request, 'Доступ запрещён')
+        return redirect('accounts:dashboard')
+    
+    options = reschedule_options(schedule, horizon_days=getattr(settings, 'RESCHEDULE_MAX_DAYS', 62))
+    
+    if request.method == 'POST':
+        slot = request.POST.get('slot', '')
+        new_value = request.POST.get('new_value', '').strip()
+        reason = request.POST.get('reason', '').strip()
+        if slot:
+            candidate = next((c for c in options if _slot_value(c) == slot), None)
+            if candidate is None:
+                messages.error(request, 'Выбранный вариант уже занят, выберите другой')
+                return redirect('schedules:create_change_request', schedule_id=schedule.id)
+            request_type = 'Перенос занятия'
+            new_value = _slot_label(candidate.date, candidate.lesson_time, candidate.classroom)
+        else:
+            request_type = 'Другое'
+        if not new_value or not reason:
+            messages.error(request, 'Выберите вариант переноса или опишите изменение и укажите причину')
+            return redirect('schedules:create_change_request', schedule_id=schedule.id)
+        
+        ChangeRequest.objects.create(
+            teacher_id=schedule.teacher_id,
+            schedule=schedule,
+            request_type=request_type,
+            old_value=_slot_label(schedule.date, schedule.lesson_time, schedule.classroom),
+            new_value=new_value,
+            reason=reason
+        )
+        messages.success(request, 'Запрос отправлен администратору')
+        return redirect(f"{reverse('schedules:schedule_day')}?date={schedule.date.isoformat()}")
+    
+    context = {
+        'schedule': schedule,
+        'options': [(_slot_value(c), c) for c in options],
+    }
+    return render(request, 'schedules/change_request_form.html', context)
+
+
 @login_required
 def change_requests_view(request):
     """Список запросов на изменение (для администратора)"""
@@ -226,12 +379,24 @@ def change_requests_view(request):
         messages.error(request, 'Доступ запрещён')
         return redirect('dashboard')
     
-    requests = ChangeRequest.objects.select_related(
+    status = request.GET.get('status')
+    q = request.GET.get('q', '').strip()
+    
+    change_requests = ChangeRequest.objects.select_related(
         'teacher__user', 'schedule__subject', 'schedule__group'
-    ).order_by('-created_at')
+    )
+    if status:
+        change_requests = change_requests.filter(status=status)
+    if q:
+        change_requests = change_requests.filter(teacher__user__last_name__istartswith=q)
+    
+    page = keyset_paginate(change_requests, request.GET.get('cursor'), per_page=50)
     
     context = {
-        'requests': requests
+        'requests': page.items,
+        'next_cursor': page.next_cursor,
+        'status': status,
+        'q': q,
     }
     return render(request, 'schedules/change_requests.html', context)
 
@@ -0,0 +1,3 @@
+"""
+Пакет сервисов Flask приложения
+"""
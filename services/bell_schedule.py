@@ -0,0 +1,105 @@
+"""
+Снимок расписания звонков (LessonTime) в памяти процесса
+
+Расписание звонков меняется несколько раз в год, поэтому процесс держит
+неизменяемый снимок таблицы. Версия снимка - хэш содержимого lesson_times,
+поэтому во всех процессах она одинакова и не зависит от бэкенда кэша.
+Процесс сверяет таблицу не чаще раза в BELL_SCHEDULE_CHECK_INTERVAL секунд
+(14 строк), процесс, изменивший звонки, перечитывает их сразу
+(refresh_bell_schedule).
+"""
+from bisect import bisect_right
+from collections import namedtuple
+from hashlib import sha1
+from types import MappingProxyType
+import threading
+import time
+
+from flask import current_app
+
+from extensions import db
+from models import LessonTime
+
+
+class LessonSlot(namedtuple('LessonSlot', 'id lesson_number hour_number start_time end_time')):
+    """Неизменяемая строка расписания звонков"""
+    __slots__ = ()
+    
+    def get_time_range(self):
+        return f'{self.start_time.strftime("%H:%M")} - {self.end_time.strftime("%H:%M")}'
+
+
+class BellSchedule:
+    """Неизменяемый снимок расписания звонков"""
+    
+    def __init__(self, slots, version):
+        self.version = version
+        self.slots = tuple(sorted(slots, key=lambda s: (s.lesson_number, s.hour_number)))
+        self._by_start = tuple(sorted(self.slots, key=lambda s: s.start_time))
+        self.start_times = tuple(s.start_time for s in self._by_start)
+        self.end_times = tuple(s.end_time for s in self._by_start)
+        self._by_id = MappingProxyType({s.id: s for s in self.slots})
+        by_number = {}
+        for s in self.slots:
+            by_number.setdefault(s.lesson_number, []).append(s)
+        self._by_number = MappingProxyType({n: tuple(items) for n, items in by_number.items()})
+    
+    def __iter__(self):
+        return iter(self.slots)
+    
+    def __len__(self):
+        return len(self.slots)
+    
+    def get(self, lesson_time_id):
+        """Строка по id (None, если такой нет)"""
+        return self._by_id.get(int(lesson_time_id))
+    
+    def by_lesson_number(self, lesson_number):
+        """Все академические часы пары с указанным номером"""
+        return self._by_number.get(int(lesson_number), ())
+    
+    def slot_at(self, moment):
+        """Строка, идущая в указанное время суток (None - перемена или вне расписания)"""
+        index = bisect_right(self.start_times, moment) - 1
+        if index >= 0 and moment < self.end_times[index]:
+            return self._by_start[index]
+        return None
+
+
+_snapshot = None
+_checked_at = float('-inf')
+_lock = threading.Lock()
+
+
+def _read():
+    """Строки таблицы и версия - хэш их содержимого"""
+    slots = [LessonSlot(*row) for row in db.session.query(
+        LessonTime.id, LessonTime.lesson_number, LessonTime.hour_number,
+        LessonTime.start_time, LessonTime.end_time
+    ).order_by(LessonTime.id)]
+    return slots, sha1(repr(slots).encode()).hexdigest()[:16]
+
+
+def get_bell_schedule():
+    """Текущий снимок; сверяет таблицу не чаще раза в BELL_SCHEDULE_CHECK_INTERVAL секунд"""
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    interval = current_app.config.get('BELL_SCHEDULE_CHECK_INTERVAL', 10)
+    if snapshot is not None and time.monotonic() - _checked_at < interval:
+        return snapshot
+    
+    with _lock:
+        if _snapshot is None or time.monotonic() - _checked_at >= interval:
+            slots, version = _read()
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = BellSchedule(slots, version)
+            _checked_at = time.monotonic()
+        return _snapshot
+
+
+def refresh_bell_schedule():
+    """Перечитать звонки сразу (после правки в этом процессе); возвращает снимок"""
+    global _checked_at
+    with _lock:
+        _checked_at = float('-inf')
+    return get_bell_schedule()
@@ -0,0 +1,125 @@
+"""
+Кэш расписания Flask приложения
+
+Бэкенд выбирается настройкой SCHEDULE_CACHE_BACKEND:
+- 'lru'   - LRU в памяти процесса (по умолчанию)
+- 'redis' - Redis-совместимый клиент из REDIS_URL
+
+RedisCache принимает любой объект с методами get/set/setex/delete,
+поэтому в разработке его можно запустить с локальной заменой Redis.
+"""
+from collections import OrderedDict
+import json
+import threading
+import time
+
+
+class LRUCache:
+    """LRU кэш в памяти процесса с ограничением по числу ключей и TTL"""
+    
+    def __init__(self, maxsize=1024, timeout=300):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        expires = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Кэш поверх Redis-совместимого клиента, значения хранятся в JSON"""
+    
+    def __init__(self, client, timeout=300, prefix='schedule:'):
+        self.client = client
+        self.timeout = timeout
+        self.prefix = prefix
+    
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+    
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        raw = json.dumps(value, ensure_ascii=False)
+        if timeout:
+            self.client.setex(self.prefix + key, timeout, raw)
+        else:
+            self.client.set(self.prefix + key, raw)
+    
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+    
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ScheduleCache:
+    """Расширение Flask, делегирующее вызовы выбранному бэкенду"""
+    
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        backend = app.config.get('SCHEDULE_CACHE_BACKEND', 'lru')
+        timeout = app.config.get('SCHEDULE_CACHE_TIMEOUT', 300)
+        
+        if backend == 'redis':
+            import redis
+            client = redis.Redis.from_url(app.config['REDIS_URL'])
+            self.backend = RedisCache(client, timeout=timeout)
+        elif backend == 'lru':
+            self.backend = LRUCache(
+                maxsize=app.config.get('SCHEDULE_CACHE_MAXSIZE', 1024),
+                timeout=timeout
+            )
+        else:
+            raise ValueError(f'Неизвестный бэкенд кэша: {backend}')
+        
+        app.extensions['schedule_cache'] = self
+    
+    def get(self, key):
+        return self.backend.get(key)
+    
+    def set(self, key, value, timeout=None):
+        self.backend.set(key, value, timeout)
+    
+    def delete(self, *keys):
+        self.backend.delete(*keys)
+    
+    def clear(self):
+        self.backend.clear()
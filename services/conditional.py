@@ -0,0 +1,55 @@
+"""
+Условные GET-запросы (ETag) для расписания
+
+ETag считается одним запросом COUNT/MAX(updated_at) по тем же фильтрам,
+что и выборка занятий, поэтому неизменившееся расписание отвечает 304 без
+загрузки строк и рендеринга шаблонов. Last-Modified не выдается: удаление
+или отключение занятия не увеличивает MAX(updated_at), а число занятий в
+ETag это изменение видит.
+"""
+import hashlib
+
+from flask import request, session, make_response
+from sqlalchemy import func
+
+from extensions import db
+from models import Schedule
+from services.bell_schedule import get_bell_schedule
+
+
+def schedule_etag(start, end, group_id=None, teacher_id=None, extra=''):
+    """ETag занятий группы/преподавателя за период"""
+    query = db.session.query(func.count(Schedule.id), func.max(Schedule.updated_at)).filter(
+        Schedule.is_active == True,
+        Schedule.date >= start,
+        Schedule.date <= end
+    )
+    if group_id is not None:
+        query = query.filter(Schedule.group_id == group_id)
+    if teacher_id is not None:
+        query = query.filter(Schedule.teacher_id == teacher_id)
+    count, last_modified = query.one()
+    
+    raw = f'{group_id}|{teacher_id}|{start}|{end}|{count}|{last_modified}|{get_bell_schedule().version}|{extra}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def is_not_modified(etag):
+    """Проверка заголовка If-None-Match текущего запроса"""
+    # Страницу с непоказанными flash-сообщениями нужно отрендерить заново
+    if session.get('_flashes'):
+        return False
+    return bool(request.if_none_match) and request.if_none_match.contains(etag)
+
+
+def conditional(response, etag):
+    """Добавить ETag к ответу"""
+    response = make_response(response)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag):
+    """Пустой ответ 304 с ETag"""
+    return conditional(('', 304), etag)
@@ -0,0 +1,80 @@
+"""
+Проверка пересечений занятий (группа, преподаватель, аудитория)
+
+Для набора предлагаемых занятий выполняется один запрос по индексам
+расписания за охватываемый период, после чего все пересечения находятся
+в памяти (lesson_conflicts.py, общий с Django-версией).
+"""
+from sqlalchemy import or_
+
+from extensions import db
+from lesson_conflicts import LessonProposal, CONFLICT_MESSAGES, strip_classroom, detect
+from models import Schedule
+from services.bell_schedule import get_bell_schedule
+
+
+def proposal_from_schedule(s):
+    """Предложение из существующего занятия (для проверки правки или пакета)"""
+    return LessonProposal(s.group_id, s.teacher_id, s.subject_id, s.lesson_time_id,
+                          s.date, s.classroom, s.lesson_type, s.id)
+
+
+def _normalize(p):
+    return strip_classroom(p._replace(
+        group_id=int(p.group_id),
+        teacher_id=int(p.teacher_id),
+        subject_id=int(p.subject_id),
+        lesson_time_id=int(p.lesson_time_id)
+    ))
+
+
+def find_conflicts(proposals, lock=False):
+    """
+    Все пересечения для набора занятий.
+    lock=True блокирует найденный диапазон строк (SELECT ... FOR UPDATE)
+    до конца транзакции. Пустой слот так не заблокировать: занятие группы
+    в нем защищает уникальный индекс uq_schedules_group_slot (IntegrityError),
+    а встречные вставки в MySQL могут завершиться взаимной блокировкой
+    (OperationalError) - обе ошибки обрабатывают маршруты.
+    """
+    proposals = [_normalize(p) for p in proposals]
+    if not proposals:
+        return []
+    
+    own_ids = {p.id for p in proposals if p.id is not None}
+    # Столбцы в порядке полей LessonProposal
+    query = db.session.query(
+        Schedule.group_id, Schedule.teacher_id, Schedule.subject_id, Schedule.lesson_time_id,
+        Schedule.date, Schedule.classroom, Schedule.lesson_type, Schedule.id
+    ).filter(
+        Schedule.is_active == True,
+        Schedule.date >= min(p.date for p in proposals),
+        Schedule.date <= max(p.date for p in proposals),
+        Schedule.lesson_time_id.in_({p.lesson_time_id for p in proposals}),
+        or_(
+            Schedule.group_id.in_({p.group_id for p in proposals}),
+            Schedule.teacher_id.in_({p.teacher_id for p in proposals}),
+            Schedule.classroom.in_({p.classroom for p in proposals if p.classroom})
+        )
+    )
+    if own_ids:
+        query = query.filter(Schedule.id.notin_(own_ids))
+    if lock:
+        query = query.with_for_update()
+    
+    return detect(proposals, [strip_classroom(LessonProposal(*row)) for row in query])
+
+
+def conflict_messages(conflicts):
+    """Тексты пересечений для flash-сообщений"""
+    bells = get_bell_schedule()
+    messages = []
+    for c in conflicts:
+        slot = bells.get(c.proposal.lesson_time_id)
+        text = f'{CONFLICT_MESSAGES[c.kind]}: {c.proposal.date.strftime("%d.%m.%Y")}'
+        if slot:
+            text += f', {slot.get_time_range()}'
+        if c.kind == 'classroom':
+            text += f', ауд. {c.proposal.classroom}'
+        messages.append(text)
+    return messages
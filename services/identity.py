@@ -0,0 +1,133 @@
+"""
+Кэш пользователя для Flask-Login
+
+user_loader загружает пользователя вместе с профилем студента или
+преподавателя одним запросом и кладет снимок столбцов в кэш на
+IDENTITY_CACHE_TTL секунд. В следующих запросах объекты восстанавливаются
+из снимка и присоединяются к сессии без обращения к БД, поэтому
+current_user.student / current_user.teacher доступны сразу.
+Внутри одного запроса пользователь и так хранится Flask-Login.
+
+Снимок сбрасывается после коммита, изменившего пользователя или его
+профиль (активация/деактивация, подтверждение, правка профиля). С кэшем
+'lru' сброс виден только процессу, выполнившему коммит, поэтому снимок
+из такого кэша принимается после сверки is_active и role с БД (один
+запрос по первичному ключу): деактивированный или сменивший роль
+пользователь не проходит по устаревшему снимку другого процесса.
+"""
+from datetime import date, datetime
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from extensions import db, cache
+from models import User, Student, Teacher
+
+# Хэш пароля в кэш не попадает и при необходимости подгружается из БД
+EXCLUDED_COLUMNS = {'password_hash'}
+
+# Столбцы, сверяемые с БД, если кэш не общий для процессов
+ACCESS_COLUMNS = ('is_active', 'role')
+
+
+def identity_key(user_id):
+    return f'identity:{user_id}'
+
+
+def _dump(obj):
+    data = {}
+    for column in obj.__table__.columns:
+        if column.key in EXCLUDED_COLUMNS:
+            continue
+        value = getattr(obj, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def _restore(model, data):
+    obj = model()
+    for column in model.__table__.columns:
+        if column.key not in data:
+            continue
+        value = data[column.key]
+        if value is not None and column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif value is not None and column.type.python_type is date:
+            value = date.fromisoformat(value)
+        set_committed_value(obj, column.key, value)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def _snapshot(user):
+    return {
+        'user': _dump(user),
+        'student': _dump(user.student) if user.student else None,
+        'teacher': _dump(user.teacher) if user.teacher else None,
+    }
+
+
+def _from_snapshot(snapshot):
+    user = _restore(User, snapshot['user'])
+    for name, model in (('student', Student), ('teacher', Teacher)):
+        profile = None
+        if snapshot[name] is not None:
+            profile = _restore(model, snapshot[name])
+            set_committed_value(profile, 'user', user)
+        set_committed_value(user, name, profile)
+    return db.session.merge(user, load=False)
+
+
+def _access_changed(user_id, snapshot):
+    """Снимок расходится с БД по is_active/role (или пользователь удален)"""
+    row = db.session.query(*[getattr(User, name) for name in ACCESS_COLUMNS]).filter(User.id == user_id).first()
+    return row is None or any(snapshot['user'][name] != value for name, value in zip(ACCESS_COLUMNS, row))
+
+
+def load_identity(user_id):
+    """Пользователь с профилем: из кэша или одним запросом с JOIN"""
+    snapshot = cache.get(identity_key(user_id))
+    if snapshot is not None:
+        if current_app.config.get('SCHEDULE_CACHE_BACKEND') == 'redis' or not _access_changed(user_id, snapshot):
+            return _from_snapshot(snapshot)
+        invalidate_identity(user_id)
+
+    user = User.query.options(
+        joinedload(User.student),
+        joinedload(User.teacher)
+    ).filter(User.id == user_id).first()
+    if user is not None:
+        cache.set(identity_key(user_id), _snapshot(user),
+                  timeout=current_app.config.get('IDENTITY_CACHE_TTL', 30))
+    return user
+
+
+def invalidate_identity(*user_ids):
+    cache.delete(*[identity_key(user_id) for user_id in user_ids])
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_identities(session, flush_context):
+    changed = session.info.setdefault('changed_identities', set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+        elif isinstance(obj, (Student, Teacher)) and obj.user_id is not None:
+            changed.add(obj.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    changed = session.info.pop('changed_identities', None)
+    if changed:
+        invalidate_identity(*changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_after_rollback(session):
+    session.info.pop('changed_identities', None)
@@ -0,0 +1,66 @@
+"""
+Календарная сетка месяца с итогами по дням
+
+Сетка (недели x дни, с понедельника) строится на сервере по одному
+агрегирующему запросу GROUP BY дата, тип занятия: для каждого дня известны
+число занятий, первая и последняя пара и типы занятий. Полные данные
+занятий загружаются только для выбранного дня.
+"""
+import calendar
+from collections import namedtuple
+
+from sqlalchemy import func
+
+from extensions import db
+from models import Schedule, LessonTime
+from services.schedule_queries import month_bounds
+
+DaySummary = namedtuple('DaySummary', 'date lessons_count first_pair last_pair lesson_types')
+CalendarDay = namedtuple('CalendarDay', 'date in_month summary')
+
+_TYPE_ORDER = {lesson_type: index for index, lesson_type in enumerate(Schedule.LESSON_TYPES)}
+
+
+def day_summaries(start, end, group_id=None, teacher_id=None):
+    """Итоги по дням за период: {дата: DaySummary}"""
+    query = db.session.query(
+        Schedule.date,
+        Schedule.lesson_type,
+        func.count(Schedule.id),
+        func.min(LessonTime.lesson_number),
+        func.max(LessonTime.lesson_number)
+    ).join(LessonTime, Schedule.lesson_time_id == LessonTime.id
+    ).filter(
+        Schedule.is_active == True,
+        Schedule.date >= start,
+        Schedule.date <= end
+    )
+    if group_id is not None:
+        query = query.filter(Schedule.group_id == group_id)
+    if teacher_id is not None:
+        query = query.filter(Schedule.teacher_id == teacher_id)
+    
+    totals = {}
+    for day, lesson_type, count, first_pair, last_pair in query.group_by(Schedule.date, Schedule.lesson_type):
+        if day in totals:
+            total, first, last, types = totals[day]
+            totals[day] = (total + count, min(first, first_pair), max(last, last_pair), types + [lesson_type])
+        else:
+            totals[day] = (count, first_pair, last_pair, [lesson_type])
+    
+    return {
+        day: DaySummary(day, total, first, last,
+                        tuple(sorted(types, key=lambda t: _TYPE_ORDER.get(t, len(_TYPE_ORDER)))))
+        for day, (total, first, last, types) in totals.items()
+    }
+
+
+def month_calendar(day, group_id=None, teacher_id=None):
+    """Недели месяца, содержащего дату: список списков CalendarDay"""
+    month_start, month_end = month_bounds(day)
+    summaries = day_summaries(month_start, month_end, group_id=group_id, teacher_id=teacher_id)
+    weeks = calendar.Calendar(firstweekday=calendar.MONDAY).monthdatescalendar(day.year, day.month)
+    return [
+        [CalendarDay(date, date.month == day.month, summaries.get(date)) for date in week]
+        for week in weeks
+    ]
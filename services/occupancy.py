@@ -0,0 +1,227 @@
+"""
+Битовые маски недельной занятости групп, преподавателей и аудиторий
+
+Неделя - это 6 учебных дней x N строк расписания звонков (14 часов), поэтому
+занятость любой сущности за неделю помещается в одно целое число:
+бит day * N + slot означает, что в день day (0 - понедельник) занята строка
+звонков с индексом slot в снимке services.bell_schedule. Вопросы о
+пересечениях, общих свободных слотах и окнах решаются операциями AND/OR
+над этими числами без запросов к Schedule. Арифметика масок общая с
+Django-версией (week_masks.py).
+
+Неделя строится одним запросом к основной БД (не к реплике: отстающая
+реплика дала бы устаревшие маски) и хранится в памяти процесса; копия
+сохраняется в таблицу occupancy_weeks для теплого старта. Процесс отдает
+свою копию, пока в кэше лежит тот же штамп недели. Запись занятия
+сбрасывает неделю (week_cache.invalidate_week): удаляет сохраненные маски
+и записывает новый штамп. С бэкендом 'redis' штамп общий, и другие процессы
+видят изменение сразу; с 'lru' штамп у каждого процесса свой и живет
+SCHEDULE_CACHE_TIMEOUT секунд, после чего процесс перечитывает неделю из
+таблицы. Сохраненные маски принимаются, только если совпадает отпечаток
+строк недели (число, MAX(id), MAX(updated_at)), записанный при построении:
+маски, построенные процессом со старым штампом, не переживают изменений.
+"""
+from datetime import timedelta
+import hashlib
+import logging
+import threading
+import time
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db, cache
+from models import Schedule, OccupancyWeek
+from services.bell_schedule import get_bell_schedule
+from services.schedule_queries import week_bounds
+from week_masks import (DAYS_PER_WEEK, union, week_starts, full_mask, day_mask,
+                        slot_bit, requested_mask, set_bits, gaps)
+
+logger = logging.getLogger(__name__)
+
+_weeks = {}
+_lock = threading.Lock()
+
+
+class WeekOccupancy:
+    """Неизменяемый снимок занятости на одну неделю"""
+
+    def __init__(self, week_start, bells, masks, stamp):
+        self.week_start = week_start
+        self.bells = bells
+        self.stamp = stamp
+        self.width = len(bells)
+        self.full = full_mask(self.width)
+        self._masks = masks
+        self._index = {slot.id: index for index, slot in enumerate(bells)}
+
+    def mask(self, kind, owner):
+        """Маска сущности: kind - 'group', 'teacher' или 'room'"""
+        return self._masks.get((kind, str(owner)), 0)
+
+    def masks(self, kind):
+        """{владелец: маска} всех сущностей вида kind, занятых на неделе"""
+        return {owner: mask for (k, owner), mask in self._masks.items() if k == kind}
+
+    def positions(self, lesson_time_ids):
+        """Позиции известных строк звонков в масках"""
+        return [self._index[int(i)] for i in lesson_time_ids if int(i) in self._index]
+
+    def bit(self, day, lesson_time_id):
+        """Бит слота (дата, строка звонков); 0 - вне недели или неизвестная строка"""
+        return slot_bit(self.week_start, self.width, day, self._index.get(int(lesson_time_id)))
+
+    def day_mask(self, offset):
+        """Маска всех строк звонков дня с номером offset (0 - понедельник)"""
+        return day_mask(self.width, offset)
+
+    def requested(self, start, end, lesson_time_ids=None):
+        """Маска указанных строк звонков (по умолчанию - всех) в днях периода [start, end]"""
+        positions = self.positions(lesson_time_ids) if lesson_time_ids else None
+        return requested_mask(self.week_start, self.width, start, end, positions)
+
+    def slots(self, mask):
+        """Пары (дата, lesson_time_id) установленных битов маски"""
+        return [(self.week_start + timedelta(days=offset), self.bells.slots[position].id)
+                for offset, position in set_bits(mask, self.width)]
+
+    def busy(self, entities):
+        """Общая занятость сущностей [(kind, owner), ...]"""
+        return union(self.mask(kind, owner) for kind, owner in entities)
+
+    def conflicts(self, entities, day, lesson_time_id):
+        """Сущности, занятые в слоте (дата, строка звонков)"""
+        bit = self.bit(day, lesson_time_id)
+        return [(kind, owner) for kind, owner in entities if self.mask(kind, owner) & bit]
+
+    def common_free(self, entities, within=None):
+        """Маска слотов, свободных у всех сущностей (within - ограничение, по умолчанию вся неделя)"""
+        return ~self.busy(entities) & (self.full if within is None else within)
+
+    def gaps(self, kind, owner):
+        """Окна по дням: свободные строки звонков между первым и последним занятием дня"""
+        return gaps(self.mask(kind, owner), self.width)
+
+
+def _stamp_key(week_start):
+    return f'occupancy:{week_start.isoformat()}'
+
+
+def _week_rows(week_start):
+    return Schedule.date.between(week_start, week_start + timedelta(days=DAYS_PER_WEEK - 1))
+
+
+def _fingerprint(connection, week_start):
+    """Отпечаток строк недели: меняется при добавлении, удалении и правке занятия"""
+    row = connection.execute(select(
+        func.count(Schedule.id),
+        func.sum(case((Schedule.is_active == True, 1), else_=0)),
+        func.max(Schedule.id),
+        func.max(Schedule.updated_at)
+    ).where(_week_rows(week_start))).one()
+    return hashlib.md5('|'.join(map(str, row)).encode()).hexdigest()
+
+
+def _build(week_start, bells):
+    """Маски недели одним запросом по Schedule и отпечаток прочитанных строк"""
+    index = {slot.id: i for i, slot in enumerate(bells)}
+    width = len(bells)
+    masks = {}
+    # Соединение основной БД и одна транзакция: маски и отпечаток из одного снимка
+    with db.engine.begin() as connection:
+        fingerprint = _fingerprint(connection, week_start)
+        rows = connection.execute(select(
+            Schedule.date, Schedule.lesson_time_id, Schedule.group_id, Schedule.teacher_id, Schedule.classroom
+        ).where(Schedule.is_active == True, _week_rows(week_start))).all()
+    for date, lesson_time_id, group_id, teacher_id, classroom in rows:
+        slot = index.get(lesson_time_id)
+        if slot is None:
+            continue
+        bit = slot_bit(week_start, width, date, slot)
+        for key in (('group', str(group_id)), ('teacher', str(teacher_id)), ('room', classroom)):
+            masks[key] = masks.get(key, 0) | bit
+    return masks, fingerprint
+
+
+def _load_saved(week_start, bells):
+    """Сохраненные маски недели или None, если неделя не сохранялась или строки изменились"""
+    with db.engine.begin() as connection:
+        fingerprint = _fingerprint(connection, week_start)
+        rows = connection.execute(select(OccupancyWeek.kind, OccupancyWeek.owner, OccupancyWeek.bits).where(
+            OccupancyWeek.week_start == week_start,
+            OccupancyWeek.bell_version == bells.version
+        )).all()
+    if not any(row.kind == 'week' and row.bits == fingerprint for row in rows):
+        return None
+    return {(row.kind, row.owner): int(row.bits, 16) for row in rows if row.kind != 'week'}
+
+
+def _save(week_start, bells, masks, fingerprint):
+    """Сохранить маски недели с отпечатком строк (отдельной транзакцией; ошибка не мешает ответу)"""
+    values = [{'week_start': week_start, 'kind': kind, 'owner': owner,
+               'bell_version': bells.version, 'bits': format(mask, 'x')}
+              for (kind, owner), mask in masks.items()]
+    values.append({'week_start': week_start, 'kind': 'week', 'owner': '',
+                   'bell_version': bells.version, 'bits': fingerprint})
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(delete(OccupancyWeek).where(OccupancyWeek.week_start == week_start))
+            connection.execute(insert(OccupancyWeek), values)
+    except SQLAlchemyError:
+        logger.warning('Не удалось сохранить занятость недели %s', week_start, exc_info=True)
+
+
+def _delete_saved(week_start):
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(delete(OccupancyWeek).where(OccupancyWeek.week_start == week_start))
+    except SQLAlchemyError:
+        logger.warning('Не удалось сбросить занятость недели %s', week_start, exc_info=True)
+
+
+def _new_stamp(week_start):
+    stamp = str(time.time_ns())
+    cache.set(_stamp_key(week_start), stamp)
+    return stamp
+
+
+def get_week(day):
+    """Занятость на неделе, содержащей дату"""
+    week_start = week_bounds(day)[0]
+    bells = get_bell_schedule()
+    stamp = cache.get(_stamp_key(week_start))
+    week = _weeks.get(week_start)
+    if week is not None and stamp is not None and week.stamp == stamp and week.bells is bells:
+        return week
+
+    with _lock:
+        if stamp is None:
+            stamp = _new_stamp(week_start)
+        masks = _load_saved(week_start, bells)
+        if masks is None:
+            masks, fingerprint = _build(week_start, bells)
+            # Если неделю сбросили во время построения или сохранения, маски
+            # могли прочитать старые строки: они отдаются один раз, но не
+            # остаются ни в памяти, ни в таблице
+            if cache.get(_stamp_key(week_start)) != stamp:
+                return WeekOccupancy(week_start, bells, masks, None)
+            _save(week_start, bells, masks, fingerprint)
+            if cache.get(_stamp_key(week_start)) != stamp:
+                _delete_saved(week_start)
+                return WeekOccupancy(week_start, bells, masks, None)
+        week = WeekOccupancy(week_start, bells, masks, stamp)
+        _weeks[week_start] = week
+        return week
+
+
+def weeks_between(start, end):
+    """Снимки всех недель, пересекающихся с периодом [start, end]"""
+    return [get_week(week_start) for week_start in week_starts(start, end)]
+
+
+def invalidate_occupancy(day):
+    """Сброс недели, содержащей дату: новый штамп и удаление сохраненных масок"""
+    week_start = week_bounds(day)[0]
+    _weeks.pop(week_start, None)
+    _new_stamp(week_start)
+    _delete_saved(week_start)
@@ -0,0 +1,26 @@
+"""
+Keyset-пагинация (по курсору) для длинных списков
+
+Списки упорядочены по (created_at DESC, id DESC); курсор хранит ключ
+последней строки страницы, и следующая страница читается диапазоном
+индекса (created_at, id) от этого ключа. Стоимость страницы не зависит
+от ее номера и размера таблицы. Формат курсора общий с Django-версией
+(keyset.py).
+"""
+from sqlalchemy import and_, or_
+
+from keyset import decode_cursor, make_page
+
+
+def keyset_paginate(query, model, cursor=None, per_page=50):
+    """Страница запроса после курсора в порядке (created_at DESC, id DESC)"""
+    key = decode_cursor(cursor)
+    if key is not None:
+        created_at, row_id = key
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+    
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(per_page + 1).all()
+    return make_page(rows, per_page)
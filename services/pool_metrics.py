@@ -0,0 +1,123 @@
+"""
+Телеметрия пула соединений SQLAlchemy
+
+InstrumentedQueuePool замеряет время ожидания свободного соединения,
+события пула (connect/checkout/checkin/invalidate) считаются
+слушателями движка. Счетчики ведутся отдельно для каждого движка
+(основная БД и привязки вроде 'replica'): ожидание реплики не смешивается
+с ожиданием основной БД. Снимки метрик вместе с состоянием пулов (занято,
+свободно, overflow) отдает маршрут /admin/metrics/pool.
+Счетчики относятся к текущему процессу.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Счетчики пула текущего процесса"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, engine):
+        pool = engine.pool
+        with self._lock:
+            data = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+        data['pool'] = pool.status()
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+            })
+        return data
+
+
+# Счетчики по имени привязки ('default' - основная БД)
+engine_metrics = {}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool с замером времени ожидания соединения"""
+
+    # Счетчики движка; задаются instrument_engine
+    metrics = None
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def bind_name(key):
+    """Имя привязки Flask-SQLAlchemy в метриках (None - основная БД)"""
+    return key or 'default'
+
+
+def instrument_engine(engine, name='default'):
+    """Завести счетчики движка и подписать их на события его пула"""
+    metrics = engine_metrics[name] = PoolMetrics()
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    event.listen(engine, 'connect', lambda *args: metrics.incr('connects'))
+    event.listen(engine, 'checkout', lambda *args: metrics.incr('checkouts'))
+    event.listen(engine, 'checkin', lambda *args: metrics.incr('checkins'))
+    event.listen(engine, 'invalidate', lambda *args: metrics.incr('invalidations'))
+    return metrics
+
+
+def snapshot_engines(engines):
+    """Снимки метрик всех движков: {имя привязки: снимок}; engines - db.engines"""
+    return {bind_name(key): engine_metrics[bind_name(key)].snapshot(engine)
+            for key, engine in engines.items() if bind_name(key) in engine_metrics}
+
+
+def reset_all():
+    for metrics in engine_metrics.values():
+        metrics.reset()
@@ -0,0 +1,131 @@
+"""
+Повторяющиеся занятия
+
+Серия (LessonSeries) задает еженедельный шаблон: день недели, пара,
+четность недели и период. Все занятия серии создаются одной пакетной
+вставкой после одной проверки пересечений для всего набора; правка и
+отмена серии выполняются одним UPDATE по series_id. Каждая операция
+завершает транзакцию сама и сбрасывает кэш затронутых недель после коммита.
+"""
+from datetime import timedelta
+
+from sqlalchemy import insert
+
+from extensions import db
+from models import Schedule
+from services.conflicts import LessonProposal, find_conflicts, proposal_from_schedule
+from services.week_cache import invalidate_week
+
+# Поля серии, которые можно массово изменить у уже созданных занятий
+EDITABLE_FIELDS = ('subject_id', 'teacher_id', 'lesson_type', 'classroom', 'notes')
+
+
+def series_dates(series):
+    """Даты занятий серии с учетом дня недели и четности ISO-недели"""
+    day = series.start_date + timedelta(days=(int(series.weekday) - series.start_date.isoweekday()) % 7)
+    parity = int(series.week_parity or 0)
+    dates = []
+    while day <= series.end_date:
+        if parity == 0 or day.isocalendar()[1] % 2 == parity % 2:
+            dates.append(day)
+        day += timedelta(days=7)
+    return dates
+
+
+def _invalidate(group_id, teacher_id, dates):
+    """Сброс кэша всех недель, затронутых серией (по одному дню на неделю)"""
+    weeks = {}
+    for day in dates:
+        weeks.setdefault(day.isocalendar()[:2], day)
+    for day in weeks.values():
+        invalidate_week(group_id, teacher_id, day)
+
+
+def generate_series(series):
+    """
+    Сохранить серию и создать все ее занятия. Возвращает (количество, пересечения);
+    при пересечениях транзакция откатывается.
+    """
+    db.session.add(series)
+    db.session.flush()
+    
+    dates = series_dates(series)
+    proposals = [LessonProposal(series.group_id, series.teacher_id, series.subject_id,
+                                series.lesson_time_id, day, series.classroom, series.lesson_type)
+                 for day in dates]
+    
+    conflicts = find_conflicts(proposals, lock=True)
+    if conflicts or not dates:
+        db.session.rollback()
+        return 0, conflicts
+    
+    db.session.execute(insert(Schedule), [{
+        'subject_id': series.subject_id,
+        'group_id': series.group_id,
+        'teacher_id': series.teacher_id,
+        'lesson_time_id': series.lesson_time_id,
+        'weekday': day.isoweekday(),
+        'lesson_type': series.lesson_type,
+        'classroom': series.classroom,
+        'date': day,
+        'notes': series.notes,
+        'series_id': series.id,
+    } for day in dates])
+    group_id, teacher_id = series.group_id, series.teacher_id
+    db.session.commit()
+    
+    _invalidate(group_id, teacher_id, dates)
+    return len(dates), []
+
+
+def update_series(series, changes, from_date):
+    """
+    Изменить поля серии и всех ее активных занятий начиная с from_date.
+    Возвращает (количество, пересечения); при пересечениях ничего не меняется.
+    """
+    changes = {field: value for field, value in changes.items() if field in EDITABLE_FIELDS}
+    lessons = series.lessons.filter(Schedule.is_active == True, Schedule.date >= from_date).all()
+    
+    proposals = [proposal_from_schedule(s)._replace(**changes) for s in lessons]
+    conflicts = find_conflicts(proposals, lock=True)
+    if conflicts:
+        db.session.rollback()
+        return 0, conflicts
+    
+    group_id = series.group_id
+    old_teacher_id = series.teacher_id
+    for field, value in changes.items():
+        setattr(series, field, value)
+    
+    count = Schedule.query.filter(
+        Schedule.series_id == series.id,
+        Schedule.is_active == True,
+        Schedule.date >= from_date
+    ).update(changes, synchronize_session=False)
+    new_teacher_id = series.teacher_id
+    db.session.commit()
+    
+    dates = [s.date for s in lessons]
+    _invalidate(group_id, old_teacher_id, dates)
+    _invalidate(group_id, new_teacher_id, dates)
+    return count, []
+
+
+def cancel_series(series, from_date):
+    """Отменить (деактивировать) занятия серии начиная с from_date"""
+    dates = [day for (day,) in db.session.query(Schedule.date).filter(
+        Schedule.series_id == series.id,
+        Schedule.is_active == True,
+        Schedule.date >= from_date
+    )]
+    
+    count = Schedule.query.filter(
+        Schedule.series_id == series.id,
+        Schedule.is_active == True,
+        Schedule.date >= from_date
+    ).update({'is_active': False}, synchronize_session=False)
+    group_id, teacher_id = series.group_id, series.teacher_id
+    db.session.commit()
+    
+    _invalidate(group_id, teacher_id, dates)
+    return count
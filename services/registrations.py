@@ -0,0 +1,103 @@
+"""
+Пакетное подтверждение и отклонение заявок на регистрацию
+
+Выбранные заявки переносятся в users/students/teachers пакетными
+INSERT в одной транзакции: пользователи вставляются одним executemany,
+их id читаются обратно одним запросом по username на пачку, затем
+вставляются профили и удаляются заявки. Номер студенческого строится
+из id пользователя, как и при подтверждении по одной заявке.
+
+Пакет подтверждается целиком или не подтверждается вовсе: занятый логин
+или email (IntegrityError) и несуществующая группа (ValueError, проверка
+до вставки) оставляют все заявки на месте - вызывающий код откатывает
+сессию.
+"""
+from datetime import datetime
+
+from sqlalchemy import insert, delete, select
+
+from extensions import db
+from models import User, PendingUser, Group, Student, Teacher
+from services.stats import invalidate_dashboard_stats
+
+BATCH_SIZE = 500
+
+
+def _chunks(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def approve_pending(pending_ids, group_id=None):
+    """
+    Подтвердить заявки с указанными id. group_id задает группу студентам
+    без группы в заявке. Возвращает (подтверждено, пропущено): студенты
+    без группы пропускаются и остаются в заявках. ValueError - группа
+    студента не существует.
+    """
+    pending = []
+    for chunk in _chunks(list(pending_ids)):
+        pending.extend(PendingUser.query.filter(PendingUser.id.in_(chunk)).all())
+
+    approved = [p for p in pending
+                if p.requested_role != 'student' or p.group_id or group_id]
+    skipped = len(pending) - len(approved)
+    if not approved:
+        return 0, skipped
+
+    group_ids = {p.group_id or group_id for p in approved if p.requested_role == 'student'}
+    if group_ids:
+        found = set(db.session.execute(select(Group.id).where(Group.id.in_(group_ids))).scalars())
+        if group_ids - found:
+            raise ValueError('Группа не найдена')
+
+    db.session.execute(insert(User), [{
+        'username': p.username,
+        'email': p.email,
+        'password_hash': p.password_hash,
+        'first_name': p.first_name,
+        'last_name': p.last_name,
+        'phone': p.phone,
+        'role': p.requested_role
+    } for p in approved])
+
+    user_ids = {}
+    for chunk in _chunks([p.username for p in approved]):
+        user_ids.update(db.session.execute(
+            select(User.username, User.id).where(User.username.in_(chunk))
+        ).all())
+
+    year = datetime.now().year
+    students = [{
+        'user_id': user_ids[p.username],
+        'student_id': f'STU{user_ids[p.username]:06d}',
+        'group_id': p.group_id or group_id,
+        'enrollment_year': year
+    } for p in approved if p.requested_role == 'student']
+    teachers = [{
+        'user_id': user_ids[p.username],
+        'department': p.department or 'Не указано',
+        'position': p.position or 'Преподаватель'
+    } for p in approved if p.requested_role == 'teacher']
+
+    if students:
+        db.session.execute(insert(Student), students)
+    if teachers:
+        db.session.execute(insert(Teacher), teachers)
+
+    for chunk in _chunks([p.id for p in approved]):
+        db.session.execute(delete(PendingUser).where(PendingUser.id.in_(chunk)))
+
+    db.session.commit()
+    invalidate_dashboard_stats()
+    return len(approved), skipped
+
+
+def reject_pending(pending_ids):
+    """Отклонить (удалить) заявки с указанными id. Возвращает количество удаленных"""
+    deleted = 0
+    for chunk in _chunks(list(pending_ids)):
+        deleted += db.session.execute(delete(PendingUser).where(PendingUser.id.in_(chunk))).rowcount
+    db.session.commit()
+    invalidate_dashboard_stats()
+    return deleted
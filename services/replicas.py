@@ -0,0 +1,123 @@
+"""
+Чтение расписания с реплики БД
+
+Если задан REPLICA_DATABASE_URL, в SQLALCHEMY_BINDS появляется привязка
+'replica', и RoutingSession отправляет на нее SELECT по занятиям, группам
+и звонкам (READ_TABLES), выполняемые в GET-запросах. Остальное идет на
+основную БД: записи, SELECT ... FOR UPDATE, запросы внутри flush,
+скрипты вне запроса и запросы пользователя, только что изменившего данные.
+
+Чтение своих записей: после записи пользователь на REPLICA_STICKY_SECONDS
+закрепляется за основной БД (cookie), а после изменения занятий, групп или
+звонков на то же время закрепляются все - иначе кэш недель, сброшенный
+коммитом, заполнился бы устаревшими данными с отстающей реплики.
+Общее закрепление хранится в кэше расписания, поэтому реплика требует
+SCHEDULE_CACHE_BACKEND='redis': с кэшем 'lru' процесс не узнал бы о записи
+в другом процессе. Для проверки в одном процессе ограничение снимает
+REPLICA_ALLOW_LOCAL_CACHE.
+"""
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+
+REPLICA_BIND = 'replica'
+READ_TABLES = frozenset({'schedules', 'groups', 'lesson_times'})
+PIN_COOKIE = 'db_primary_until'
+PIN_KEY = 'replica:pinned'
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def replica_enabled():
+    return has_app_context() and REPLICA_BIND in current_app.config.get('SQLALCHEMY_BINDS', {})
+
+
+def _sticky_seconds():
+    return current_app.config.get('REPLICA_STICKY_SECONDS', 10)
+
+
+def _table_name(mapper, clause):
+    if mapper is not None:
+        return inspect(mapper).local_table.name
+    table = getattr(clause, 'table', None)
+    return getattr(table, 'name', None)
+
+
+class RoutingSession(Session):
+    """Сессия, выбирающая реплику для чтения расписания"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._replica_allowed(mapper, clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_allowed(self, mapper, clause):
+        if self._flushing or self.info.get('db_wrote'):
+            return False
+        if not has_request_context() or g.get('db_pinned', True) or not replica_enabled():
+            return False
+        if getattr(clause, '_for_update_arg', None) is not None:
+            return False
+        return _table_name(mapper, clause) in READ_TABLES
+
+
+def _mark_write(session, tables):
+    session.info['db_wrote'] = True
+    if has_request_context():
+        g.db_wrote = True
+    if READ_TABLES & set(tables):
+        session.info['replica_tables_dirty'] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush(session, flush_context):
+    tables = {inspect(obj).mapper.local_table.name
+              for objs in (session.new, session.dirty, session.deleted) for obj in objs}
+    if tables:
+        _mark_write(session, tables)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_write(orm_execute_state):
+    # Пакетные insert()/update()/delete() через session.execute не проходят flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write(orm_execute_state.session, [_table_name(None, orm_execute_state.statement)])
+
+
+@event.listens_for(Session, 'after_commit')
+def _pin_after_commit(session):
+    if session.info.pop('replica_tables_dirty', False) and replica_enabled():
+        current_app.extensions['schedule_cache'].set(PIN_KEY, True, timeout=_sticky_seconds())
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_after_rollback(session):
+    session.info.pop('replica_tables_dirty', None)
+
+
+def init_replicas(app):
+    """Закрепление запросов за основной БД (только при настроенной реплике)"""
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+    if app.config.get('SCHEDULE_CACHE_BACKEND') != 'redis' and not app.config.get('REPLICA_ALLOW_LOCAL_CACHE'):
+        raise RuntimeError('Реплика требует общего кэша: задайте SCHEDULE_CACHE_BACKEND=redis '
+                           '(или REPLICA_ALLOW_LOCAL_CACHE=1 для проверки в одном процессе)')
+
+    @app.before_request
+    def _pin_request():
+        try:
+            pinned_until = float(request.cookies.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        g.db_pinned = (request.method not in SAFE_METHODS
+                       or pinned_until > time.time()
+                       or bool(app.extensions['schedule_cache'].get(PIN_KEY)))
+
+    @app.after_request
+    def _remember_write(response):
+        if g.get('db_wrote'):
+            seconds = _sticky_seconds()
+            response.set_cookie(PIN_COOKIE, str(int(time.time()) + seconds),
+                                max_age=seconds, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,66 @@
+"""
+Подбор слотов для переноса занятия
+
+Кандидаты (дата, строка звонков, аудитория) ищутся по недельным битовым
+маскам services.occupancy: за один проход по неделям горизонта
+пересекаются свободные слоты группы и преподавателя, затем для каждого
+слота выбирается свободная аудитория (в первую очередь - прежняя).
+Кандидаты ранжируются по близости к исходному занятию.
+"""
+from collections import namedtuple
+from datetime import date, timedelta
+
+from services.bell_schedule import get_bell_schedule
+from services.occupancy import weeks_between, union
+from services.rooms import known_classrooms
+
+Candidate = namedtuple('Candidate', 'date lesson_time_id classroom score')
+
+# Штрафы ранжирования: день сдвига, пара сдвига, смена аудитории
+DAY_PENALTY = 1
+PAIR_PENALTY = 2
+ROOM_PENALTY = 3
+
+
+def reschedule_options(schedule, horizon_days=30, limit=20, start=None):
+    """
+    Лучшие варианты переноса занятия на период [start, start + horizon_days].
+    По умолчанию поиск начинается с завтрашнего дня.
+    """
+    start = start or date.today() + timedelta(days=1)
+    end = start + timedelta(days=horizon_days)
+    bells = get_bell_schedule()
+    original = bells.get(schedule.lesson_time_id)
+    original_number = original.lesson_number if original else 0
+    entities = [('group', schedule.group_id), ('teacher', schedule.teacher_id)]
+    classrooms = known_classrooms()
+    
+    candidates = []
+    for week in weeks_between(start, end):
+        within = union(week.day_mask(offset) for offset in range(6)
+                       if start <= week.week_start + timedelta(days=offset) <= end)
+        # Исходный слот исключается из кандидатов: перенос на то же место -
+        # не перенос (у отключенного занятия он в масках не занят)
+        own = week.bit(schedule.date, schedule.lesson_time_id)
+        free = week.common_free(entities, within) & ~own
+        if not free:
+            continue
+        
+        rooms = week.masks('room')
+        for day, lesson_time_id in week.slots(free):
+            bit = week.bit(day, lesson_time_id)
+            if not rooms.get(schedule.classroom, 0) & bit:
+                classroom = schedule.classroom
+            else:
+                classroom = next((room for room in classrooms if not rooms.get(room, 0) & bit), None)
+                if classroom is None:
+                    continue
+            
+            slot = bells.get(lesson_time_id)
+            score = (DAY_PENALTY * abs((day - schedule.date).days)
+                     + PAIR_PENALTY * abs((slot.lesson_number if slot else 0) - original_number)
+                     + (0 if classroom == schedule.classroom else ROOM_PENALTY))
+            candidates.append(Candidate(day, lesson_time_id, classroom, score))
+    
+    candidates.sort(key=lambda c: (c.score, c.date, c.lesson_time_id))
+    return candidates[:limit]
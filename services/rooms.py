@@ -0,0 +1,47 @@
+"""
+Поиск свободных аудиторий
+
+Занятость аудиторий берется из недельных битовых масок services.occupancy:
+для каждой недели периода строится маска запрошенных слотов, и аудитория
+свободна, если ее маска не пересекается с запрошенной ни в одной неделе.
+Список аудиторий кэшируется и сбрасывается при изменении занятий.
+"""
+from extensions import db, cache
+from models import Schedule
+from services.occupancy import weeks_between
+
+CLASSROOMS_KEY = 'rooms:all'
+
+
+def known_classrooms():
+    """Все аудитории, встречающиеся в расписании, по алфавиту"""
+    classrooms = cache.get(CLASSROOMS_KEY)
+    if classrooms is None:
+        classrooms = [row[0] for row in db.session.query(Schedule.classroom).distinct().order_by(Schedule.classroom)]
+        cache.set(CLASSROOMS_KEY, classrooms)
+    return classrooms
+
+
+def invalidate_rooms():
+    """Сброс списка аудиторий"""
+    cache.delete(CLASSROOMS_KEY)
+
+
+def free_classrooms(start, end=None, lesson_time_ids=None, prefix=None):
+    """
+    Аудитории, свободные в каждый день периода [start, end] во всех
+    указанных строках расписания звонков (по умолчанию - весь день).
+    prefix отбирает аудитории по началу номера (корпус, этаж).
+    """
+    end = end or start
+    busy = set()
+    for week in weeks_between(start, end):
+        requested = week.requested(start, end, lesson_time_ids)
+        if not requested:
+            continue
+        for classroom, mask in week.masks('room').items():
+            if mask & requested:
+                busy.add(classroom)
+    
+    return [classroom for classroom in known_classrooms()
+            if classroom not in busy and (not prefix or classroom.startswith(prefix))]
@@ -0,0 +1,92 @@
+"""
+Запросы расписания для маршрутов Flask
+
+Все выборки занятий загружают связанные предмет, преподавателя и группу
+одним запросом, чтобы шаблоны и JSON не вызывали ленивую подгрузку для
+каждой строки. Время пары берётся из снимка расписания звонков
+(services.bell_schedule).
+"""
+from sqlalchemy.orm import joinedload
+from extensions import db
+from models import Schedule, Teacher, Subject, Group, User
+from datetime import timedelta
+
+
+def _eager_query():
+    """Базовый запрос активных занятий с жадной загрузкой связей"""
+    return Schedule.query.options(
+        joinedload(Schedule.subject),
+        joinedload(Schedule.teacher).joinedload(Teacher.user),
+        joinedload(Schedule.group)
+    ).filter(Schedule.is_active == True)
+
+
+def week_bounds(day):
+    """Понедельник и воскресенье недели, содержащей дату"""
+    week_start = day - timedelta(days=day.weekday())
+    return week_start, week_start + timedelta(days=6)
+
+
+def month_bounds(day):
+    """Первый и последний день месяца, содержащего дату"""
+    month_start = day.replace(day=1)
+    if day.month == 12:
+        next_month = month_start.replace(year=day.year + 1, month=1)
+    else:
+        next_month = month_start.replace(month=day.month + 1)
+    return month_start, next_month - timedelta(days=1)
+
+
+def _in_range(query, start, end):
+    if end is None or end == start:
+        return query.filter(Schedule.date == start).order_by(Schedule.lesson_time_id)
+    return query.filter(
+        Schedule.date >= start,
+        Schedule.date <= end
+    ).order_by(Schedule.date, Schedule.lesson_time_id)
+
+
+def group_schedule(group_id, start, end=None):
+    """Занятия группы на дату или за период [start, end]"""
+    query = _eager_query().filter(Schedule.group_id == group_id)
+    return _in_range(query, start, end).all()
+
+
+def teacher_schedule(teacher_id, start, end=None):
+    """Занятия преподавателя на дату или за период [start, end]"""
+    query = _eager_query().filter(Schedule.teacher_id == teacher_id)
+    return _in_range(query, start, end).all()
+
+
+def range_rows(start, end, group_ids=None, teacher_id=None, batch_size=500):
+    """
+    Построчная выборка занятий за период одним запросом без ORM-объектов.
+    Возвращает итератор кортежей только с нужными столбцами.
+    """
+    query = db.session.query(
+        Schedule.id,
+        Schedule.date,
+        Schedule.lesson_time_id,
+        Schedule.lesson_type,
+        Schedule.classroom,
+        Schedule.notes,
+        Group.name,
+        Subject.name,
+        User.first_name,
+        User.last_name
+    ).join(Group, Schedule.group_id == Group.id
+    ).join(Subject, Schedule.subject_id == Subject.id
+    ).join(Teacher, Schedule.teacher_id == Teacher.id
+    ).join(User, Teacher.user_id == User.id
+    ).filter(
+        Schedule.is_active == True,
+        Schedule.date >= start,
+        Schedule.date <= end
+    )
+    
+    if group_ids:
+        query = query.filter(Schedule.group_id.in_(group_ids))
+    if teacher_id is not None:
+        query = query.filter(Schedule.teacher_id == teacher_id)
+    
+    return query.order_by(Schedule.date, Schedule.lesson_time_id).yield_per(batch_size)
@@ -0,0 +1,67 @@
+"""
+Статистика панели администратора
+
+Все счетчики считаются одним запросом из скалярных подзапросов и
+кэшируются на ADMIN_STATS_TTL секунд. Кэш сбрасывается после коммита,
+в котором менялись пользователи, заявки, группы, предметы или занятия.
+"""
+from datetime import date
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from extensions import db, cache
+from models import User, PendingUser, Group, Subject, Teacher, Schedule
+
+STATS_KEY = 'admin:dashboard_stats'
+TRACKED_MODELS = (User, PendingUser, Group, Subject, Teacher, Schedule)
+
+
+def _compute_stats():
+    today = date.today()
+    row = db.session.execute(select(
+        select(func.count(PendingUser.id)).scalar_subquery().label('pending_count'),
+        select(func.count(User.id)).scalar_subquery().label('users_count'),
+        select(func.count(Group.id)).scalar_subquery().label('groups_count'),
+        select(func.count(Subject.id)).scalar_subquery().label('subjects_count'),
+        select(func.count(Schedule.id)).where(
+            Schedule.date == today,
+            Schedule.is_active == True
+        ).scalar_subquery().label('lessons_today'),
+        select(func.count(Teacher.id)).join(User, Teacher.user_id == User.id).where(
+            User.is_active == True
+        ).scalar_subquery().label('active_teachers')
+    )).one()
+    return dict(row._mapping)
+
+
+def get_dashboard_stats():
+    """Счетчики панели администратора (из кэша или одним запросом)"""
+    stats = cache.get(STATS_KEY)
+    if stats is None:
+        stats = _compute_stats()
+        cache.set(STATS_KEY, stats, timeout=current_app.config.get('ADMIN_STATS_TTL', 60))
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(STATS_KEY)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_stats_dirty(session, flush_context):
+    if any(isinstance(obj, TRACKED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['dashboard_stats_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('dashboard_stats_dirty', False):
+        invalidate_dashboard_stats()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_after_rollback(session):
+    session.info.pop('dashboard_stats_dirty', None)
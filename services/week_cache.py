@@ -0,0 +1,104 @@
+"""
+Кэш недельного расписания групп и преподавателей
+
+Неделя хранится в кэше под ключом (группа или преподаватель, ISO-неделя)
+в виде сериализованных словарей и сбрасывается при изменении занятий
+этой группы/преподавателя на этой неделе. Версия расписания звонков входит
+в ключ, поэтому правка звонков делает устаревшими все недели сразу.
+Занятия, удаленные каскадом (вместе с группой, предметом, преподавателем),
+сбрасывают свои недели после коммита.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from extensions import cache
+from models import Schedule
+from services.bell_schedule import get_bell_schedule
+from services.occupancy import invalidate_occupancy
+from services.rooms import invalidate_rooms
+from services.schedule_queries import group_schedule, teacher_schedule, week_bounds
+
+
+def serialize_lesson(s, bells=None):
+    """Представление занятия, пригодное для кэша, шаблонов и JSON"""
+    slot = (bells or get_bell_schedule()).get(s.lesson_time_id)
+    return {
+        'id': s.id,
+        'date': s.date.isoformat(),
+        'weekday': s.weekday,
+        'subject': {'id': s.subject_id, 'name': s.subject.name},
+        'teacher': {'id': s.teacher_id, 'name': s.teacher.user.get_full_name()},
+        'group': {'id': s.group_id, 'name': s.group.name},
+        'lesson_time': {
+            'id': s.lesson_time_id,
+            'lesson_number': slot.lesson_number if slot else None,
+            'time_range': slot.get_time_range() if slot else ''
+        },
+        'lesson_type': s.lesson_type,
+        'lesson_type_display': s.get_lesson_type_display(),
+        'classroom': s.classroom,
+        'notes': s.notes
+    }
+
+
+def week_key(kind, owner_id, day):
+    """Ключ кэша недели: kind - 'group' или 'teacher'"""
+    iso_year, iso_week, _ = day.isocalendar()
+    bell_version = get_bell_schedule().version
+    return f'week:{kind}:{owner_id}:{iso_year}-W{iso_week:02d}:{bell_version}'
+
+
+def _cached_week(kind, owner_id, day, loader):
+    key = week_key(kind, owner_id, day)
+    lessons = cache.get(key)
+    if lessons is None:
+        bells = get_bell_schedule()
+        week_start, week_end = week_bounds(day)
+        lessons = [serialize_lesson(s, bells) for s in loader(owner_id, week_start, week_end)]
+        cache.set(key, lessons)
+    return lessons
+
+
+def group_week(group_id, day):
+    """Занятия группы на неделе, содержащей дату"""
+    return _cached_week('group', group_id, day, group_schedule)
+
+
+def teacher_week(teacher_id, day):
+    """Занятия преподавателя на неделе, содержащей дату"""
+    return _cached_week('teacher', teacher_id, day, teacher_schedule)
+
+
+def lessons_on(lessons, day):
+    """Занятия из недельного списка, приходящиеся на дату"""
+    day_str = day.isoformat()
+    return [lesson for lesson in lessons if lesson['date'] == day_str]
+
+
+def invalidate_week(group_id, teacher_id, day):
+    """Сброс недели группы, преподавателя и занятости аудиторий, затронутых изменением занятия"""
+    cache.delete(
+        week_key('group', int(group_id), day),
+        week_key('teacher', int(teacher_id), day)
+    )
+    invalidate_occupancy(day)
+    invalidate_rooms()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_deleted_lessons(session, flush_context):
+    deleted = session.info.setdefault('deleted_lesson_weeks', set())
+    for obj in session.deleted:
+        if isinstance(obj, Schedule):
+            deleted.add((obj.group_id, obj.teacher_id, obj.date))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for group_id, teacher_id, day in session.info.pop('deleted_lesson_weeks', ()):
+        invalidate_week(group_id, teacher_id, day)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_after_rollback(session):
+    session.info.pop('deleted_lesson_weeks', None)
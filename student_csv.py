@@ -0,0 +1,86 @@
+"""
+Общие функции импорта студентов из CSV
+
+Используются скриптом Flask-версии (import_students.py) и командой Django
+(accounts/management/commands/import_students.py). Модуль зависит только от
+стандартной библиотеки: функция хэширования и настройка процессов пула
+(werkzeug или django.contrib.auth.hashers) передаются вызывающим кодом.
+"""
+import csv
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+
+def read_rows(path):
+    """Строки CSV со значениями без пробелов по краям"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [{key.strip(): (value or '').strip() for key, value in row.items()}
+                for row in csv.DictReader(f)]
+
+
+def invalid_courses(rows):
+    """Номера строк файла (первая строка данных - 2) с курсом, не являющимся целым числом от 1"""
+    lines = []
+    for number, row in enumerate(rows, start=2):
+        course = row.get('course')
+        if not course:
+            continue
+        try:
+            valid = int(course) >= 1
+        except ValueError:
+            valid = False
+        if not valid:
+            lines.append(number)
+    return lines
+
+
+def unique_rows(rows):
+    """
+    Строки без повторов логина и email внутри файла (остается первая)
+    и число отброшенных повторов. Email сравнивается без учета регистра.
+    """
+    usernames, emails = set(), set()
+    result = []
+    for row in rows:
+        username, email = row.get('username', ''), row.get('email', '').lower()
+        if username in usernames or email in emails:
+            continue
+        usernames.add(username)
+        emails.add(email)
+        result.append(row)
+    return result, len(rows) - len(result)
+
+
+@contextmanager
+def password_writer(path):
+    """csv.writer файла сгенерированных паролей (None без path); файл закрывается при выходе"""
+    if not path:
+        yield None
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['username', 'password'])
+        yield writer
+
+
+def hash_passwords(pool, hasher, passwords, workers):
+    """Хэши паролей, посчитанные в пуле процессов"""
+    return list(pool.map(hasher, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def benchmark(hasher, sample, write, initializer=None):
+    """Время хэширования sample паролей при разном числе процессов; write - вывод строки"""
+    passwords = [secrets.token_urlsafe(9) for _ in range(sample)]
+    cores = os.cpu_count() or 1
+    base = None
+    write(f'Хэширование {sample} паролей, ядер: {cores}')
+    for workers in sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1))):
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+            hash_passwords(pool, hasher, passwords, workers)
+        elapsed = time.perf_counter() - started
+        base = base or elapsed
+        write(f'  процессов {workers:2d}: {elapsed:.2f} с, ускорение x{base / elapsed:.2f}')
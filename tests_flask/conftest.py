@@ -0,0 +1,95 @@
+"""
+Общие фикстуры тестов Flask приложения
+
+Тесты идут на SQLite в памяти и LRU-кэше, MySQL и Redis не нужны.
+Запуск: python -m pytest tests_flask
+"""
+import os
+from datetime import time
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['SCHEDULE_CACHE_BACKEND'] = 'lru'
+os.environ.pop('REPLICA_DATABASE_URL', None)
+
+import pytest
+from sqlalchemy import event
+
+from app import app as flask_app
+from extensions import db, cache
+from models import User, Group, Subject, Teacher, LessonTime, Schedule
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.create_all()
+        cache.clear()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+        cache.clear()
+
+
+class QueryCounter:
+    """Счетчик SQL-запросов движка (before_cursor_execute)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries():
+    return lambda: QueryCounter(db.engine)
+
+
+@pytest.fixture
+def admin_client(app):
+    """Тестовый клиент с вошедшим администратором"""
+    admin = User(username='admin', email='admin@test.local', password_hash='-',
+                 first_name='Администратор', last_name='Системы', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def timetable(app):
+    """id группы, предмета, преподавателя и двух строк расписания звонков"""
+    user = User(username='teacher', email='teacher@test.local', password_hash='-',
+                first_name='Иван', last_name='Петров', role='teacher')
+    teacher = Teacher(user=user, department='Кафедра', position='Доцент')
+    group = Group(name='ПИ-21', course=2)
+    subject = Subject(name='Базы данных', code='DB101')
+    bells = [LessonTime(lesson_number=1, hour_number=1, start_time=time(8, 0), end_time=time(8, 45)),
+             LessonTime(lesson_number=2, hour_number=2, start_time=time(8, 55), end_time=time(9, 40))]
+    db.session.add_all([teacher, group, subject, *bells])
+    db.session.commit()
+    return {'teacher': teacher.id, 'group': group.id, 'subject': subject.id, 'bells': [b.id for b in bells]}
+
+
+def add_lesson(timetable, day, bell=0, **fields):
+    lesson = Schedule(subject_id=timetable['subject'], group_id=timetable['group'],
+                      teacher_id=timetable['teacher'], lesson_time_id=timetable['bells'][bell],
+                      weekday=day.isoweekday(), classroom=fields.pop('classroom', '101'), date=day, **fields)
+    db.session.add(lesson)
+    return lesson
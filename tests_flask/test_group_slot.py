@@ -0,0 +1,30 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from conftest import add_lesson
+from extensions import db
+from models import Schedule
+
+MONDAY = date(2025, 9, 1)
+
+
+def test_second_active_lesson_in_slot_is_rejected(timetable):
+    add_lesson(timetable, MONDAY)
+    db.session.commit()
+
+    add_lesson(timetable, MONDAY)
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_inactive_lessons_do_not_occupy_slot(timetable):
+    add_lesson(timetable, MONDAY, is_active=False)
+    add_lesson(timetable, MONDAY, is_active=False)
+    add_lesson(timetable, MONDAY)
+    db.session.commit()
+
+    assert Schedule.query.count() == 3
+    assert [s.active_slot for s in Schedule.query.order_by(Schedule.id)] == [None, None, 1]
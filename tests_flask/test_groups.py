@@ -0,0 +1,47 @@
+import pytest
+
+import routes.admin
+from extensions import db
+from models import User, Group, Student
+
+
+def create_groups(start, count):
+    """Группы по три студента"""
+    for index in range(start, start + count):
+        group = Group(name=f'Г-{index}', course=1)
+        db.session.add(group)
+        for number in range(3):
+            user = User(username=f's{index}-{number}', email=f's{index}-{number}@test.local', password_hash='-',
+                        first_name='Имя', last_name='Студент', role='student')
+            db.session.add(Student(user=user, group=group, student_id=f'S{index}-{number}', enrollment_year=2025))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Контекст шаблонов маршрутов администратора; шаблон обращается к счетчику каждой группы"""
+    contexts = []
+
+    def render_template(template, **context):
+        contexts.append(context)
+        return ' '.join(f'{g.name}:{g.get_students_count()}' for g in context.get('groups', []))
+
+    monkeypatch.setattr(routes.admin, 'render_template', render_template)
+    return contexts
+
+
+@pytest.mark.parametrize('groups_count', [1, 10])
+def test_admin_groups_constant_queries(admin_client, rendered, count_queries, groups_count):
+    create_groups(0, groups_count)
+    # Загрузка пользователя в кэш; запросы тестового клиента идут в том же
+    # контексте приложения, поэтому загруженные группы убираются из сессии
+    admin_client.get('/admin/groups')
+    db.session.expunge_all()
+
+    with count_queries() as counter:
+        response = admin_client.get('/admin/groups')
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).count(':3') == groups_count
+    assert counter.count == 1
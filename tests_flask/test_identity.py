@@ -0,0 +1,21 @@
+from sqlalchemy import update
+
+from extensions import db
+from models import User
+from services.identity import load_identity
+
+
+def test_deactivation_in_other_process_is_seen(app):
+    user = User(username='student', email='student@test.local', password_hash='-',
+                first_name='Анна', last_name='Иванова', role='student')
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+    assert load_identity(user_id).is_authenticated
+
+    # Коммит другого процесса: сброс снимка в кэше 'lru' сюда не доходит
+    with db.engine.begin() as connection:
+        connection.execute(update(User).where(User.id == user_id).values(is_active=False))
+    db.session.remove()
+
+    assert not load_identity(user_id).is_authenticated
@@ -0,0 +1,57 @@
+from datetime import date
+
+from sqlalchemy import insert
+
+from conftest import add_lesson
+from extensions import db, cache
+from models import Group, OccupancyWeek, Schedule
+from services import occupancy
+from services.occupancy import get_week
+
+MONDAY = date(2025, 9, 1)
+
+
+def test_cascade_delete_of_group_resets_week(timetable):
+    add_lesson(timetable, MONDAY, classroom='101')
+    db.session.commit()
+    assert get_week(MONDAY).mask('room', '101')
+
+    db.session.delete(db.session.get(Group, timetable['group']))
+    db.session.commit()
+
+    assert not get_week(MONDAY).mask('room', '101')
+
+
+def test_week_reset_during_build_is_not_kept(timetable, monkeypatch):
+    add_lesson(timetable, MONDAY, classroom='101')
+    db.session.commit()
+    build = occupancy._build
+
+    def build_with_concurrent_write(week_start, bells):
+        masks = build(week_start, bells)
+        occupancy.invalidate_occupancy(week_start)
+        return masks
+
+    monkeypatch.setattr(occupancy, '_weeks', {})
+    monkeypatch.setattr(occupancy, '_build', build_with_concurrent_write)
+    get_week(MONDAY)
+
+    assert MONDAY not in occupancy._weeks
+    assert not OccupancyWeek.query.filter_by(week_start=MONDAY).count()
+
+
+def test_saved_week_is_rebuilt_after_unseen_change(timetable, monkeypatch):
+    get_week(MONDAY)
+    assert OccupancyWeek.query.filter_by(week_start=MONDAY, kind='week').count()
+
+    # Запись другого процесса: сброс недели сюда не дошел (кэш 'lru'),
+    # сохраненные маски остались в таблице
+    with db.engine.begin() as connection:
+        connection.execute(insert(Schedule), {
+            'subject_id': timetable['subject'], 'group_id': timetable['group'],
+            'teacher_id': timetable['teacher'], 'lesson_time_id': timetable['bells'][1],
+            'weekday': 1, 'classroom': '202', 'date': MONDAY, 'is_active': True})
+    monkeypatch.setattr(occupancy, '_weeks', {})
+    cache.clear()
+
+    assert get_week(MONDAY).mask('room', '202')
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from services.pool_metrics import InstrumentedQueuePool, engine_metrics, instrument_engine, snapshot_engines
+
+
+@pytest.fixture
+def engines():
+    engines = {None: create_engine('sqlite://', poolclass=InstrumentedQueuePool),
+               'replica': create_engine('sqlite://', poolclass=InstrumentedQueuePool)}
+    saved = dict(engine_metrics)
+    for key, engine in engines.items():
+        instrument_engine(engine, key or 'default')
+    yield engines
+    engine_metrics.clear()
+    engine_metrics.update(saved)
+    for engine in engines.values():
+        engine.dispose()
+
+
+def test_engines_are_counted_separately(engines):
+    for _ in range(3):
+        with engines['replica'].connect() as connection:
+            connection.execute(text('SELECT 1'))
+
+    snapshots = snapshot_engines(engines)
+
+    assert snapshots['replica']['checkouts'] == 3
+    assert snapshots['default']['checkouts'] == 0
+    assert snapshots['default']['wait_max_ms'] == 0.0
+
+
+def test_recreated_pool_keeps_metrics(engines):
+    engine = engines['replica']
+    engine.dispose()
+
+    assert engine.pool.metrics is engine_metrics['replica']
+
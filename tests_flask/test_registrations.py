@@ -0,0 +1,67 @@
+from extensions import db
+from models import User, PendingUser, Group, Student, Teacher
+
+
+def add_pending(username, role='student', group_id=None):
+    pending = PendingUser(username=username, email=f'{username}@test.local', password_hash='-',
+                          first_name='Имя', last_name='Фамилия', requested_role=role, group_id=group_id)
+    db.session.add(pending)
+    return pending
+
+
+def bulk(client, ids, **form):
+    return client.post('/admin/pending-users/bulk', data={'action': 'approve', 'ids': ids, **form})
+
+
+def test_approve_batch_with_and_without_group(admin_client):
+    group, fallback = Group(name='ПИ-21', course=2), Group(name='ПИ-22', course=2)
+    db.session.add_all([group, fallback])
+    db.session.flush()
+    pending = [add_pending('with_group', group_id=group.id), add_pending('without_group'),
+               add_pending('teacher', role='teacher')]
+    db.session.commit()
+    ids = [p.id for p in pending]
+    group_id, fallback_id = group.id, fallback.id
+
+    bulk(admin_client, ids, group_id=fallback_id)
+
+    students = {s.user.username: s.group_id for s in Student.query.all()}
+    assert students == {'with_group': group_id, 'without_group': fallback_id}
+    assert Teacher.query.join(User).filter(User.username == 'teacher').count() == 1
+    assert not PendingUser.query.count()
+
+
+def test_student_without_group_is_skipped(admin_client):
+    pending = [add_pending('without_group'), add_pending('teacher', role='teacher')]
+    db.session.commit()
+
+    bulk(admin_client, [p.id for p in pending])
+
+    assert [p.username for p in PendingUser.query.all()] == ['without_group']
+    assert not Student.query.count()
+
+
+def test_username_collision_rolls_back_batch(admin_client):
+    group = Group(name='ПИ-21', course=2)
+    db.session.add(group)
+    db.session.flush()
+    pending = [add_pending('first', group_id=group.id), add_pending('admin', role='teacher'),
+               add_pending('last', group_id=group.id)]
+    db.session.commit()
+
+    response = bulk(admin_client, [p.id for p in pending])
+
+    assert response.status_code == 302
+    assert PendingUser.query.count() == 3
+    assert User.query.count() == 1
+    assert not Student.query.count() and not Teacher.query.count()
+
+
+def test_unknown_group_rolls_back_batch(admin_client):
+    pending = [add_pending('teacher', role='teacher'), add_pending('student')]
+    db.session.commit()
+
+    bulk(admin_client, [p.id for p in pending], group_id=999)
+
+    assert PendingUser.query.count() == 2
+    assert User.query.count() == 1
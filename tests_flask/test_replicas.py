@@ -0,0 +1,15 @@
+import pytest
+from flask import Flask
+
+from services.replicas import init_replicas
+
+
+def test_replica_requires_shared_cache():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_BINDS={'replica': 'sqlite://'}, SCHEDULE_CACHE_BACKEND='lru')
+
+    with pytest.raises(RuntimeError):
+        init_replicas(app)
+
+    app.config['REPLICA_ALLOW_LOCAL_CACHE'] = True
+    init_replicas(app)
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import add_lesson
+from extensions import db
+from services.schedule_queries import group_schedule, teacher_schedule
+
+
+def render(lessons):
+    """Те же обращения к связям, что делают шаблоны и JSON"""
+    return [(s.subject.name, s.teacher.user.get_full_name(), s.group.name) for s in lessons]
+
+
+@pytest.mark.parametrize('lessons_count', [1, 50])
+def test_group_schedule_constant_queries(timetable, count_queries, lessons_count):
+    start = date(2025, 9, 1)
+    for offset in range(lessons_count):
+        add_lesson(timetable, start + timedelta(days=offset))
+    db.session.commit()
+    db.session.expunge_all()
+
+    with count_queries() as counter:
+        rows = render(group_schedule(timetable['group'], start, start + timedelta(days=lessons_count)))
+
+    assert len(rows) == lessons_count
+    assert counter.count == 1
+
+
+@pytest.mark.parametrize('lessons_count', [1, 50])
+def test_teacher_schedule_constant_queries(timetable, count_queries, lessons_count):
+    start = date(2025, 9, 1)
+    for offset in range(lessons_count):
+        add_lesson(timetable, start + timedelta(days=offset))
+    db.session.commit()
+    db.session.expunge_all()
+
+    with count_queries() as counter:
+        rows = render(teacher_schedule(timetable['teacher'], start, start + timedelta(days=lessons_count)))
+
+    assert len(rows) == lessons_count
+    assert counter.count == 1
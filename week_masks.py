@@ -0,0 +1,108 @@
+"""
+Общая арифметика недельных битовых масок занятости
+
+Используется Flask-версией (services/occupancy.py, services/rooms.py) и
+приложением Django (schedules/rooms.py, schedules/reschedule.py). Неделя -
+DAYS_PER_WEEK учебных дней x width позиций расписания звонков; занятость
+сущности за неделю - одно целое число, бит day * width + position которого
+означает, что в день day (0 - понедельник) занята позиция position.
+Позиции (порядок строк звонков) задает вызывающий код. Модуль зависит
+только от стандартной библиотеки.
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import and_, or_
+
+DAYS_PER_WEEK = 6
+
+
+def popcount(mask):
+    """Количество установленных битов"""
+    return bin(mask).count('1')
+
+
+def union(masks):
+    """Занятость хотя бы одной из сущностей (OR)"""
+    return reduce(or_, masks, 0)
+
+
+def intersection(masks):
+    """Слоты, занятые у всех сущностей (AND)"""
+    masks = list(masks)
+    return reduce(and_, masks) if masks else 0
+
+
+def week_start_of(day):
+    """Понедельник недели, содержащей дату"""
+    return day - timedelta(days=day.weekday())
+
+
+def week_starts(start, end):
+    """Понедельники всех недель, пересекающихся с периодом [start, end]"""
+    week_start = week_start_of(start)
+    while week_start <= end:
+        yield week_start
+        week_start += timedelta(days=7)
+
+
+def full_mask(width):
+    """Маска всех слотов недели"""
+    return (1 << (width * DAYS_PER_WEEK)) - 1
+
+
+def day_mask(width, offset):
+    """Маска всех позиций дня с номером offset (0 - понедельник)"""
+    return ((1 << width) - 1) << (offset * width)
+
+
+def slot_bit(week_start, width, day, position):
+    """Бит слота (дата, позиция); 0 - вне учебных дней недели или неизвестная позиция"""
+    offset = (day - week_start).days
+    if position is None or not 0 <= offset < DAYS_PER_WEEK:
+        return 0
+    return 1 << (offset * width + position)
+
+
+def requested_mask(week_start, width, start, end, positions=None):
+    """
+    Маска слотов недели в днях периода [start, end]: указанные позиции
+    или, если positions is None, все позиции дня
+    """
+    mask = 0
+    for offset in range(DAYS_PER_WEEK):
+        day = week_start + timedelta(days=offset)
+        if not start <= day <= end:
+            continue
+        if positions is not None:
+            for position in positions:
+                mask |= slot_bit(week_start, width, day, position)
+        else:
+            mask |= day_mask(width, offset)
+    return mask
+
+
+def set_bits(mask, width):
+    """Пары (день недели, позиция) установленных битов маски"""
+    result = []
+    for offset in range(DAYS_PER_WEEK):
+        day_bits = (mask >> (offset * width)) & ((1 << width) - 1)
+        position = 0
+        while day_bits:
+            if day_bits & 1:
+                result.append((offset, position))
+            day_bits >>= 1
+            position += 1
+    return result
+
+
+def gaps(mask, width):
+    """Окна по дням: свободные позиции между первым и последним занятием дня"""
+    result = []
+    for offset in range(DAYS_PER_WEEK):
+        day_bits = (mask >> (offset * width)) & ((1 << width) - 1)
+        if not day_bits:
+            result.append(0)
+            continue
+        span = day_bits.bit_length() - ((day_bits & -day_bits).bit_length() - 1)
+        result.append(span - popcount(day_bits))
+    return result